@@ -1,4 +1,3 @@
-import hashlib
 import uuid
 from datetime import datetime, timezone
 from typing import Optional
@@ -9,6 +8,7 @@ from sqlalchemy.orm import Session
 from api.deps import db_session
 from api.middleware.auth import get_current_api_key, optional_api_key
 from db.models import ApiKey, MediaFile, ShareToken
+from utils.hashing import share_token_digest
 
 
 class ACL:
@@ -49,7 +49,7 @@ class ACL:
 
     @staticmethod
     def verify_share_token(db: Session, media_id: str, raw_token: str) -> bool:
-        token_hash = hashlib.sha256(raw_token.encode("utf-8")).hexdigest()
+        token_hash = share_token_digest(raw_token)
         now = datetime.now(timezone.utc)
 
         share = (
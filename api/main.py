@@ -9,6 +9,8 @@ from __future__ import annotations
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 
+from compression import load_engine
+
 # Import routers
 from api.video import router as video_router
 from api.audio import router as audio_router
@@ -16,6 +18,7 @@ from api.video_range import router as range_router
 from api.compress import router as compress_router  # ✅ NEW
 from api.video_compat import router as video_compat_router  # ✅ COMPATIBILITY
 from api.middleware.cors import apply_cors
+from api.middleware.uploads import apply_upload_spooling
 from api.routes.media import router as media_router
 from api.routes.audit import router as audit_router
 from api.routes.api_keys import router as api_keys_router
@@ -28,6 +31,8 @@ from api.routes.geometry import router as geometry_router  # ✅ G0-G5: Ethical
 async def lifespan(app: FastAPI):
     """Startup/shutdown context."""
     print("✨ HarmonyØ4 Media API starting...")
+    # Load (and seal-check) the compression engine before the first request
+    load_engine()
     yield
     print("🌀 HarmonyØ4 shutting down...")
 
@@ -43,6 +48,9 @@ app = FastAPI(
 # Apply CORS policy
 apply_cors(app)
 
+# Keep typical video uploads in memory instead of spooling to /tmp
+apply_upload_spooling()
+
 # Mount routers
 app.include_router(video_router)
 app.include_router(audio_router)
@@ -0,0 +1,17 @@
+from starlette.formparsers import MultiPartParser
+
+from config import settings
+
+
+def apply_upload_spooling():
+    """Keep multipart uploads in memory up to UPLOAD_SPOOL_MAX_BYTES.
+
+    Starlette spools each UploadFile to a temp file once it passes 1 MB,
+    so every video upload round-trips through /tmp. Larger uploads still
+    roll over to disk past the configured threshold.
+    """
+    limit = settings.UPLOAD_SPOOL_MAX_BYTES
+    if hasattr(MultiPartParser, "spool_max_size"):
+        MultiPartParser.spool_max_size = limit
+    else:  # Starlette < 0.38 names the threshold max_file_size
+        MultiPartParser.max_file_size = limit
@@ -9,6 +9,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, Dict, List
 from enum import Enum
 from datetime import datetime, timezone
+import hashlib
 import json
 import secrets
 
@@ -142,7 +143,6 @@ async def generate_mathematical_human(
     
     # 7. Create container hash
     container_hash = json.dumps(sealed_package, sort_keys=True, default=str)
-    import hashlib
     container_hash = hashlib.sha256(container_hash.encode()).hexdigest()
     
     # 8. Return response
@@ -93,7 +93,6 @@ def update_media_visibility(
     db: Session = Depends(db_session),
 ):
     media.public_access = public_access
-    db.add(media)
     db.commit()
 
     log_access(
@@ -1,24 +1,24 @@
-import hashlib
 import secrets
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import and_, case, insert, or_
 from sqlalchemy.orm import Session
 
 from api.acl import require_owner_access
 from api.deps import db_session, log_access
 from api.middleware.auth import get_current_api_key
 from db.models import ApiKey, MediaFile, ShareToken
+from utils.hashing import share_token_digest
 
 router = APIRouter(prefix="/media/{media_id}/share", tags=["share"])
 
 
-def _generate_share_token() -> tuple[str, str]:
+def _generate_share_token() -> tuple[str, bytes]:
     raw_token = f"h4s_{secrets.token_urlsafe(32)}"
-    token_hash = hashlib.sha256(raw_token.encode("utf-8")).hexdigest()
-    return raw_token, token_hash
+    return raw_token, share_token_digest(raw_token)
 
 
 @router.post("", status_code=201)
@@ -32,47 +32,105 @@ def create_share_token(
     api_key: ApiKey = Depends(get_current_api_key),
 ):
     raw_token, token_hash = _generate_share_token()
-    expires_at = datetime.now(timezone.utc) + timedelta(hours=expires_hours)
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(hours=expires_hours)
+    # Keep IDs in locals: entities are expired on commit, and reading
+    # attributes back afterwards would cost a SELECT per entity.
+    token_id = uuid.uuid4()
+    media_uuid = media.id
 
     share_token = ShareToken(
-        id=uuid.uuid4(),
-        media_id=media.id,
+        id=token_id,
+        media_id=media_uuid,
         token_hash=token_hash,
         expires_at=expires_at,
         max_uses=max_uses,
-        created_at=datetime.now(timezone.utc),
+        created_at=now,
     )
 
     db.add(share_token)
     db.commit()
-    db.refresh(share_token)
 
-    log_access(db, request, "share_token_create", user_id=api_key.user_id, media_id=media.id)
+    log_access(db, request, "share_token_create", user_id=api_key.user_id, media_id=media_uuid)
 
     return {
         "share_token": raw_token,
-        "token_id": str(share_token.id),
-        "media_id": str(media.id),
+        "token_id": str(token_id),
+        "media_id": str(media_uuid),
         "expires_at": expires_at.isoformat(),
         "max_uses": max_uses,
         "warning": "Share this token carefully. It grants access to this media.",
     }
 
 
+@router.post("/bulk", status_code=201)
+def create_share_tokens_bulk(
+    request: Request,
+    media_id: str,
+    count: int = Query(..., ge=1, le=1000),
+    expires_hours: int = Query(24, ge=1, le=168),
+    max_uses: Optional[int] = Query(None, ge=1, le=1000),
+    media: MediaFile = Depends(require_owner_access),
+    db: Session = Depends(db_session),
+    api_key: ApiKey = Depends(get_current_api_key),
+):
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(hours=expires_hours)
+    generated = [_generate_share_token() for _ in range(count)]
+    # Read before commit: the commit expires media, and media.id afterwards
+    # would reload it with a SELECT.
+    media_uuid = media.id
+
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "media_id": media_uuid,
+            "token_hash": token_hash,
+            "expires_at": expires_at,
+            "max_uses": max_uses,
+            "usage_count": 0,
+            "created_at": now,
+        }
+        for _, token_hash in generated
+    ]
+
+    # One multi-row INSERT instead of an add/commit round-trip per token
+    db.execute(insert(ShareToken), rows)
+    db.commit()
+
+    log_access(db, request, "share_token_create_bulk", user_id=api_key.user_id, media_id=media_uuid)
+
+    return {
+        "media_id": str(media_uuid),
+        "expires_at": expires_at.isoformat(),
+        "max_uses": max_uses,
+        "share_tokens": [
+            {"share_token": raw_token, "token_id": str(row["id"])}
+            for (raw_token, _), row in zip(generated, rows)
+        ],
+        "warning": "Share these tokens carefully. Each grants access to this media.",
+    }
+
+
 @router.get("")
 def list_share_tokens(
     media_id: str,
+    active_only: bool = Query(False),
     media: MediaFile = Depends(require_owner_access),
     db: Session = Depends(db_session),
     api_key: ApiKey = Depends(get_current_api_key),
 ):
     now = datetime.now(timezone.utc)
-    tokens = (
-        db.query(ShareToken)
-        .filter(ShareToken.media_id == media.id)
-        .order_by(ShareToken.created_at.desc())
-        .all()
+    active = and_(
+        ShareToken.expires_at > now,
+        or_(ShareToken.max_uses.is_(None), ShareToken.usage_count < ShareToken.max_uses),
+    )
+    query = db.query(ShareToken, case((active, True), else_=False).label("is_active")).filter(
+        ShareToken.media_id == media.id
     )
+    if active_only:
+        query = query.filter(active)
+    rows = query.order_by(ShareToken.created_at.desc()).all()
 
     log_access(db, None, "share_token_list", user_id=api_key.user_id, media_id=media.id)
 
@@ -84,10 +142,9 @@ def list_share_tokens(
             "max_uses": token.max_uses,
             "usage_count": token.usage_count,
             "last_used_at": token.last_used_at.isoformat() if token.last_used_at else None,
-            "is_active": token.expires_at > now
-            and (token.max_uses is None or token.usage_count < token.max_uses),
+            "is_active": bool(is_active),
         }
-        for token in tokens
+        for token, is_active in rows
     ]
 
 
@@ -104,9 +161,10 @@ def revoke_share_token(
     except ValueError as exc:
         raise HTTPException(status_code=400, detail="Invalid token ID") from exc
 
+    media_uuid = media.id
     token = (
         db.query(ShareToken)
-        .filter(ShareToken.id == token_uuid, ShareToken.media_id == media.id)
+        .filter(ShareToken.id == token_uuid, ShareToken.media_id == media_uuid)
         .first()
     )
 
@@ -114,10 +172,9 @@ def revoke_share_token(
         raise HTTPException(status_code=404, detail="Share token not found")
 
     token.expires_at = datetime.now(timezone.utc)
-    db.add(token)
     db.commit()
 
-    log_access(db, None, "share_token_revoke", user_id=api_key.user_id, media_id=media.id)
+    log_access(db, None, "share_token_revoke", user_id=api_key.user_id, media_id=media_uuid)
 
     return {"revoked": True, "token_id": token_id}
 
@@ -130,9 +187,10 @@ def revoke_all_share_tokens(
     api_key: ApiKey = Depends(get_current_api_key),
 ):
     now = datetime.now(timezone.utc)
-    db.query(ShareToken).filter(ShareToken.media_id == media.id).update({"expires_at": now})
+    media_uuid = media.id
+    db.query(ShareToken).filter(ShareToken.media_id == media_uuid).update({"expires_at": now})
     db.commit()
 
-    log_access(db, None, "share_token_revoke_all", user_id=api_key.user_id, media_id=media.id)
+    log_access(db, None, "share_token_revoke_all", user_id=api_key.user_id, media_id=media_uuid)
 
     return {"revoked": True, "media_id": media_id}
@@ -6,19 +6,30 @@
 """
 
 from __future__ import annotations
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
 from fastapi import APIRouter, UploadFile, Query
 from fastapi.responses import StreamingResponse, Response
 import json
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple, Union
 
 from tokenizers.video_transport import VideoTransportTokenizer
 from container.seek import SeekTable
-from container.h4mk import build_h4mk
+from container.h4mk import build_h4mk_stream
 from utils.crypto import MaskSpec, derive_block_key, xor_mask, sha256
-from crypto.living_cipher import init_from_shared_secret
+from crypto.living_cipher import LivingState, init_from_shared_secret
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey
 
 router = APIRouter(prefix="/video", tags=["video"])
 
+# Compression engines take CORE input in multiples of this many bytes.
+# Export block sizes must be a multiple of it; the final block is zero-padded
+# up to it and META "orig_len" records the unpadded upload size.
+_BLOCK_ALIGN = 256
+
 
 def _sse(event: str, data_obj) -> bytes:
     """Encode Server-Sent Event: event:type\ndata:json\n\n"""
@@ -26,6 +37,117 @@ def _sse(event: str, data_obj) -> bytes:
     return f"event:{event}\ndata:{data}\n\n".encode("utf-8")
 
 
+def _parse_hex_key(name: str, hex_str: str, min_bytes: int) -> Union[bytes, Response]:
+    """Decode a hex key parameter, or return a 400 Response saying why not."""
+    try:
+        key = bytes.fromhex(hex_str)
+    except ValueError:
+        return Response(f"{name} must be valid hex.", status_code=400)
+    if len(key) < min_bytes:
+        return Response(
+            f"{name} must represent at least {min_bytes} bytes ({min_bytes * 2} hex chars).",
+            status_code=400,
+        )
+    return key
+
+
+# HKDF-initialized cipher templates, keyed by SHA-256 of the shared secret so
+# the secret itself is never held. The templates' root/chain keys are as
+# sensitive as the secret, so the cache trades a few microseconds of KDF per
+# request for key material lingering in memory: it stays small, entries
+# expire after a short TTL, and _clear_cipher_templates() drops them all.
+_CIPHER_TEMPLATE_MAX_ENTRIES = 32
+_CIPHER_TEMPLATE_TTL_S = 60.0
+_cipher_templates: "OrderedDict[bytes, Tuple[float, LivingState]]" = OrderedDict()
+_cipher_templates_lock = threading.Lock()
+
+
+def _cipher_template(shared_secret: bytes) -> LivingState:
+    """HKDF-initialized cipher state per secret; never handed out directly."""
+    key = hashlib.sha256(shared_secret).digest()
+    now = time.monotonic()
+    with _cipher_templates_lock:
+        entry = _cipher_templates.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+    template = init_from_shared_secret(shared_secret)
+    with _cipher_templates_lock:
+        _cipher_templates[key] = (now + _CIPHER_TEMPLATE_TTL_S, template)
+        _cipher_templates.move_to_end(key)
+        while len(_cipher_templates) > _CIPHER_TEMPLATE_MAX_ENTRIES:
+            _cipher_templates.popitem(last=False)
+        # Insertion order is expiry order: expired entries are at the front
+        while _cipher_templates and next(iter(_cipher_templates.values()))[0] <= now:
+            _cipher_templates.popitem(last=False)
+    return template
+
+
+def _clear_cipher_templates() -> None:
+    """Drop every cached cipher template (and its derived key material)."""
+    with _cipher_templates_lock:
+        _cipher_templates.clear()
+
+
+def _init_cipher(shared_secret: bytes) -> LivingState:
+    """Fresh LivingState for shared_secret, skipping the KDF for repeat secrets.
+
+    Each request gets its own copy of the template with an empty skipped-key
+    cache and a newly generated DH key pair, exactly as init_from_shared_secret
+    would produce.
+    """
+    template = _cipher_template(shared_secret)
+    return replace(template, skipped_ring=[], dh_priv=X25519PrivateKey.generate())
+
+
+def _split_blocks(raw: bytes, block_size: int) -> List[memoryview]:
+    """Zero-copy block windows over raw (no per-block bytes allocation)."""
+    mv = memoryview(raw)
+    return [mv[i : i + block_size] for i in range(0, len(mv), block_size)]
+
+
+def _export_blocks(raw: bytes, block_size: int) -> List[memoryview]:
+    """_split_blocks for export: the final block is zero-padded to _BLOCK_ALIGN."""
+    blocks = _split_blocks(raw, block_size)
+    if blocks:
+        short = -len(blocks[-1]) % _BLOCK_ALIGN
+        if short:
+            blocks[-1] = memoryview(bytes(blocks[-1]) + bytes(short))
+    return blocks
+
+
+def _check_block_size(block_size: int) -> Optional[Response]:
+    """400 Response if block_size breaks engine alignment, else None."""
+    if block_size % _BLOCK_ALIGN:
+        return Response(
+            f"block_size must be a multiple of {_BLOCK_ALIGN} bytes.", status_code=400
+        )
+    return None
+
+
+def _build_seek(tok: VideoTransportTokenizer, blocks: List[memoryview]) -> SeekTable:
+    """Keyframe SEEK table over blocks (masking preserves block lengths)."""
+    seek = SeekTable()
+    offset = 0
+    for t in tok.encode_blocks(blocks):
+        if t.is_key:
+            seek.add(t.pts_us, offset)
+        offset += len(blocks[t.block_index])
+    seek.finalize()
+    return seek
+
+
+def _core_payloads(
+    blocks: List[memoryview], spec: MaskSpec, master_key: Optional[bytes]
+) -> Iterator[bytes]:
+    """Yield CORE payloads in block order, XOR-masking each lazily if enabled."""
+    for block_index, payload in enumerate(blocks):
+        if spec.enabled:
+            key = derive_block_key(master_key, block_index, spec)
+            payload = xor_mask(payload, key)
+        yield payload
+
+
 @router.post("/stream", summary="Stream Video Tokens (SSE)")
 async def stream_video_tokens(
     file: UploadFile,
@@ -51,7 +173,7 @@ async def stream_video_tokens(
           - "done": completion marker
     """
     raw = await file.read()
-    blocks = [raw[i : i + block_size] for i in range(0, len(raw), block_size)]
+    blocks = _split_blocks(raw, block_size)
     tok = VideoTransportTokenizer(fps_hint=fps_hint, gop=gop)
 
     async def gen():
@@ -97,11 +219,11 @@ async def export_video_h4mk(
       - SEEK table: (pts_us, offset) keyframe pairs for O(log n) seeking
       - META: tokenizer config + project metadata
       - SAFE: safety scopes (no synthesis, no pixel semantics)
-      - VERI: SHA256 integrity hash of all prior chunks
+      - VERI: BLAKE2b-256 integrity hash of all prior chunks
     
     Args:
         file: Raw video file (opaque frames)
-        block_size: Size of each logical block
+        block_size: Size of each logical block (multiple of 256 bytes)
         fps_hint: Frames per second
         gop: Keyframe interval
         mask: Enable XOR mask (transport-only, no codec leak)
@@ -110,51 +232,29 @@ async def export_video_h4mk(
     Returns:
         H4MK binary file (application/octet-stream)
     """
+    bad_block_size = _check_block_size(block_size)
+    if bad_block_size is not None:
+        return bad_block_size
     raw = await file.read()
-    blocks = [raw[i : i + block_size] for i in range(0, len(raw), block_size)]
+    # Pad before streaming: an engine error mid-stream would follow 200 headers
+    blocks = _export_blocks(raw, block_size)
 
     # Validate and parse master key if masking enabled
     spec = MaskSpec(enabled=mask)
     master_key = None
     if mask:
-        if not master_key_hex or len(master_key_hex) < 32:
+        if not master_key_hex:
             return Response(
                 "mask=true requires master_key_hex (minimum 16 bytes, 32 hex chars).",
                 status_code=400,
             )
-        try:
-            master_key = bytes.fromhex(master_key_hex)
-        except ValueError:
-            return Response("master_key_hex must be valid hex.", status_code=400)
-        if len(master_key) < 16:
-            return Response(
-                "master_key_hex must represent at least 16 bytes.", status_code=400
-            )
+        master_key = _parse_hex_key("master_key_hex", master_key_hex, 16)
+        if isinstance(master_key, Response):
+            return master_key
 
-    # Tokenize and build container
+    # Tokenize; CORE payloads are masked lazily while the container streams
     tok = VideoTransportTokenizer(fps_hint=fps_hint, gop=gop)
-    seek = SeekTable()
-
-    core_blocks = []
-    offset = 0
-
-    for t in tok.encode_blocks(blocks):
-        payload = blocks[t.block_index]
-
-        # Apply XOR mask if enabled
-        if spec.enabled:
-            key = derive_block_key(master_key, t.block_index, spec)
-            payload = xor_mask(payload, key)
-
-        core_blocks.append(payload)
-
-        # Add keyframe to seek table
-        if t.is_key:
-            seek.add(t.pts_us, offset)
-
-        offset += len(payload)
-
-    seek.finalize()
+    seek = _build_seek(tok, blocks)
 
     # Build metadata and safety scopes
     meta = {
@@ -164,6 +264,7 @@ async def export_video_h4mk(
         "fps_hint": fps_hint,
         "gop": gop,
         "masked": bool(spec.enabled),
+        "orig_len": len(raw),
     }
     safe = {
         "scope": "container+transport-only",
@@ -172,13 +273,16 @@ async def export_video_h4mk(
         "no_visual_ml": True,
     }
 
-    # Build H4MK container
-    blob = build_h4mk(
-        core_blocks=core_blocks, seek_entries=seek.entries, meta=meta, safe=safe
+    # Stream H4MK container (one CORE block in memory at a time)
+    stream = build_h4mk_stream(
+        core_blocks=_core_payloads(blocks, spec, master_key),
+        seek_entries=seek.entries,
+        meta=meta,
+        safe=safe,
     )
 
-    return Response(
-        content=blob,
+    return StreamingResponse(
+        stream,
         media_type="application/octet-stream",
         headers={
             "Content-Disposition": 'attachment; filename="HarmonyØ4_video.h4mk"'
@@ -209,11 +313,11 @@ async def export_video_h4mk_encrypted(
       - SEEK table: (pts_us, offset) keyframe pairs for O(log n) seeking
       - META: tokenizer config + compression + encryption metadata
       - SAFE: safety scopes (no synthesis, no pixel semantics)
-      - VERI: SHA256 integrity hash of all prior chunks
+      - VERI: BLAKE2b-256 integrity hash of all prior chunks
     
     Args:
         file: Raw video file (opaque frames)
-        block_size: Size of each logical block
+        block_size: Size of each logical block (multiple of 256 bytes)
         fps_hint: Frames per second
         gop: Keyframe interval
         shared_secret_hex: Hex-encoded 32-byte shared secret for cipher init
@@ -223,29 +327,25 @@ async def export_video_h4mk_encrypted(
     Returns:
         Encrypted H4MK binary file (application/octet-stream)
     """
+    bad_block_size = _check_block_size(block_size)
+    if bad_block_size is not None:
+        return bad_block_size
     raw = await file.read()
-    blocks = [raw[i : i + block_size] for i in range(0, len(raw), block_size)]
+    # Pad before streaming: an engine error mid-stream would follow 200 headers
+    blocks = _export_blocks(raw, block_size)
 
     # Parse and validate shared secret
     if shared_secret_hex:
-        if len(shared_secret_hex) < 64:
-            return Response(
-                "shared_secret_hex must be 64 hex characters (32 bytes).",
-                status_code=400,
-            )
-        try:
-            shared_secret = bytes.fromhex(shared_secret_hex)
-        except ValueError:
-            return Response("shared_secret_hex must be valid hex.", status_code=400)
-        if len(shared_secret) < 32:
-            return Response("shared_secret_hex must represent at least 32 bytes.", status_code=400)
+        shared_secret = _parse_hex_key("shared_secret_hex", shared_secret_hex, 32)
+        if isinstance(shared_secret, Response):
+            return shared_secret
     else:
         # Default secret if none provided
         shared_secret = sha256(b"Harmony4_default_shared_secret")
 
     # Initialize cipher state
     try:
-        cipher_state = init_from_shared_secret(shared_secret)
+        cipher_state = _init_cipher(shared_secret)
     except Exception as e:
         return Response(f"Failed to initialize cipher: {e}", status_code=400)
 
@@ -253,44 +353,18 @@ async def export_video_h4mk_encrypted(
     spec = MaskSpec(enabled=mask)
     master_key = None
     if mask:
-        if not master_key_hex or len(master_key_hex) < 32:
+        if not master_key_hex:
             return Response(
                 "mask=true requires master_key_hex (minimum 16 bytes, 32 hex chars).",
                 status_code=400,
             )
-        try:
-            master_key = bytes.fromhex(master_key_hex)
-        except ValueError:
-            return Response("master_key_hex must be valid hex.", status_code=400)
-        if len(master_key) < 16:
-            return Response(
-                "master_key_hex must represent at least 16 bytes.", status_code=400
-            )
+        master_key = _parse_hex_key("master_key_hex", master_key_hex, 16)
+        if isinstance(master_key, Response):
+            return master_key
 
-    # Tokenize and build container
+    # Tokenize; CORE payloads are masked lazily while the container streams
     tok = VideoTransportTokenizer(fps_hint=fps_hint, gop=gop)
-    seek = SeekTable()
-
-    core_blocks = []
-    offset = 0
-
-    for t in tok.encode_blocks(blocks):
-        payload = blocks[t.block_index]
-
-        # Apply XOR mask if enabled (optional, before encryption)
-        if spec.enabled:
-            key = derive_block_key(master_key, t.block_index, spec)
-            payload = xor_mask(payload, key)
-
-        core_blocks.append(payload)
-
-        # Add keyframe to seek table
-        if t.is_key:
-            seek.add(t.pts_us, offset)
-
-        offset += len(payload)
-
-    seek.finalize()
+    seek = _build_seek(tok, blocks)
 
     # Build metadata and safety scopes
     meta = {
@@ -301,6 +375,7 @@ async def export_video_h4mk_encrypted(
         "gop": gop,
         "masked": bool(spec.enabled),
         "encrypted": True,
+        "orig_len": len(raw),
     }
     safe = {
         "scope": "container+transport-only",
@@ -309,17 +384,17 @@ async def export_video_h4mk_encrypted(
         "no_visual_ml": True,
     }
 
-    # Build H4MK container WITH encryption
-    blob = build_h4mk(
-        core_blocks=core_blocks,
+    # Stream H4MK container WITH encryption
+    stream = build_h4mk_stream(
+        core_blocks=_core_payloads(blocks, spec, master_key),
         seek_entries=seek.entries,
         meta=meta,
         safe=safe,
         cipher_state=cipher_state,  # ✅ ENABLE ENCRYPTION
     )
 
-    return Response(
-        content=blob,
+    return StreamingResponse(
+        stream,
         media_type="application/octet-stream",
         headers={
             "Content-Disposition": 'attachment; filename="HarmonyØ4_video_encrypted.h4mk"'
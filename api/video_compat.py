@@ -9,7 +9,11 @@ No codec or pixel semantics. Safe for any video format.
 """
 
 from __future__ import annotations
+import hashlib
 import json
+from bisect import bisect_right
+from collections import OrderedDict
+from operator import attrgetter
 from typing import Any
 
 from fastapi import APIRouter, UploadFile, Query, HTTPException
@@ -20,6 +24,52 @@ from container.reader import H4MKReader
 
 router = APIRouter(prefix="/video", tags=["video-compat"])
 
+# Parsed-reader LRU: a player typically uploads the same container to
+# /manifest, /block, /seek_to_block and /verify_integrity in turn.
+_READER_CACHE_MAX_ENTRIES = 64
+_READER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_reader_cache: OrderedDict[bytes, H4MKReader] = OrderedDict()
+
+
+def _reader_footprint(reader: H4MKReader) -> int:
+    """Container bytes plus the reader's decompressed-block cache."""
+    return len(reader.data) + reader.cached_bytes
+
+
+def _trim_reader_cache() -> None:
+    """Evict least recently used readers until both bounds hold."""
+    total = sum(map(_reader_footprint, _reader_cache.values()))
+    while _reader_cache and (
+        len(_reader_cache) > _READER_CACHE_MAX_ENTRIES
+        or total > _READER_CACHE_MAX_BYTES
+    ):
+        _, evicted = _reader_cache.popitem(last=False)
+        total -= _reader_footprint(evicted)
+
+
+def _get_reader(data: bytes) -> H4MKReader:
+    """
+    Return a parsed H4MKReader for data, reusing one built for identical bytes.
+
+    Keyed on a 128-bit SHA-256 prefix of the upload; bounded by entry count
+    and by total bytes held, counting each reader's decompressed-CORE cache
+    as well as its container (least recently used evicted first). Footprints
+    are re-measured on every call and after /block decompresses, since the
+    per-reader cache grows after insertion.
+    Every chunk is CRC-checked at parse, since /block serves CORE bytes
+    straight from the cached reader.
+    """
+    key = hashlib.sha256(data).digest()[:16]
+    reader = _reader_cache.get(key)
+    if reader is not None:
+        _reader_cache.move_to_end(key)
+        return reader
+
+    reader = H4MKReader(data, verify_crc=True)
+    _reader_cache[key] = reader
+    _trim_reader_cache()
+    return reader
+
 
 @router.post("/manifest")
 async def manifest_from_h4mk(file: UploadFile) -> dict[str, Any]:
@@ -40,7 +90,7 @@ async def manifest_from_h4mk(file: UploadFile) -> dict[str, Any]:
         raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
 
     try:
-        r = H4MKReader(data)
+        r = _get_reader(data)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Invalid H4MK container: {str(e)}")
 
@@ -68,7 +118,7 @@ async def manifest_from_h4mk(file: UploadFile) -> dict[str, Any]:
 
         # Get seek table and core block count
         seek = r.get_seek_table()
-        core_count = len(r.get_chunks(b"CORE"))
+        core_count = len(r.chunks.get(b"CORE", []))
 
         return JSONResponse({
             "container": "H4MK",
@@ -112,33 +162,30 @@ async def get_block_by_index(
         raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
 
     try:
-        r = H4MKReader(data)
+        r = _get_reader(data)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Invalid H4MK container: {str(e)}")
 
     try:
-        core = r.get_chunks(b"CORE")
+        core_count = len(r.chunks.get(b"CORE", []))
 
-        if index < 0 or index >= len(core):
+        if index < 0 or index >= core_count:
             raise HTTPException(
                 status_code=416,
-                detail=f"Block index {index} out of range (0-{len(core)-1})"
+                detail=f"Block index {index} out of range (0-{core_count-1})"
             )
 
         if not decompress:
             # Return raw block (potentially compressed)
             return Response(
-                content=core[index],
+                content=r.get_core_block(index, decompress=False),
                 media_type="application/octet-stream",
                 headers={"X-Block-Index": str(index), "X-Decompressed": "false"}
             )
 
-        # Transparent decompression
-        blocks = list(r.iter_core_blocks(decompress=True))
-        if index >= len(blocks):
-            raise HTTPException(status_code=416, detail="Block index out of range after decompression")
-
-        block = blocks[index]
+        # Transparent decompression (only the requested block)
+        block = r.get_core_block(index, decompress=True)
+        _trim_reader_cache()
         return Response(
             content=block,
             media_type="application/octet-stream",
@@ -173,7 +220,7 @@ async def seek_to_block(file: UploadFile, pts_us: int = Query(..., ge=0)) -> dic
         raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
 
     try:
-        r = H4MKReader(data)
+        r = _get_reader(data)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Invalid H4MK container: {str(e)}")
 
@@ -183,16 +230,9 @@ async def seek_to_block(file: UploadFile, pts_us: int = Query(..., ge=0)) -> dic
         if not seek:
             raise HTTPException(status_code=400, detail="No seek table in container")
 
-        # Find last entry with pts <= target
-        block_index = 0
-        keyframe_pts = 0
-
-        for i, (pts, _off) in enumerate(seek):
-            if pts <= pts_us:
-                block_index = i
-                keyframe_pts = pts
-            else:
-                break
+        # Find last entry with pts <= target (seek table is pts-sorted)
+        block_index = max(bisect_right(seek, pts_us, key=attrgetter("pts")) - 1, 0)
+        keyframe_pts = seek[block_index].pts if seek[block_index].pts <= pts_us else 0
 
         return JSONResponse({
             "pts_us": int(pts_us),
@@ -224,7 +264,7 @@ async def verify_integrity(file: UploadFile) -> dict[str, Any]:
         raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
 
     try:
-        r = H4MKReader(data)
+        r = _get_reader(data)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Invalid H4MK container: {str(e)}")
 
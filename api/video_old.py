@@ -14,7 +14,9 @@ from fastapi import APIRouter, UploadFile, File, Query
 from pydantic import BaseModel
 import io
 
-from tokenizers.video import VideoTokenizer, VideoBlockToken
+import numpy as np
+
+from tokenizers.video import TOKEN_DTYPE, VideoTokenizer
 from container import SeekTable, CoreChunk, ChunkStream
 
 
@@ -73,37 +75,34 @@ async def tokenize_video(
     # Read file
     raw_data = await file.read()
 
-    # Split into blocks
-    blocks = [
-        raw_data[i : i + block_size]
-        for i in range(0, len(raw_data), block_size)
-    ]
+    # Blocks are opaque: only their count matters for tokenization
+    block_count = -(-len(raw_data) // block_size)
 
     # Initialize tokenizer and seek table
     tokenizer = VideoTokenizer(fps=fps, gop_size=gop_size)
     seek = SeekTable()
 
-    tokens_serialized = []
-    offset = 0
+    # All tokens at once as a packed record array; hex the serialized
+    # stream in one call and cut it into 13-byte (26-char) tokens
+    tokens = tokenizer.encode_array(block_count)
+    tokens_hex = tokens.tobytes().hex()
+    step = 2 * TOKEN_DTYPE.itemsize
+    tokens_serialized = [tokens_hex[i : i + step] for i in range(0, len(tokens_hex), step)]
 
-    # Tokenize and build seek table
-    for token in tokenizer.encode(blocks):
-        tokens_serialized.append(token.serialize().hex())
-        if token.is_keyframe:
-            seek.add(token.pts, offset)
-        offset += len(blocks[token.block_index]) if token.block_index < len(blocks) else 0
+    # Blocks are fixed-size (only the last may be short), so a block's byte
+    # offset is just block_index * block_size: no running sum needed.
+    keyframes = tokens[tokens["is_keyframe"] == 1]
+    offsets = keyframes["block_index"].astype(np.int64) * block_size
+    for pts, offset in zip(keyframes["pts"].tolist(), offsets.tolist()):
+        seek.add(pts, offset)
 
     seek.finalize()
 
-    # Compute duration
-    if tokens_serialized:
-        last_token = VideoBlockToken.deserialize(bytes.fromhex(tokens_serialized[-1]))
-        duration_us = last_token.pts
-    else:
-        duration_us = 0
+    # Duration is the last token's PTS
+    duration_us = int(tokens["pts"][-1]) if block_count else 0
 
     return TokenizeResponse(
-        block_count=len(blocks),
+        block_count=block_count,
         tokens=tokens_serialized,
         seek_entries=seek.to_list(),
         duration_us=duration_us,
@@ -158,10 +157,8 @@ async def get_metadata(
         Metadata dict.
     """
     raw_data = await file.read()
-    blocks = [
-        raw_data[i : i + block_size]
-        for i in range(0, len(raw_data), block_size)
-    ]
+    mv = memoryview(raw_data)
+    blocks = [mv[i : i + block_size] for i in range(0, len(mv), block_size)]
 
     tokenizer = VideoTokenizer(fps=fps, gop_size=gop_size)
     tokens = list(tokenizer.encode(blocks))
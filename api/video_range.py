@@ -10,12 +10,52 @@ Example:
 """
 
 from fastapi import APIRouter, Header, Response, Query
-from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from typing import AsyncIterator, Optional, Sequence, Union
+import binascii
+import hashlib
 import struct
+import threading
+import orjson
 from container.reader import H4MKReader
 
 router = APIRouter(prefix="/video", tags=["video"])
 
+# Hex-in-query containers are a convenience path; refuse pathological
+# inputs before spending time decoding them.
+_MAX_H4MK_BYTES = 32 * 1024 * 1024
+
+# Range bodies are streamed in pieces of this size (bounded per-request memory)
+_STREAM_PIECE_SIZE = 64 * 1024
+
+# /info bodies keyed by a 128-bit BLAKE2b of the container bytes. Filled from
+# threadpool workers, hence the lock.
+_INFO_CACHE_MAX_ENTRIES = 64
+_info_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+_info_cache_lock = threading.Lock()
+
+
+def _decode_h4mk_hex(h4mk: str) -> Union[bytes, Response]:
+    """
+    Decode the hex-encoded container query parameter.
+
+    Uses binascii.a2b_hex (C-level, no intermediate copies) and rejects
+    oversized payloads up front.
+
+    Returns:
+        Container bytes, or an error Response (413/400)
+    """
+    if len(h4mk) > 2 * _MAX_H4MK_BYTES:
+        return Response(content="H4MK payload too large", status_code=413)
+    try:
+        return binascii.a2b_hex(h4mk)
+    except (binascii.Error, ValueError):
+        return Response(content="Invalid hex encoding", status_code=400)
+
 
 def parse_range_header(range_header: str, total_size: int) -> tuple[int, int]:
     """
@@ -64,6 +104,115 @@ def parse_range_header(range_header: str, total_size: int) -> tuple[int, int]:
     return start, min(end, total_size)
 
 
+def _load_reader(h4mk: str, verify_crc: bool = False) -> Union[H4MKReader, Response]:
+    """
+    Decode and parse the hex container parameter, or an error Response.
+
+    verify_crc=True CRC-checks every chunk up front; use it on paths that
+    serve payload bytes back to the client.
+    """
+    h4mk_data = _decode_h4mk_hex(h4mk)
+    if isinstance(h4mk_data, Response):
+        return h4mk_data
+
+    try:
+        return H4MKReader(h4mk_data, verify_crc=verify_crc)
+    except ValueError as e:
+        return Response(content=f"Invalid H4MK: {e}", status_code=400)
+
+
+def _container_info_body(h4mk: str) -> Union[bytes, Response]:
+    """
+    Serialized /info body for a hex container, cached per container content.
+
+    Dashboards poll /info with the same container; a hit skips parsing,
+    CRC checks, integrity verification and serialization entirely.
+    """
+    h4mk_data = _decode_h4mk_hex(h4mk)
+    if isinstance(h4mk_data, Response):
+        return h4mk_data
+
+    key = hashlib.blake2b(h4mk_data, digest_size=16).digest()
+    with _info_cache_lock:
+        body = _info_cache.get(key)
+        if body is not None:
+            _info_cache.move_to_end(key)
+            return body
+
+    try:
+        reader = H4MKReader(h4mk_data)
+    except ValueError as e:
+        return Response(content=f"Invalid H4MK: {e}", status_code=400)
+
+    chunks_info = {}
+    for tag, chunks in reader.chunks.items():
+        tag_str = tag.decode("utf-8", errors="ignore")
+        chunks_info[tag_str] = [
+            {"offset": c.offset, "size": c.size, "crc": f"{c.crc:08x}"}
+            for c in chunks
+        ]
+
+    response = {
+        "chunks": chunks_info,
+        "metadata": reader.get_metadata(),
+        "integrity": reader.verify_integrity(),
+    }
+    # META "raw" is bytes; emit it as hex rather than failing to serialize
+    body = orjson.dumps(response, default=bytes.hex, option=orjson.OPT_INDENT_2)
+
+    with _info_cache_lock:
+        _info_cache[key] = body
+        while len(_info_cache) > _INFO_CACHE_MAX_ENTRIES:
+            _info_cache.popitem(last=False)
+    return body
+
+
+async def _iter_chunk_range(
+    chunks: Sequence[Union[bytes, memoryview]], start: int, end: int
+) -> AsyncIterator[bytes]:
+    """
+    Yield bytes [start, end) of the concatenation of chunks in pieces of at
+    most _STREAM_PIECE_SIZE, without ever building the concatenation.
+
+    Binary-searches the cumulative chunk ends for the first chunk that
+    overlaps start, then walks forward through the overlapping windows.
+    Zero-length chunks are skipped; an empty range yields nothing.
+    """
+    if start >= end:
+        return
+    ends = list(accumulate(len(c) for c in chunks))
+    i = bisect_right(ends, start)
+    pos = ends[i] - len(chunks[i])  # absolute offset of chunks[i]
+    while pos < end:
+        chunk = memoryview(chunks[i])
+        lo = max(start - pos, 0)
+        hi = min(end - pos, len(chunk))
+        for off in range(lo, hi, _STREAM_PIECE_SIZE):
+            yield bytes(chunk[off : min(off + _STREAM_PIECE_SIZE, hi)])
+        pos += len(chunk)
+        i += 1
+
+
+def _core_range_response(
+    core_chunks: Sequence[Union[bytes, memoryview]], start: int, end: int, total_size: int
+) -> StreamingResponse:
+    """
+    Stream CORE bytes [start, end): 200 OK for the whole payload (cacheable),
+    206 Partial Content with Content-Range otherwise.
+    """
+    headers = {"Accept-Ranges": "bytes", "Content-Length": str(end - start)}
+    status_code = 200
+    if start != 0 or end != total_size:
+        headers["Content-Range"] = f"bytes {start}-{end-1}/{total_size}"
+        status_code = 206
+    return StreamingResponse(
+        _iter_chunk_range(core_chunks, start, end),
+        status_code=status_code,
+        media_type="application/octet-stream",
+        headers=headers,
+    )
+
+
 @router.get("/range", response_class=Response)
 async def range_stream(
     h4mk: str = Query(..., description="H4MK container as hex string"),
@@ -91,33 +240,22 @@ async def range_stream(
         # Last 512 bytes
         GET /video/range?h4mk=48344d4b... -H "Range: bytes=-512"
     """
-    try:
-        # Decode hex container
-        h4mk_data = bytes.fromhex(h4mk)
-    except ValueError:
-        return Response(content="Invalid hex encoding", status_code=400)
-
-    try:
-        reader = H4MKReader(h4mk_data)
-    except ValueError as e:
-        return Response(content=f"Invalid H4MK: {e}", status_code=400)
+    # Hex decode + chunk walk/CRC checks are CPU-bound: keep them off the loop
+    reader = await run_in_threadpool(_load_reader, h4mk, True)
+    if isinstance(reader, Response):
+        return reader
 
-    # Get CORE payload
-    core_chunks = reader.get_chunks(b"CORE")
+    # CORE payloads as zero-copy windows; only the requested range is copied
+    core_chunks = reader.get_chunk_views(b"CORE")
     if not core_chunks:
         return Response(content="No CORE chunk", status_code=400)
 
-    core_data = b"".join(core_chunks)
-    total_size = len(core_data)
+    total_size = sum(c.size for c in reader.chunks[b"CORE"])
 
     # Handle Range header
     if not range:
         # Full file
-        return Response(
-            content=core_data,
-            status_code=200,
-            headers={"Accept-Ranges": "bytes"},
-        )
+        return _core_range_response(core_chunks, 0, total_size, total_size)
 
     try:
         start, end = parse_range_header(range, total_size)
@@ -128,17 +266,9 @@ async def range_stream(
             headers={"Content-Range": f"bytes */{total_size}"},
         )
 
-    # Partial content
-    partial_data = core_data[start:end]
-    return Response(
-        content=partial_data,
-        status_code=206,
-        headers={
-            "Content-Range": f"bytes {start}-{end-1}/{total_size}",
-            "Accept-Ranges": "bytes",
-            "Content-Length": str(len(partial_data)),
-        },
-    )
+    # "bytes=0-" (or an explicit 0..size-1 range) asks for the whole file and
+    # gets a 200 so HTTP caches/CDNs can store it (206s are mostly uncached)
+    return _core_range_response(core_chunks, start, end, total_size)
 
 
 @router.get("/seek", response_class=Response)
@@ -169,23 +299,21 @@ async def seek_lookup(
             "message": "Keyframe at PTS 1000000us, offset 12345 bytes"
         }
     """
-    try:
-        h4mk_data = bytes.fromhex(h4mk)
-    except ValueError:
-        return Response(content="Invalid hex encoding", status_code=400)
-
-    try:
-        reader = H4MKReader(h4mk_data)
-    except ValueError as e:
-        return Response(content=f"Invalid H4MK: {e}", status_code=400)
+    # Hex decode + chunk walk/CRC checks are CPU-bound: keep them off the loop
+    reader = await run_in_threadpool(_load_reader, h4mk)
+    if isinstance(reader, Response):
+        return reader
 
     entry = reader.seek_to_pts(pts)
     if not entry:
         return Response(content="No keyframe found before that PTS", status_code=404)
 
     return Response(
-        content=f'{{"pts": {entry.pts}, "offset": {entry.offset}, "message": '
-        f'"Keyframe at PTS {entry.pts}us, offset {entry.offset} bytes"}}',
+        content=orjson.dumps({
+            "pts": entry.pts,
+            "offset": entry.offset,
+            "message": f"Keyframe at PTS {entry.pts}us, offset {entry.offset} bytes",
+        }),
         status_code=200,
         media_type="application/json",
     )
@@ -220,38 +348,8 @@ async def container_info(
             "integrity": true
         }
     """
-    try:
-        h4mk_data = bytes.fromhex(h4mk)
-    except ValueError:
-        return Response(content="Invalid hex encoding", status_code=400)
-
-    try:
-        reader = H4MKReader(h4mk_data)
-    except ValueError as e:
-        return Response(content=f"Invalid H4MK: {e}", status_code=400)
-
-    # Build response
-    chunks_info = {}
-    for tag, chunks in reader.chunks.items():
-        tag_str = tag.decode("utf-8", errors="ignore")
-        chunks_info[tag_str] = [
-            {"offset": c.offset, "size": c.size, "crc": f"{c.crc:08x}"}
-            for c in chunks
-        ]
-
-    metadata = reader.get_metadata()
-    integrity = reader.verify_integrity()
-
-    response = {
-        "chunks": chunks_info,
-        "metadata": metadata,
-        "integrity": integrity,
-    }
-
-    import json
+    body = await run_in_threadpool(_container_info_body, h4mk)
+    if isinstance(body, Response):
+        return body
 
-    return Response(
-        content=json.dumps(response, indent=2),
-        status_code=200,
-        media_type="application/json",
-    )
+    return Response(content=body, status_code=200, media_type="application/json")
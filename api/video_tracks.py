@@ -4,40 +4,144 @@ Video tracks API: manifest, seek, block fetch endpoints.
 
 from __future__ import annotations
 from fastapi import APIRouter, UploadFile, Query
-from fastapi.responses import JSONResponse, Response
-import base64
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+import hashlib
+import io
 import json
+import mmap
+import orjson
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
 
 from container.reader import H4MKReader
-from container.multitrack import unpack_seek_multi
+from container.multitrack import seek_keyframe, track_index_payloads, trak_records, unpack_seek_multi
 
 router = APIRouter(prefix="/video", tags=["video-tracks"])
 
+# Parsed META/SEKM/manifest memo shared by the endpoints below. Keys are
+# digests of the (untrusted) chunk payloads, never the payloads themselves,
+# and the total payload bytes behind live entries is bounded.
+_PARSE_CACHE_MAX_ENTRIES = 128
+_PARSE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+_parse_cache: "OrderedDict[bytes, Tuple[Any, int]]" = OrderedDict()
+_parse_cache_bytes = 0
+_parse_cache_lock = threading.Lock()
 
-@router.post("/manifest")
-async def video_manifest(file: UploadFile):
+
+def _json_response(body: Dict[str, Any], status_code: int = 200) -> Response:
+    """JSON response serialized with orjson (bytes straight to the wire)."""
+    return Response(
+        content=orjson.dumps(body), status_code=status_code, media_type="application/json"
+    )
+
+
+@contextmanager
+def _upload_buffer(file: UploadFile) -> Iterator[Union[bytes, mmap.mmap]]:
     """
-    Get manifest for uploaded H4MK video file.
-    Returns: container type, meta, tracks, seek table, trak index, core block count.
+    Expose an upload to H4MKReader without copying it into a bytes object.
+
+    Uploads that Starlette has spooled to disk are memory-mapped read-only
+    (slicing an mmap yields per-chunk bytes, so the reader works unchanged).
+    Small in-memory uploads are read as before.
+    """
+    spooled = file.file
+    spooled.seek(0)
+    mm = None
+    if getattr(spooled, "_rolled", True):
+        try:
+            mm = mmap.mmap(spooled.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, io.UnsupportedOperation):
+            mm = None  # empty or not file-backed; fall back to a read
+    try:
+        yield mm if mm is not None else spooled.read()
+    finally:
+        if mm is not None:
+            mm.close()
+
+
+def _memoized(kind: bytes, parts: Tuple[bytes, ...], build: Callable[[], Any]) -> Any:
+    """
+    Return build() memoized on a digest of kind + parts.
+
+    Entries are charged their payload length (a proxy for the size of the
+    parsed result); results for payloads larger than the whole byte budget
+    are built but not cached.
+    """
+    global _parse_cache_bytes
+
+    h = hashlib.blake2b(kind, digest_size=16)
+    for part in parts:
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+    key = h.digest()
+
+    with _parse_cache_lock:
+        hit = _parse_cache.get(key)
+        if hit is not None:
+            _parse_cache.move_to_end(key)
+            return hit[0]
+
+    value = build()
+    size = sum(map(len, parts))
+    if size > _PARSE_CACHE_MAX_BYTES:
+        return value
+
+    with _parse_cache_lock:
+        if key not in _parse_cache:
+            _parse_cache[key] = (value, size)
+            _parse_cache_bytes += size
+        while (
+            len(_parse_cache) > _PARSE_CACHE_MAX_ENTRIES
+            or _parse_cache_bytes > _PARSE_CACHE_MAX_BYTES
+        ):
+            _, (_, evicted) = _parse_cache.popitem(last=False)
+            _parse_cache_bytes -= evicted
+    return value
+
+
+def _unpack_seekm(seekm: bytes) -> Dict[str, List[Tuple[int, int]]]:
+    """Unpack a SEEKM payload, memoized so repeated seeks skip the unpack."""
+    if not seekm:
+        return {}
+    return _memoized(b"SEKM", (seekm,), lambda: unpack_seek_multi(seekm))
+
+
+def _parse_meta(meta_bytes: bytes) -> Dict[str, Any]:
     """
-    data = await file.read()
-    r = H4MKReader(data)
+    Parse a META chunk, memoized on a digest of its exact bytes.
 
-    meta_chunks = r.get_chunks(b"META")
-    safe_chunks = r.get_chunks(b"SAFE")
-    
-    if not meta_chunks or not safe_chunks:
-        return JSONResponse({"error": "missing META or SAFE chunk"}, status_code=400)
+    Dashboards poll the same container repeatedly; keying on the META
+    payload (not a header/size fingerprint) keeps distinct containers
+    from ever sharing an entry. Callers must treat the result as read-only.
+    """
+    return _memoized(b"META", (meta_bytes,), lambda: json.loads(meta_bytes.decode("utf-8")))
+
+
+def _parse_manifest(
+    meta_bytes: bytes, safe_bytes: bytes, seekm_bytes: bytes, trak_bytes: bytes
+) -> Dict[str, Any]:
+    """Build the manifest body (minus core_blocks) from META + SAFE + SEKM + TRAK, memoized."""
+    return _memoized(
+        b"MANIFEST",
+        (meta_bytes, safe_bytes, seekm_bytes, trak_bytes),
+        lambda: _build_manifest(meta_bytes, safe_bytes, seekm_bytes, trak_bytes),
+    )
 
-    meta = json.loads(meta_chunks[0].decode("utf-8"))
-    safe = json.loads(safe_chunks[0].decode("utf-8"))
 
-    seekm_b64 = meta.get("seekm_b64", "")
-    trak_b64 = meta.get("trak_b64", "")
-    seekm = unpack_seek_multi(base64.b64decode(seekm_b64)) if seekm_b64 else {}
-    trak = json.loads(base64.b64decode(trak_b64).decode("utf-8")) if trak_b64 else {}
+def _build_manifest(
+    meta_bytes: bytes, safe_bytes: bytes, seekm_bytes: bytes, trak_bytes: bytes
+) -> Dict[str, Any]:
+    """Uncached body of _parse_manifest."""
+    meta = _parse_meta(meta_bytes)
+    safe = json.loads(safe_bytes.decode("utf-8"))
 
-    return JSONResponse({
+    seekm = _unpack_seekm(seekm_bytes)
+    trak = trak_records(trak_bytes) if trak_bytes else []
+
+    return {
         "container": "H4MK",
         "meta": {k: v for k, v in meta.items() if k not in ("seekm_b64", "trak_b64")},
         "tracks": meta.get("tracks", []),
@@ -45,10 +149,29 @@ async def video_manifest(file: UploadFile):
             tid: [{"pts_us": int(p), "core_index": int(i)} for (p, i) in arr]
             for tid, arr in seekm.items()
         },
-        "trak": trak.get("trak", []),
+        "trak": trak,
         "safe": safe,
-        "core_blocks": len(r.get_chunks(b"CORE")),
-    })
+    }
+
+
+@router.post("/manifest")
+async def video_manifest(file: UploadFile):
+    """
+    Get manifest for uploaded H4MK video file.
+    Returns: container type, meta, tracks, seek table, trak index, core block count.
+    """
+    with _upload_buffer(file) as data:
+        r = await run_in_threadpool(H4MKReader, data)
+
+        meta_chunks = r.get_chunks(b"META")
+        safe_chunks = r.get_chunks(b"SAFE")
+
+        if not meta_chunks or not safe_chunks:
+            return _json_response({"error": "missing META or SAFE chunk"}, status_code=400)
+
+        seekm, trak = track_index_payloads(r, _parse_meta(meta_chunks[0]))
+        manifest = _parse_manifest(meta_chunks[0], safe_chunks[0], seekm, trak)
+        return _json_response({**manifest, "core_blocks": len(r.chunks.get(b"CORE", []))})
 
 
 @router.post("/seek_to_block")
@@ -61,41 +184,35 @@ async def seek_to_block(
     Seek to a keyframe for a specific track at or before pts_us.
     Returns: keyframe pts_us and corresponding core_index.
     """
-    data = await file.read()
-    r = H4MKReader(data)
-    
-    meta_chunks = r.get_chunks(b"META")
-    if not meta_chunks:
-        return JSONResponse({"error": "missing META chunk"}, status_code=400)
-    
-    meta = json.loads(meta_chunks[0].decode("utf-8"))
-    seekm_b64 = meta.get("seekm_b64", "")
-    seekm = unpack_seek_multi(base64.b64decode(seekm_b64)) if seekm_b64 else {}
-    entries = seekm.get(track_id, [])
-    
-    if not entries:
-        return JSONResponse({
+    with _upload_buffer(file) as data:
+        r = await run_in_threadpool(H4MKReader, data)
+
+        meta_chunks = r.get_chunks(b"META")
+        if not meta_chunks:
+            return _json_response({"error": "missing META chunk"}, status_code=400)
+
+        seekm_bytes, _ = track_index_payloads(r, _parse_meta(meta_chunks[0]))
+        seekm = _unpack_seekm(seekm_bytes)
+        entries = seekm.get(track_id, [])
+
+        if not entries:
+            return _json_response({
+                "track_id": track_id,
+                "pts_us": pts_us,
+                "found": False,
+            })
+
+        # Last entry with pts <= target
+        chosen = seek_keyframe(entries, pts_us)
+
+        return _json_response({
             "track_id": track_id,
-            "pts_us": pts_us,
-            "found": False,
+            "pts_us": int(pts_us),
+            "keyframe_pts_us": int(chosen[0]),
+            "core_index": int(chosen[1]),
+            "found": True,
         })
 
-    # Find last entry with pts <= target
-    chosen = entries[0]
-    for e in entries:
-        if e[0] <= pts_us:
-            chosen = e
-        else:
-            break
-    
-    return JSONResponse({
-        "track_id": track_id,
-        "pts_us": int(pts_us),
-        "keyframe_pts_us": int(chosen[0]),
-        "core_index": int(chosen[1]),
-        "found": True,
-    })
-
 
 @router.post("/block")
 async def get_core_block(
@@ -107,20 +224,15 @@ async def get_core_block(
     Fetch a CORE block by index.
     If decompress=True, decompresses (if sealed); else returns raw CORE bytes.
     """
-    data = await file.read()
-    r = H4MKReader(data)
-    core = r.get_chunks(b"CORE")
-    
-    if core_index >= len(core):
-        return Response("core_index out of range", status_code=416)
-    
-    if not decompress:
-        return Response(content=core[core_index], media_type="application/octet-stream")
-    
-    # transparent decompress
-    blocks = list(r.iter_core_blocks(decompress=True))
-    if core_index >= len(blocks):
-        return Response("core_index out of range after decompress", status_code=416)
-    
-    block = blocks[core_index]
-    return Response(content=block, media_type="application/octet-stream")
+    with _upload_buffer(file) as data:
+        # Payload bytes go back to the client: reject CRC-corrupted containers
+        try:
+            r = await run_in_threadpool(H4MKReader, data, verify_crc=True)
+        except ValueError as e:
+            return Response(f"Invalid H4MK: {e}", status_code=422)
+        if core_index >= len(r.chunks.get(b"CORE", [])):
+            return Response("core_index out of range", status_code=416)
+
+        # raw CORE bytes, or transparent decompress of just this block
+        block = r.get_core_block(core_index, decompress=decompress)
+        return Response(content=block, media_type="application/octet-stream")
@@ -13,8 +13,28 @@ Usage:
 import argparse
 import sys
 from pathlib import Path
+from typing import List
 from container.reader import H4MKReader
 
+# CORE block size used by `export` when streaming raw input
+EXPORT_BLOCK_SIZE = 1024 * 1024
+
+# Reference engine block alignment: `export` zero-pads the final block up to
+# a multiple of this and records the unpadded size as META "orig_len"
+EXPORT_BLOCK_ALIGN = 256
+
+
+def _export_blocks(src, orig_len: int):
+    """Read orig_len bytes from src in EXPORT_BLOCK_SIZE blocks, last one padded."""
+    remaining = orig_len
+    while remaining > 0:
+        block = src.read(min(EXPORT_BLOCK_SIZE, remaining))
+        if not block:
+            raise OSError("input shrank while exporting")
+        remaining -= len(block)
+        short = -len(block) % EXPORT_BLOCK_ALIGN
+        yield block + bytes(short) if short else block
+
 
 def cmd_inspect(args) -> int:
     """
@@ -37,36 +57,39 @@ def cmd_inspect(args) -> int:
         print(f"Error: {e}", file=sys.stderr)
         return 1
 
-    print(f"📦 HarmonyØ4 Container: {path.name}")
-    print(f"   Size: {len(data) / 1024:.1f} KB")
-    print()
+    # Collect output and write it once (one syscall, not one per chunk/line)
+    out: List[str] = []
+    out.append(f"📦 HarmonyØ4 Container: {path.name}")
+    out.append(f"   Size: {len(data) / 1024:.1f} KB")
+    out.append("")
 
-    print("Chunks:")
+    out.append("Chunks:")
     for tag, chunks in sorted(reader.chunks.items()):
         tag_str = tag.decode("utf-8", errors="ignore")
         total_size = sum(c.size for c in chunks)
-        print(f"  {tag_str:4s}: {len(chunks):2d} chunk(s), {total_size:8d} bytes")
+        out.append(f"  {tag_str:4s}: {len(chunks):2d} chunk(s), {total_size:8d} bytes")
         for i, chunk in enumerate(chunks):
-            print(
+            out.append(
                 f"         [{i}] offset={chunk.offset:8d} size={chunk.size:8d} "
                 f"crc={chunk.crc:08x}"
             )
 
     meta = reader.get_metadata()
     if meta:
-        print()
-        print("Metadata:")
+        out.append("")
+        out.append("Metadata:")
         if "duration_us" in meta:
             dur_s = meta["duration_us"] / 1_000_000
-            print(f"  Duration: {dur_s:.2f}s ({meta['duration_us']} µs)")
+            out.append(f"  Duration: {dur_s:.2f}s ({meta['duration_us']} µs)")
         if "frame_count" in meta:
-            print(f"  Frames: {meta['frame_count']}")
+            out.append(f"  Frames: {meta['frame_count']}")
 
-    print()
+    out.append("")
     integrity = reader.verify_integrity()
     status = "✅ PASS" if integrity else "❌ FAIL"
-    print(f"Integrity: {status}")
+    out.append(f"Integrity: {status}")
 
+    sys.stdout.write("\n".join(out) + "\n")
     return 0
 
 
@@ -106,15 +129,17 @@ def cmd_seek(args) -> int:
         )
         return 1
 
-    # Show result
-    print(f"🎯 Seek to {target_pts} µs")
-    print(f"   Found: PTS {entry.pts} µs @ offset {entry.offset} bytes")
-    print()
-    print("Full SEEK table:")
+    # Show result (buffered: one write for the whole seek table)
+    out: List[str] = []
+    out.append(f"🎯 Seek to {target_pts} µs")
+    out.append(f"   Found: PTS {entry.pts} µs @ offset {entry.offset} bytes")
+    out.append("")
+    out.append("Full SEEK table:")
     for i, e in enumerate(seek_table):
         marker = " ← HERE" if e.pts == entry.pts else ""
-        print(f"   [{i:3d}] {e.pts:12d} µs @ offset {e.offset:8d} B{marker}")
+        out.append(f"   [{i:3d}] {e.pts:12d} µs @ offset {e.offset:8d} B{marker}")
 
+    sys.stdout.write("\n".join(out) + "\n")
     return 0
 
 
@@ -122,7 +147,8 @@ def cmd_export(args) -> int:
     """
     Export (build) H4MK container from raw media.
     
-    For demo purposes, wraps raw data into H4MK container.
+    For demo purposes, wraps raw data into H4MK container. The final block
+    is zero-padded to EXPORT_BLOCK_ALIGN; META "orig_len" holds the true size.
     """
     input_path = Path(args.input)
     if not input_path.exists():
@@ -131,33 +157,27 @@ def cmd_export(args) -> int:
 
     output_path = Path(args.output) if args.output else input_path.with_suffix(".h4mk")
 
-    try:
-        raw_data = input_path.read_bytes()
-    except IOError as e:
-        print(f"Error reading input: {e}", file=sys.stderr)
-        return 1
-
-    # Simple H4MK builder (demo)
-    from container.h4mk import H4MKBuilder
+    # Stream the input through the builder block by block, writing the
+    # container as it is produced: peak memory is one block, not 2x the file.
+    from container.h4mk import build_h4mk_stream
 
-    builder = H4MKBuilder()
+    size = 0
     try:
-        # Add raw data as CORE
-        builder.add_chunk(b"CORE", raw_data)
-        # Finalize (auto-computes hashes)
-        container = builder.finalize()
+        orig_len = input_path.stat().st_size
+        with open(input_path, "rb") as src, open(output_path, "wb") as out:
+            blocks = _export_blocks(src, orig_len)
+            meta = {"orig_len": orig_len}
+            for piece in build_h4mk_stream(blocks, [], meta, {}):
+                out.write(piece)
+                size += len(piece)
     except Exception as e:
-        print(f"Error building container: {e}", file=sys.stderr)
-        return 1
-
-    try:
-        output_path.write_bytes(container)
-    except IOError as e:
-        print(f"Error writing output: {e}", file=sys.stderr)
+        # I/O and engine failures alike: never leave a partial container behind
+        print(f"Error exporting container: {e}", file=sys.stderr)
+        output_path.unlink(missing_ok=True)
         return 1
 
     print(f"✅ Exported to {output_path}")
-    print(f"   Size: {len(container) / 1024:.1f} KB")
+    print(f"   Size: {size / 1024:.1f} KB")
 
     return 0
 
@@ -5,90 +5,81 @@ CLI tools for HarmonyØ4 video transport.
 from __future__ import annotations
 import argparse
 import json
-import base64
 import sys
 
+import orjson
+
 from container.reader import H4MKReader
-from container.multitrack import unpack_seek_multi
+from container.multitrack import seek_keyframe, track_index_payloads, unpack_seek_multi
 
 
 def cmd_manifest(args):
     """Print manifest of H4MK video file."""
-    data = open(args.file, "rb").read()
-    r = H4MKReader(data)
-
-    meta_chunks = r.get_chunks(b"META")
-    if not meta_chunks:
-        print("error: no META chunk", file=sys.stderr)
-        return 1
+    # memory-mapped; payloads paged in on demand, mapping closed on exit
+    with H4MKReader.from_path(args.file) as r:
+        meta_chunks = r.get_chunks(b"META")
+        if not meta_chunks:
+            print("error: no META chunk", file=sys.stderr)
+            return 1
 
-    meta = json.loads(meta_chunks[0].decode("utf-8"))
-    seekm_b64 = meta.get("seekm_b64", "")
-    seekm = unpack_seek_multi(base64.b64decode(seekm_b64)) if seekm_b64 else {}
+        meta = json.loads(meta_chunks[0].decode("utf-8"))
+        seekm_bytes, _ = track_index_payloads(r, meta)
+        seekm = unpack_seek_multi(seekm_bytes) if seekm_bytes else {}
 
-    print(json.dumps({
-        "tracks": meta.get("tracks", []),
-        "compression": meta.get("compression", {}),
-        "seek_tracks": list(seekm.keys()),
-        "core_blocks": len(r.get_chunks(b"CORE")),
-    }, indent=2))
-    return 0
+        print(orjson.dumps({
+            "tracks": meta.get("tracks", []),
+            "compression": meta.get("compression", {}),
+            "seek_tracks": list(seekm.keys()),
+            "core_blocks": len(r.chunks.get(b"CORE", [])),
+        }, option=orjson.OPT_INDENT_2).decode("utf-8"))
+        return 0
 
 
 def cmd_seek(args):
     """Seek to a keyframe in a specific track."""
-    data = open(args.file, "rb").read()
-    r = H4MKReader(data)
-
-    meta_chunks = r.get_chunks(b"META")
-    if not meta_chunks:
-        print("error: no META chunk", file=sys.stderr)
-        return 1
-
-    meta = json.loads(meta_chunks[0].decode("utf-8"))
-    seekm_b64 = meta.get("seekm_b64", "")
-    seekm = unpack_seek_multi(base64.b64decode(seekm_b64)) if seekm_b64 else {}
-    entries = seekm.get(args.track, [])
-
-    if not entries:
-        print(f"error: no seek entries for track '{args.track}'", file=sys.stderr)
-        return 1
-
-    chosen = entries[0]
-    for e in entries:
-        if e[0] <= args.pts_us:
-            chosen = e
-        else:
-            break
+    # memory-mapped; payloads paged in on demand, mapping closed on exit
+    with H4MKReader.from_path(args.file) as r:
+        meta_chunks = r.get_chunks(b"META")
+        if not meta_chunks:
+            print("error: no META chunk", file=sys.stderr)
+            return 1
 
-    print(f"track={args.track} pts_us={args.pts_us} -> "
-          f"keyframe_pts_us={chosen[0]} core_index={chosen[1]}")
-    return 0
+        meta = json.loads(meta_chunks[0].decode("utf-8"))
+        seekm_bytes, _ = track_index_payloads(r, meta)
+        seekm = unpack_seek_multi(seekm_bytes) if seekm_bytes else {}
+        entries = seekm.get(args.track, [])
 
+        if not entries:
+            print(f"error: no seek entries for track '{args.track}'", file=sys.stderr)
+            return 1
 
-def cmd_block(args):
-    """Fetch and save a CORE block."""
-    data = open(args.file, "rb").read()
-    r = H4MKReader(data)
+        chosen = seek_keyframe(entries, args.pts_us)
+
+        print(f"track={args.track} pts_us={args.pts_us} -> "
+              f"keyframe_pts_us={chosen[0]} core_index={chosen[1]}")
+        return 0
 
-    if args.raw:
-        core = r.get_chunks(b"CORE")
-        if args.index >= len(core):
-            print(f"error: core_index {args.index} out of range", file=sys.stderr)
-            return 1
-        block = core[args.index]
-        open(args.output or "block.bin", "wb").write(block)
-        print(f"wrote {args.output or 'block.bin'} (raw CORE bytes, {len(block)} bytes)")
-    else:
-        blocks = list(r.iter_core_blocks(decompress=True))
-        if args.index >= len(blocks):
-            print(f"error: core_index {args.index} out of range", file=sys.stderr)
-            return 1
-        block = blocks[args.index]
-        open(args.output or "block.bin", "wb").write(block)
-        print(f"wrote {args.output or 'block.bin'} (decompressed, {len(block)} bytes)")
 
-    return 0
+def cmd_block(args):
+    """Fetch and save a CORE block."""
+    # memory-mapped; payloads paged in on demand, mapping closed on exit
+    with H4MKReader.from_path(args.file) as r:
+        if args.raw:
+            if not 0 <= args.index < len(r.chunks.get(b"CORE", [])):
+                print(f"error: core_index {args.index} out of range", file=sys.stderr)
+                return 1
+            block = r.get_core_block(args.index, decompress=False)
+            open(args.output or "block.bin", "wb").write(block)
+            print(f"wrote {args.output or 'block.bin'} (raw CORE bytes, {len(block)} bytes)")
+        else:
+            if not 0 <= args.index < len(r.chunks.get(b"CORE", [])):
+                print(f"error: core_index {args.index} out of range", file=sys.stderr)
+                return 1
+            block = r.get_core_block(args.index, decompress=True)
+            open(args.output or "block.bin", "wb").write(block)
+            print(f"wrote {args.output or 'block.bin'} (decompressed, {len(block)} bytes)")
+
+        return 0
 
 
 def main():
@@ -5,23 +5,28 @@ Runtime selection: open reference or closed core.
 
 - GitHub users get reference (fully auditable)
 - Production gets core (if HARMONY4_CORE_PATH set)
+- HARMONY4_REF_ENGINE=rans selects the rANS entropy-coding reference
 - Same API, same container, same outputs
 - Deterministic in both cases
 """
 
 from __future__ import annotations
 import os
+import mmap
 import logging
+import threading
 from typing import Optional
 from compression.api import CompressionEngine
 from compression.geo_ref import GeometricReferenceCompressor
+from compression.rans_ref import RansReferenceCompressor
 from compression.loader import CoreCompression, BinaryCoreMissing
-from compression.attest import attest, verify_attestation
+from compression.attest import attest, attest_batch, verify_attestation
 
 logger = logging.getLogger(__name__)
 
 
 _engine: Optional[CompressionEngine] = None
+_engine_lock = threading.Lock()
 
 
 def load_engine() -> CompressionEngine:
@@ -30,30 +35,46 @@ def load_engine() -> CompressionEngine:
     
     Tries in order:
     1. Binary core at HARMONY4_CORE_PATH (if set)
-    2. Reference engine (always available)
+    2. Reference engine (always available; RLE, or rANS if
+       HARMONY4_REF_ENGINE=rans)
     
     Returns:
         Compression engine ready to use
     """
     global _engine
 
+    # Fast path: no lock once loaded
     if _engine is not None:
         return _engine
 
+    # Double-checked: concurrent cold-start callers build the engine once
+    with _engine_lock:
+        if _engine is None:
+            _engine = _build_engine()
+    return _engine
+
+
+def _build_engine() -> CompressionEngine:
+    """Construct the engine selected by HARMONY4_CORE_PATH (or the reference)."""
     # Try binary core first
     core_path = os.getenv("HARMONY4_CORE_PATH")
     if core_path:
         try:
-            _engine = CoreCompression(core_path)
+            engine = CoreCompression(core_path)
             logger.info(f"✅ Loaded binary core: {core_path}")
-            return _engine
+            return engine
         except BinaryCoreMissing as e:
             logger.warning(f"Binary core not found, using reference: {e}")
 
     # Fall back to reference
-    _engine = GeometricReferenceCompressor()
+    if os.getenv("HARMONY4_REF_ENGINE", "rle").lower() == "rans":
+        engine = RansReferenceCompressor()
+        logger.info("✅ Loaded rANS reference compressor (open source)")
+        return engine
+
+    engine = GeometricReferenceCompressor()
     logger.info("✅ Loaded reference compressor (open source)")
-    return _engine
+    return engine
 
 
 def get_engine() -> CompressionEngine:
@@ -76,6 +97,41 @@ def decompress(data: bytes) -> bytes:
     return get_engine().decompress(data)
 
 
+def _map_file(path):
+    """Open path and map it read-only (empty files map to b"")."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def compress_path(path) -> bytes:
+    """
+    Compress a file using loaded engine, without reading it into memory.
+
+    The file is memory-mapped read-only and handed to the engine as a
+    memoryview, so pages are faulted in on demand instead of copied.
+    """
+    mm = _map_file(path)
+    try:
+        with memoryview(mm) as view:
+            return get_engine().compress(view)
+    finally:
+        if isinstance(mm, mmap.mmap):
+            mm.close()
+
+
+def decompress_path(path) -> bytes:
+    """Decompress a file using loaded engine (memory-mapped, see compress_path)."""
+    mm = _map_file(path)
+    try:
+        with memoryview(mm) as view:
+            return get_engine().decompress(view)
+    finally:
+        if isinstance(mm, mmap.mmap):
+            mm.close()
+
+
 def engine_info() -> dict:
     """Get current engine metadata."""
     return get_engine().info()
@@ -84,4 +140,5 @@ def engine_info() -> dict:
 def reset_engine():
     """Reset engine (for testing)."""
     global _engine
-    _engine = None
+    with _engine_lock:
+        _engine = None
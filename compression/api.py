@@ -12,7 +12,7 @@ This interface NEVER changes once published.
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List
 
 
 class CompressionEngine(ABC):
@@ -46,6 +46,21 @@ class CompressionEngine(ABC):
         """
         pass
 
+    def compress_many(self, datas: Iterable[bytes]) -> List[bytes]:
+        """
+        Compress independent buffers, results in input order.
+        
+        Default is sequential; engines that can compress concurrently
+        (e.g. GIL-releasing native cores) may override.
+        
+        Args:
+            datas: Raw byte buffers to compress
+            
+        Returns:
+            Compressed bytes for each input (same as compress() per item)
+        """
+        return [self.compress(d) for d in datas]
+
     @abstractmethod
     def decompress(self, data: bytes) -> bytes:
         """
@@ -13,8 +13,39 @@ SAFETY:
 """
 
 import hashlib
+import os
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+
+
+def _engine_identity() -> Tuple[str, str, str, bool]:
+    """Return (engine_id, fingerprint, engine, sealed) of the active engine."""
+    # Avoid circular import by importing late
+    from compression import get_engine
+
+    engine_info = get_engine().info()
+    return (
+        engine_info.get("engine_id", "unknown"),
+        engine_info.get("fingerprint", "unknown"),
+        engine_info.get("engine", "unknown"),
+        bool(engine_info.get("sealed", False)),
+    )
+
+
+def _attestation_hasher(msg: bytes = b""):
+    """
+    New hash object for attestation messages.
+
+    SHA-256 by default; HARMONY4_ATTEST_HASH=blake2b selects BLAKE2b-256.
+    """
+    if os.getenv("HARMONY4_ATTEST_HASH", "sha256").lower() == "blake2b":
+        return hashlib.blake2b(msg, digest_size=32)
+    return hashlib.sha256(msg)
+
+
+def _attestation_digest(msg: bytes) -> str:
+    """Hash an attestation message (hex digest)."""
+    return _attestation_hasher(msg).hexdigest()
 
 
 def attest() -> Dict[str, Any]:
@@ -45,27 +76,56 @@ def attest() -> Dict[str, Any]:
             'sealed': True
         }
     """
-    # Avoid circular import by importing late
-    from compression import get_engine
-    
-    engine_info = get_engine().info()
+    engine_id, fingerprint, engine, sealed = _engine_identity()
     
     timestamp_unix = int(time.time())
     
     # Attestation message: engine_id | fingerprint | timestamp
-    msg = f"{engine_info.get('engine_id', 'unknown')}|{engine_info.get('fingerprint', 'unknown')}|{timestamp_unix}"
-    attestation_hash = hashlib.sha256(msg.encode()).hexdigest()
+    msg = b"|".join((engine_id.encode(), fingerprint.encode(), str(timestamp_unix).encode()))
+    attestation_hash = _attestation_digest(msg)
     
     return {
-        "engine_id": engine_info.get("engine_id", "unknown"),
-        "fingerprint": engine_info.get("fingerprint", "unknown"),
+        "engine_id": engine_id,
+        "fingerprint": fingerprint,
         "timestamp_unix": timestamp_unix,
         "attestation_hash": attestation_hash,
-        "sealed": bool(engine_info.get("sealed", False)),
-        "engine": engine_info.get("engine", "unknown"),
+        "sealed": sealed,
+        "engine": engine,
     }
 
 
+def attest_batch(n: int) -> List[Dict[str, Any]]:
+    """
+    Generate n attestations sharing one engine lookup and one hash state.
+
+    Item i hashes "engine_id|fingerprint|timestamp|i\n" appended to every
+    earlier item, so each attestation_hash also commits to its
+    predecessors in the batch. Per-item digests come from copies of the
+    running hash state rather than fresh hash objects.
+
+    Returns:
+        List of attestation dicts (attest() fields plus batch_index)
+    """
+    engine_id, fingerprint, engine, sealed = _engine_identity()
+    timestamp_unix = int(time.time())
+    prefix = b"|".join((engine_id.encode(), fingerprint.encode(), str(timestamp_unix).encode()))
+
+    h = _attestation_hasher()
+    batch = []
+    for i in range(n):
+        h.update(b"%s|%d\n" % (prefix, i))
+        batch.append({
+            "engine_id": engine_id,
+            "fingerprint": fingerprint,
+            "timestamp_unix": timestamp_unix,
+            "attestation_hash": h.copy().hexdigest(),
+            "sealed": sealed,
+            "engine": engine,
+            "batch_index": i,
+        })
+    return batch
+
+
 def verify_attestation(attestation: Dict[str, Any]) -> bool:
     """
     Verify that an attestation matches current engine state.
@@ -83,10 +143,11 @@ def verify_attestation(attestation: Dict[str, Any]) -> bool:
     if not all(k in attestation for k in required_fields):
         raise ValueError(f"Attestation missing required fields: {required_fields}")
     
-    current = attest()
+    # Identity comparison only; no need to re-hash a fresh attestation
+    engine_id, fingerprint, _, _ = _engine_identity()
     
     # Match engine_id and fingerprint
     return (
-        attestation["engine_id"] == current["engine_id"] and
-        attestation["fingerprint"] == current["fingerprint"]
+        attestation["engine_id"] == engine_id and
+        attestation["fingerprint"] == fingerprint
     )
@@ -11,7 +11,10 @@ Key property: Same API, different implementations, output always deterministic &
 
 from __future__ import annotations
 import struct
-from typing import List, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Tuple
+
+import numpy as np
 from compression.api import CompressionEngine
 
 
@@ -29,22 +32,25 @@ def compress_rle_delta(data: bytes) -> bytes:
     if not data:
         return b""
 
-    out = bytearray()
-    i = 0
+    a = np.frombuffer(data, dtype=np.uint8)
 
-    while i < len(data):
-        # Find run length
-        val = data[i]
-        run_len = 1
-        while i + run_len < len(data) and data[i + run_len] == val and run_len < 255:
-            run_len += 1
+    # Run starts: index 0 plus every position whose byte differs from the last
+    change = np.empty(a.size, dtype=bool)
+    change[0] = True
+    np.not_equal(a[1:], a[:-1], out=change[1:])
+    starts = np.flatnonzero(change)
+    lens = np.diff(np.append(starts, a.size))
+    vals = a[starts]
 
-        # Encode: value + run_length
-        out.append(val)
-        out.append(run_len)
-        i += run_len
+    # Runs longer than 255 split greedily: 255, 255, ..., remainder
+    pieces = (lens + 254) // 255
+    out = np.empty((int(pieces.sum()), 2), dtype=np.uint8)
+    out[:, 0] = np.repeat(vals, pieces)
+    out[:, 1] = 255
+    out[np.cumsum(pieces) - 1, 1] = lens - (pieces - 1) * 255
 
-    return bytes(out)
+    # Encode: value + run_length pairs
+    return out.tobytes()
 
 
 def decompress_rle_delta(data: bytes) -> bytes:
@@ -54,13 +60,9 @@ def decompress_rle_delta(data: bytes) -> bytes:
     if not data:
         return b""
 
-    out = bytearray()
-    for i in range(0, len(data), 2):
-        val = data[i]
-        run_len = data[i + 1]
-        out.extend([val] * run_len)
-
-    return bytes(out)
+    # (value, run_length) pairs expanded in one C-level repeat
+    pairs = np.frombuffer(data, dtype=np.uint8).reshape(-1, 2)
+    return np.repeat(pairs[:, 0], pairs[:, 1]).tobytes()
 
 
 # ============================================================================
@@ -68,6 +70,18 @@ def decompress_rle_delta(data: bytes) -> bytes:
 # ============================================================================
 
 
+# Constant engine metadata, shared by every info() call (read-only)
+_REF_INFO: Mapping[str, Any] = MappingProxyType({
+    "engine": "geometric-reference",
+    "algorithm": "RLE+delta",
+    "basis": "DCT+delta (reference implementation)",
+    "deterministic": True,
+    "identity_safe": True,
+    "open_source": True,
+    "lossless": True,
+})
+
+
 class GeometricReferenceCompressor(CompressionEngine):
     """
     PUBLIC reference compression engine.
@@ -135,19 +149,11 @@ class GeometricReferenceCompressor(CompressionEngine):
         
         return decompress_rle_delta(data)
 
-    def info(self) -> dict:
+    def info(self) -> Dict[str, Any]:
         """
         Public metadata (NO secrets).
         
         Returns:
-            Safe info about engine
+            Safe info about engine (fresh dict copied from the shared constant)
         """
-        return {
-            "engine": "geometric-reference",
-            "algorithm": "RLE+delta",
-            "basis": "DCT+delta (reference implementation)",
-            "deterministic": True,
-            "identity_safe": True,
-            "open_source": True,
-            "lossless": True,
-        }
+        return dict(_REF_INFO)
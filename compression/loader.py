@@ -22,7 +22,12 @@ from __future__ import annotations
 import os
 import ctypes
 import hashlib
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
 from compression.api import CompressionEngine
 
 
@@ -32,6 +37,20 @@ class BinaryCoreMissing(Exception):
     pass
 
 
+def _buffer_arg(data) -> Tuple[Any, int]:
+    """
+    (c_void_p-compatible argument, byte length) for a bytes-like object.
+
+    bytes pass through as-is; other buffers (memoryview, mmap, bytearray)
+    are addressed in place via a zero-copy uint8 view, which also works
+    for read-only mappings that ctypes.from_buffer would reject.
+    """
+    if isinstance(data, bytes):
+        return data, len(data)
+    view = np.frombuffer(data, dtype=np.uint8)
+    return view.ctypes.data_as(ctypes.c_void_p), view.size
+
+
 class CoreCompression(CompressionEngine):
     """
     Loads and wraps binary compression core — SEALED & TAMPER-EVIDENT.
@@ -42,6 +61,10 @@ class CoreCompression(CompressionEngine):
     - h4_engine_id() → const char* (static engine identifier)
     - h4_engine_fp() → const unsigned char* (static 32-byte SHA256)
     
+    Optional caller-allocated output (used when both are exported):
+    - h4_compress_bound(input_len) → max compressed size
+    - h4_compress_into(input_ptr, input_len, output_ptr, output_cap) → output_len
+    
     SEALING CHECKS:
     - Verifies engine ID matches HARMONY4_ENGINE_ID (if set)
     - Verifies engine fingerprint matches HARMONY4_ENGINE_FP (if set)
@@ -94,9 +117,41 @@ class CoreCompression(CompressionEngine):
             self.lib.h4_free.argtypes = [ctypes.c_void_p]
             self.lib.h4_free.restype = None
 
+        # Optional: compress into a caller-owned buffer (no lib malloc/free)
+        self._compress_into = hasattr(self.lib, "h4_compress_into") and hasattr(
+            self.lib, "h4_compress_bound"
+        )
+        if self._compress_into:
+            self.lib.h4_compress_bound.argtypes = [ctypes.c_size_t]
+            self.lib.h4_compress_bound.restype = ctypes.c_size_t
+            self.lib.h4_compress_into.argtypes = [
+                ctypes.c_void_p,  # input buffer
+                ctypes.c_size_t,  # input length
+                ctypes.c_void_p,  # output buffer (caller-owned)
+                ctypes.c_size_t,  # output capacity
+            ]
+            self.lib.h4_compress_into.restype = ctypes.c_size_t
+        self._local = threading.local()  # per-thread output pointer / scratch
+
+        # Batch compression pool (ctypes drops the GIL during foreign calls)
+        self._workers = os.cpu_count() or 1
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
         # 🔐 SEAL VERIFICATION: Engine identity & fingerprint
         self._verify_seals(lib_path)
 
+        # Identity is fixed once sealed; build the public metadata once
+        self._info: Mapping[str, Any] = MappingProxyType({
+            "engine": "core",
+            "engine_id": self._engine_id,
+            "fingerprint": self._engine_fp,
+            "deterministic": True,
+            "identity_safe": True,
+            "opaque": True,
+            "sealed": True,
+        })
+
     def _verify_seals(self, lib_path: str) -> None:
         """
         Verify engine identity & fingerprint (tamper detection).
@@ -123,7 +178,8 @@ class CoreCompression(CompressionEngine):
         if hasattr(self.lib, "h4_engine_id"):
             try:
                 self.lib.h4_engine_id.restype = ctypes.c_char_p
-                engine_id = self.lib.h4_engine_id().decode() if self.lib.h4_engine_id() else None
+                raw_id = self.lib.h4_engine_id()
+                engine_id = raw_id.decode() if raw_id else None
             except Exception:
                 pass
 
@@ -180,9 +236,13 @@ class CoreCompression(CompressionEngine):
         Raises:
             RuntimeError: If compression fails
         """
-        out_ptr = ctypes.c_void_p()
+        data, length = _buffer_arg(data)  # no copy for memoryview / mmap input
+        if self._compress_into:
+            return self._compress_scratch(data, length)
+
+        out_ptr = self._out_ptr()
         try:
-            size = self.lib.h4_compress(data, len(data), ctypes.byref(out_ptr))
+            size = self.lib.h4_compress(data, length, ctypes.byref(out_ptr))
         except Exception as e:
             raise RuntimeError(f"Compression failed: {e}")
 
@@ -195,9 +255,56 @@ class CoreCompression(CompressionEngine):
         # Free if available
         if hasattr(self.lib, "h4_free"):
             self.lib.h4_free(out_ptr)
+        out_ptr.value = None  # don't leave a dangling pointer in the TLS slot
 
         return result
 
+    def compress_many(self, datas: Iterable[bytes]) -> List[bytes]:
+        """
+        Compress independent buffers concurrently across CPU cores.
+        
+        Each call into the core releases the GIL, so a thread pool
+        parallelizes compute-bound work. Output order matches input order.
+        """
+        datas = list(datas)
+        if len(datas) < 2 or self._workers < 2:
+            return [self.compress(d) for d in datas]
+
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self._workers, thread_name_prefix="h4core"
+                    )
+        return list(self._pool.map(self.compress, datas))
+
+    def _out_ptr(self) -> ctypes.c_void_p:
+        """Per-thread reusable output pointer slot, reset to NULL."""
+        out_ptr = getattr(self._local, "out_ptr", None)
+        if out_ptr is None:
+            out_ptr = self._local.out_ptr = ctypes.c_void_p()
+        out_ptr.value = None
+        return out_ptr
+
+    def _compress_scratch(self, data: Any, length: int) -> bytes:
+        """Compress into a reusable per-thread bytearray (h4_compress_into)."""
+        bound = self.lib.h4_compress_bound(length)
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None or len(scratch) < bound:
+            scratch = self._local.scratch = bytearray(max(bound, 1))
+
+        out = (ctypes.c_ubyte * len(scratch)).from_buffer(scratch)
+        try:
+            size = self.lib.h4_compress_into(data, length, out, len(scratch))
+        except Exception as e:
+            raise RuntimeError(f"Compression failed: {e}")
+        finally:
+            del out  # release the buffer export so scratch can be resized
+
+        if size == 0 or size > len(scratch):
+            raise RuntimeError("Compression returned empty result")
+        return bytes(memoryview(scratch)[:size])
+
     def decompress(self, data: bytes) -> bytes:
         """
         Decompress using binary core.
@@ -211,9 +318,10 @@ class CoreCompression(CompressionEngine):
         Raises:
             RuntimeError: If decompression fails
         """
-        out_ptr = ctypes.c_void_p()
+        data, length = _buffer_arg(data)  # no copy for memoryview / mmap input
+        out_ptr = self._out_ptr()
         try:
-            size = self.lib.h4_decompress(data, len(data), ctypes.byref(out_ptr))
+            size = self.lib.h4_decompress(data, length, ctypes.byref(out_ptr))
         except Exception as e:
             raise RuntimeError(f"Decompression failed: {e}")
 
@@ -226,27 +334,21 @@ class CoreCompression(CompressionEngine):
         # Free if available
         if hasattr(self.lib, "h4_free"):
             self.lib.h4_free(out_ptr)
+        out_ptr.value = None  # don't leave a dangling pointer in the TLS slot
 
         return result
 
-    def info(self) -> dict:
+    def info(self) -> Dict[str, Any]:
         """
         Public metadata with sealing information (NO algorithm details).
         
         Returns:
-            Safe info about core + seal status
+            Safe info about core + seal status (fresh dict copied from the
+            mapping built once at load)
             
         Safe to include in metadata:
         - engine_id: Public identifier (e.g., "h4core-geo-v1.2.3")
         - fingerprint: SHA256 of core binary (immutable proof)
         - sealed: Whether verification passed
         """
-        return {
-            "engine": "core",
-            "engine_id": self._engine_id,
-            "fingerprint": self._engine_fp,
-            "deterministic": True,
-            "identity_safe": True,
-            "opaque": True,
-            "sealed": True,
-        }
+        return dict(self._info)
@@ -0,0 +1,211 @@
+"""
+HarmonyØ4 rANS Reference Compressor
+
+PUBLIC, AUDITABLE entropy-coding reference engine.
+
+Static order-0 byte model + 8-bit-renormalizing rANS (range asymmetric
+numeral system). Deterministic and lossless like the RLE reference, but
+approaches the order-0 entropy of the input instead of relying on runs.
+
+Stream layout (big-endian):
+    ORIG_LEN u32 | FREQ 256 × u16 | STATE u32 | renormalization bytes
+"""
+
+from __future__ import annotations
+import struct
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
+
+import numpy as np
+from compression.api import CompressionEngine
+
+
+SCALE_BITS = 12
+SCALE = 1 << SCALE_BITS  # normalized frequency total
+RANS_L = 1 << 23  # lower bound of the normalized state interval [L, L << 8)
+
+_PRELUDE = struct.Struct(">I256HI")  # orig_len, freq table, final state
+
+
+# ============================================================================
+# Frequency Model
+# ============================================================================
+
+
+def normalize_freqs(data: bytes) -> np.ndarray:
+    """
+    Order-0 byte histogram scaled to sum exactly to SCALE.
+
+    Every byte value present in data keeps a frequency of at least 1.
+    Rounding excess is taken from the most frequent symbol (lowest byte
+    value on ties), so the table is a pure function of the input.
+    """
+    counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+    freqs = counts * SCALE // len(data)
+    freqs[(counts > 0) & (freqs == 0)] = 1
+
+    diff = SCALE - int(freqs.sum())
+    if diff > 0:
+        freqs[int(np.argmax(freqs))] += diff
+    while diff < 0:
+        freqs[int(np.argmax(freqs))] -= 1
+        diff += 1
+    return freqs
+
+
+def _cumulative(freqs: np.ndarray) -> np.ndarray:
+    """Exclusive prefix sum: cum[s] = sum(freqs[:s])."""
+    cum = np.zeros(256, dtype=np.int64)
+    np.cumsum(freqs[:-1], out=cum[1:])
+    return cum
+
+
+# ============================================================================
+# rANS Coding
+# ============================================================================
+
+
+def rans_encode(data: bytes) -> bytes:
+    """
+    Encode bytes with a static order-0 rANS model (deterministic, lossless).
+    """
+    if not data:
+        return b""
+
+    freqs = normalize_freqs(data)
+    freq_l = freqs.tolist()
+    cum_l = _cumulative(freqs).tolist()
+    # Renormalize while x >= x_max[s] so the update stays below L << 8
+    x_max = [((RANS_L >> SCALE_BITS) << 8) * f for f in freq_l]
+
+    out = bytearray()
+    x = RANS_L
+    # rANS is LIFO: encode last symbol first, decoder then runs forward
+    for s in reversed(data):
+        f = freq_l[s]
+        limit = x_max[s]
+        while x >= limit:
+            out.append(x & 0xFF)
+            x >>= 8
+        x = ((x // f) << SCALE_BITS) + (x % f) + cum_l[s]
+
+    out.reverse()
+    return _PRELUDE.pack(len(data), *freq_l, x) + bytes(out)
+
+
+def rans_decode(data: bytes) -> bytes:
+    """
+    Inverse of rans_encode (exact recovery).
+
+    Raises:
+        ValueError: If the stream is truncated or its model is malformed
+    """
+    if not data:
+        return b""
+    if len(data) < _PRELUDE.size:
+        raise ValueError("rANS stream shorter than its prelude")
+
+    fields = _PRELUDE.unpack_from(data)
+    n, x = fields[0], fields[-1]
+    freqs = np.array(fields[1:-1], dtype=np.int64)
+    if int(freqs.sum()) != SCALE:
+        raise ValueError("rANS frequency table does not sum to scale")
+
+    cum = _cumulative(freqs)
+    # slot → symbol lookup over the SCALE-wide cumulative range
+    slot_sym = np.repeat(np.arange(256, dtype=np.uint8), freqs).tolist()
+    freq_l = freqs.tolist()
+    cum_l = cum.tolist()
+
+    stream = data[_PRELUDE.size:]
+    pos = 0
+    mask = SCALE - 1
+    out = bytearray(n)
+    try:
+        for i in range(n):
+            slot = x & mask
+            s = slot_sym[slot]
+            out[i] = s
+            x = freq_l[s] * (x >> SCALE_BITS) + slot - cum_l[s]
+            while x < RANS_L:
+                x = (x << 8) | stream[pos]
+                pos += 1
+    except IndexError:
+        raise ValueError("rANS stream truncated")
+
+    if x != RANS_L or pos != len(stream):
+        raise ValueError("rANS stream corrupted")
+    return bytes(out)
+
+
+# ============================================================================
+# rANS Reference Compressor (Public, Auditable)
+# ============================================================================
+
+
+# Constant engine metadata, shared by every info() call (read-only)
+_RANS_INFO: Mapping[str, Any] = MappingProxyType({
+    "engine": "rans-reference",
+    "engine_id": "h4-rans-ref-o0-v1",
+    "algorithm": "rANS order-0",
+    "basis": "static byte histogram, 12-bit scale (reference implementation)",
+    "deterministic": True,
+    "identity_safe": True,
+    "open_source": True,
+    "lossless": True,
+})
+
+
+class RansReferenceCompressor(CompressionEngine):
+    """
+    PUBLIC entropy-coding reference engine.
+
+    Drop-in alternative to GeometricReferenceCompressor: same API, any
+    input length, output within a few bytes of the order-0 entropy plus
+    a fixed 520-byte prelude.
+
+    Example:
+        compressor = RansReferenceCompressor()
+        compressed = compressor.compress(raw_bytes)
+        assert compressor.decompress(compressed) == raw_bytes
+    """
+
+    def __init__(self, **kwargs):
+        """Takes kwargs for compatibility with production core; ignores them."""
+        pass
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        Compress bytes (deterministically).
+
+        Args:
+            data: Input bytes
+
+        Returns:
+            Compressed bytes (deterministic)
+        """
+        return rans_encode(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        """
+        Decompress bytes (exactly).
+
+        Args:
+            data: Compressed bytes
+
+        Returns:
+            Original bytes (exact match guaranteed)
+
+        Raises:
+            ValueError: If data is truncated or corrupted
+        """
+        return rans_decode(data)
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Public metadata (NO secrets).
+
+        Returns:
+            Safe info about engine (fresh dict copied from the shared constant)
+        """
+        return dict(_RANS_INFO)
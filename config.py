@@ -23,6 +23,9 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str | None = None
     AWS_ENDPOINT_URL: str | None = None  # MinIO / R2 / custom endpoints
 
+    # Uploads (in-memory spool threshold before spilling to a temp file)
+    UPLOAD_SPOOL_MAX_BYTES: int = Field(default=64 * 1024 * 1024)
+
     # CORS
     CORS_ALLOW_ORIGINS: str = Field(default="*")  # comma-separated
 
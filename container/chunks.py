@@ -11,6 +11,14 @@ from __future__ import annotations
 import struct
 from typing import Optional
 
+import numpy as np
+
+# Chunk routing header: track_id u16 | pts u64 | is_keyframe u8 | reserved u16
+_HDR = struct.Struct("<HQBH")
+_HDR_SIZE = _HDR.size  # 13
+# Same layout as a packed structured dtype, for batch (de)serialization
+_HDR_DTYPE = np.dtype([("tid", "<u2"), ("pts", "<u8"), ("key", "u1"), ("rsv", "<u2")])
+
 
 class CoreChunk:
     """
@@ -42,23 +50,17 @@ class CoreChunk:
         """
         Serialize chunk header (for tracking).
 
-        Format (18 bytes):
+        Format (13 bytes):
           track_id u16 (2) | pts u64 (8) | is_keyframe u8 (1) | reserved u16 (2)
         """
-        return struct.pack(
-            "<HQBH",
-            self.track_id,
-            self.pts,
-            1 if self.is_keyframe else 0,
-            0,
-        )
+        return _HDR.pack(self.track_id, self.pts, 1 if self.is_keyframe else 0, 0)
 
     @classmethod
     def deserialize_header(cls, data: bytes) -> dict:
         """Reconstruct header from bytes."""
-        if len(data) < 13:
+        if len(data) < _HDR_SIZE:
             raise ValueError("header too short")
-        track_id, pts, is_key, _ = struct.unpack("<HQBH", data[:13])
+        track_id, pts, is_key, _ = _HDR.unpack_from(data)
         return {
             "track_id": int(track_id),
             "pts": int(pts),
@@ -75,30 +77,90 @@ class CoreChunk:
 class ChunkStream:
     """
     Accumulates chunks for batch processing or muxing.
+
+    Routing fields are mirrored into parallel NumPy columns (pts, track,
+    keyframe flag, payload size) so filters scan compact arrays instead of
+    walking CoreChunk objects. Chunks must be added through add().
     """
 
+    _INITIAL_CAPACITY = 64
+
     def __init__(self):
         self.chunks: list[CoreChunk] = []
+        cap = self._INITIAL_CAPACITY
+        self._pts = np.empty(cap, dtype=np.int64)
+        self._track = np.empty(cap, dtype=np.int64)
+        self._key = np.empty(cap, dtype=bool)
+        self._size = np.empty(cap, dtype=np.int64)
 
     def add(self, chunk: CoreChunk) -> None:
         """Append a chunk."""
+        n = len(self.chunks)
+        if n == self._pts.size:
+            self._grow()
+        self._pts[n] = chunk.pts
+        self._track[n] = chunk.track_id
+        self._key[n] = chunk.is_keyframe
+        self._size[n] = len(chunk.payload)
         self.chunks.append(chunk)
 
+    def _grow(self) -> None:
+        """Double column capacity (amortized O(1) add)."""
+        cap = 2 * self._pts.size
+        for name in ("_pts", "_track", "_key", "_size"):
+            old = getattr(self, name)
+            new = np.empty(cap, dtype=old.dtype)
+            new[: old.size] = old
+            setattr(self, name, new)
+
+    def _select(self, mask: np.ndarray) -> list[CoreChunk]:
+        """Chunks at the True positions of a column mask, in order."""
+        chunks = self.chunks
+        return [chunks[i] for i in np.flatnonzero(mask).tolist()]
+
     def by_track(self, track_id: int) -> list[CoreChunk]:
         """Filter chunks by track ID."""
-        return [c for c in self.chunks if c.track_id == track_id]
+        return self._select(self._track[: len(self.chunks)] == track_id)
 
     def by_time_range(self, pts_min: int, pts_max: int) -> list[CoreChunk]:
         """Filter chunks by time range."""
-        return [c for c in self.chunks if pts_min <= c.pts <= pts_max]
+        pts = self._pts[: len(self.chunks)]
+        return self._select((pts >= pts_min) & (pts <= pts_max))
 
     def keyframes(self) -> list[CoreChunk]:
         """Return all keyframe chunks."""
-        return [c for c in self.chunks if c.is_keyframe]
+        return self._select(self._key[: len(self.chunks)])
 
     def total_size(self) -> int:
         """Sum of all payload sizes."""
-        return sum(len(c.payload) for c in self.chunks)
+        return int(self._size[: len(self.chunks)].sum())
+
+    def serialize_headers(self) -> bytes:
+        """
+        Serialize every chunk header in one pass.
+
+        Equivalent to concatenating serialize_header() over all chunks,
+        but built from the columns with a single NumPy copy.
+        """
+        n = len(self.chunks)
+        arr = np.empty(n, dtype=_HDR_DTYPE)
+        arr["tid"] = self._track[:n]
+        arr["pts"] = self._pts[:n]
+        arr["key"] = self._key[:n]
+        arr["rsv"] = 0
+        return arr.tobytes()
+
+    @staticmethod
+    def deserialize_headers(buf: bytes) -> np.ndarray:
+        """
+        View a serialize_headers() buffer as a structured array.
+
+        Fields: tid, pts, key, rsv. The returned array is read-only and
+        shares memory with buf.
+        """
+        if len(buf) % _HDR_SIZE:
+            raise ValueError("header buffer length is not a multiple of 13")
+        return np.frombuffer(buf, dtype=_HDR_DTYPE)
 
     def __len__(self) -> int:
         return len(self.chunks)
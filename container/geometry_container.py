@@ -2,38 +2,170 @@
 Geometry container integration for HarmonyØ4.
 Integrates geometry data into H4MK containers.
 """
-import json
+import hashlib
+import struct
+from functools import cached_property
 from typing import List, Dict, Any, Optional
-from geometry.spec import GeometryToken
+import numpy as np
+import orjson
+from geometry.spec import GeometryToken, GeometryTokenType
 from geometry.temporal import TemporalSequence, export_temporal_data
 
 
+# Binary token layout (GEOB), little-endian:
+#   N u32 | STRLEN u32 | type u8[N] | version u32[N] | bounds f64[N,3]
+#   | param_count u32[N] | param_tag u8[P] | param_value 8B[P]
+#   | JSON string table {"kind": [...], "uid": [...], "keys": [[...], ...]}
+# P = sum(param_count). param_tag says how to read each 8-byte slot:
+# f64 for floats, i64 for ints and bools, so values round-trip exactly.
+_GEOB_HDR = struct.Struct("<II")
+_TOKEN_TYPES = list(GeometryTokenType)
+_TOKEN_TYPE_CODES = {t: i for i, t in enumerate(_TOKEN_TYPES)}
+_PARAM_FLOAT, _PARAM_INT, _PARAM_BOOL = 0, 1, 2
+
+
+def _param_tag(value: Any) -> int:
+    """GEOB tag for one parameter value (bool before int: bool is an int)."""
+    if isinstance(value, bool):
+        return _PARAM_BOOL
+    if isinstance(value, int):
+        return _PARAM_INT
+    return _PARAM_FLOAT
+
+
+def serialize_tokens_bin(tokens: List[GeometryToken]) -> bytes:
+    """
+    Pack geometry tokens into the binary GEOB layout.
+
+    Numeric fields travel as raw IEEE-754 / integer columns; only the
+    strings (kind, uid, parameter names) go through a small JSON table.
+    Parameter values keep their type (float, int, bool).
+
+    Raises:
+        ValueError: If an int parameter does not fit in 64 signed bits
+    """
+    n = len(tokens)
+    codes = np.fromiter((_TOKEN_TYPE_CODES[t.token_type] for t in tokens), "u1", count=n)
+    versions = np.fromiter((t.version for t in tokens), "<u4", count=n)
+    bounds = np.fromiter((x for t in tokens for x in t.bounds), "<f8", count=3 * n)
+    counts = np.fromiter((len(t.params) for t in tokens), "<u4", count=n)
+    params = [v for t in tokens for v in t.params.values()]
+    tags = np.fromiter(map(_param_tag, params), "u1", count=len(params))
+    try:
+        ints = np.fromiter(
+            (v if tag else 0 for v, tag in zip(params, tags.tolist())), "<i8", count=len(params)
+        )
+    except OverflowError:
+        raise ValueError("GEOB int parameters must fit in 64 signed bits")
+    floats = np.fromiter(
+        (0.0 if tag else v for v, tag in zip(params, tags.tolist())), "<f8", count=len(params)
+    )
+    values = np.where(tags == _PARAM_FLOAT, floats.view("<i8"), ints)
+    strings = orjson.dumps({
+        "kind": [t.kind for t in tokens],
+        "uid": [t.uid for t in tokens],
+        "keys": [list(t.params) for t in tokens],
+    })
+    return b"".join((
+        _GEOB_HDR.pack(n, len(strings)),
+        codes.tobytes(),
+        versions.tobytes(),
+        bounds.tobytes(),
+        counts.tobytes(),
+        tags.tobytes(),
+        values.astype("<i8", copy=False).tobytes(),
+        strings,
+    ))
+
+
+def deserialize_tokens_bin(data: bytes) -> List[GeometryToken]:
+    """
+    Inverse of serialize_tokens_bin.
+
+    Raises:
+        ValueError: If the buffer is truncated or inconsistent
+    """
+    if len(data) < _GEOB_HDR.size:
+        raise ValueError("GEOB chunk too short")
+    n, strlen = _GEOB_HDR.unpack_from(data)
+    view = memoryview(data)
+    pos = _GEOB_HDR.size
+
+    def column(dtype: str, count: int) -> np.ndarray:
+        nonlocal pos
+        arr = np.frombuffer(view, dtype=dtype, count=count, offset=pos)
+        pos += arr.nbytes
+        return arr
+
+    try:
+        codes = column("u1", n).tolist()
+        versions = column("<u4", n).tolist()
+        bounds = column("<f8", 3 * n).reshape(-1, 3).tolist()
+        counts = column("<u4", n)
+        total = int(counts.sum())
+        tags = column("u1", total).tolist()
+        raw = column("<i8", total)
+    except ValueError as e:
+        raise ValueError(f"GEOB chunk truncated: {e}")
+    if len(data) - pos != strlen:
+        raise ValueError("GEOB string table length mismatch")
+    strings = orjson.loads(view[pos:])
+    values = [
+        f if tag == _PARAM_FLOAT else (i if tag == _PARAM_INT else bool(i))
+        for tag, f, i in zip(tags, raw.view("<f8").tolist(), raw.tolist())
+    ]
+
+    tokens = []
+    offset = 0
+    for i, count in enumerate(counts.tolist()):
+        params = dict(zip(strings["keys"][i], values[offset:offset + count]))
+        offset += count
+        tokens.append(GeometryToken(
+            token_type=_TOKEN_TYPES[codes[i]],
+            kind=strings["kind"][i],
+            params=params,
+            bounds=tuple(bounds[i]),
+            version=versions[i],
+            uid=strings["uid"][i],
+        ))
+    return tokens
+
+
 class GeometryContainer:
-    """Integrate geometry data into H4MK containers."""
+    """
+    Integrate geometry data into H4MK containers.
+
+    Parsed chunks are cached on first access (tokens, sequences,
+    metadata). add_* methods invalidate the cache; call refresh() if the
+    underlying container is modified by other means.
+    """
     
     # Chunk types for geometry data
-    CHUNK_GEOMETRY = b"GEOM"  # Geometry tokens
+    CHUNK_GEOMETRY = b"GEOM"  # Geometry tokens (JSON, read-only legacy)
+    CHUNK_GEOMETRY_BIN = b"GEOB"  # Geometry tokens (binary columns)
     CHUNK_TEMPORAL = b"TEMP"  # Temporal sequences
     CHUNK_GEOMETRY_META = b"GMET"  # Geometry metadata
     
     def __init__(self, h4mk_container):
         self.container = h4mk_container
+
+    def refresh(self) -> None:
+        """Drop cached parsed chunks so the next access re-reads them."""
+        for name in ("tokens", "sequences", "metadata"):
+            self.__dict__.pop(name, None)
     
     def add_geometry_tokens(self, tokens: List[GeometryToken]) -> str:
         """
         Add geometry tokens to container.
         
         Returns:
-            Hash of the geometry data
+            Hash of the geometry data (16 hex chars, BLAKE2b-64)
         """
-        # Convert to serializable format
-        geometry_data = [t.to_dict() for t in tokens]
-        
-        # Serialize as JSON for compatibility
-        json_data = json.dumps(geometry_data, separators=(",", ":")).encode()
+        # Serialize numeric fields as raw binary columns
+        token_data = serialize_tokens_bin(tokens)
         
         # Add to container
-        self.container.add_chunk(self.CHUNK_GEOMETRY, json_data)
+        self.container.add_chunk(self.CHUNK_GEOMETRY_BIN, token_data)
         
         # Add metadata
         metadata = {
@@ -46,40 +178,45 @@ class GeometryContainer:
         
         self.container.add_chunk(
             self.CHUNK_GEOMETRY_META,
-            json.dumps(metadata, separators=(",", ":")).encode()
+            orjson.dumps(metadata)
         )
+        self.refresh()
         
         # Return data hash for reference
-        import hashlib
-        return hashlib.sha256(json_data).hexdigest()[:16]
+        return hashlib.blake2b(token_data, digest_size=8).hexdigest()
     
     def add_temporal_sequences(self, sequences: List[TemporalSequence]) -> str:
         """
         Add temporal sequences to container.
         
         Returns:
-            Hash of the temporal data
+            Hash of the temporal data (16 hex chars, BLAKE2b-64)
         """
         # Convert to serializable format
         temporal_data = [s.to_dict() for s in sequences]
         
-        # Serialize as JSON
-        json_data = json.dumps(temporal_data, separators=(",", ":")).encode()
+        # Serialize as compact JSON
+        json_data = orjson.dumps(temporal_data)
         
         # Add to container
         self.container.add_chunk(self.CHUNK_TEMPORAL, json_data)
+        self.refresh()
         
         # Return data hash
-        import hashlib
-        return hashlib.sha256(json_data).hexdigest()[:16]
+        return hashlib.blake2b(json_data, digest_size=8).hexdigest()
     
-    def get_geometry_tokens(self) -> List[GeometryToken]:
-        """Retrieve geometry tokens from container."""
+    @cached_property
+    def tokens(self) -> List[GeometryToken]:
+        """Geometry tokens parsed from the GEOB (or legacy GEOM) chunk (cached)."""
+        token_data = self.container.get_chunk(self.CHUNK_GEOMETRY_BIN)
+        if token_data:
+            return deserialize_tokens_bin(token_data)
+        
         json_data = self.container.get_chunk(self.CHUNK_GEOMETRY)
         if not json_data:
             return []
         
-        geometry_list = json.loads(json_data.decode())
+        geometry_list = orjson.loads(json_data)
         tokens = []
         
         for item in geometry_list:
@@ -88,13 +225,14 @@ class GeometryContainer:
         
         return tokens
     
-    def get_temporal_sequences(self) -> List[TemporalSequence]:
-        """Retrieve temporal sequences from container."""
+    @cached_property
+    def sequences(self) -> List[TemporalSequence]:
+        """Temporal sequences parsed from the TEMP chunk (cached)."""
         json_data = self.container.get_chunk(self.CHUNK_TEMPORAL)
         if not json_data:
             return []
         
-        temporal_list = json.loads(json_data.decode())
+        temporal_list = orjson.loads(json_data)
         sequences = []
         
         for item in temporal_list:
@@ -103,21 +241,46 @@ class GeometryContainer:
         
         return sequences
     
-    def get_geometry_metadata(self) -> Dict[str, Any]:
-        """Get geometry metadata."""
+    @cached_property
+    def metadata(self) -> Dict[str, Any]:
+        """Geometry metadata parsed from the GMET chunk (cached)."""
         meta_data = self.container.get_chunk(self.CHUNK_GEOMETRY_META)
         if not meta_data:
             return {}
         
-        return json.loads(meta_data.decode())
+        return orjson.loads(meta_data)
+    
+    def get_geometry_tokens(self) -> List[GeometryToken]:
+        """Retrieve geometry tokens from container."""
+        return list(self.tokens)
     
-    def validate_geometry_integrity(self) -> bool:
-        """Validate geometry data integrity in container."""
+    def get_temporal_sequences(self) -> List[TemporalSequence]:
+        """Retrieve temporal sequences from container."""
+        return list(self.sequences)
+    
+    def get_geometry_metadata(self) -> Dict[str, Any]:
+        """Get geometry metadata."""
+        return dict(self.metadata)
+    
+    def validate_geometry_integrity(
+        self,
+        tokens: Optional[List[GeometryToken]] = None,
+        sequences: Optional[List[TemporalSequence]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Validate geometry data integrity in container.
+
+        Already-parsed data may be passed in to skip the lookups.
+        """
         try:
             # Try to load all geometry data
-            tokens = self.get_geometry_tokens()
-            sequences = self.get_temporal_sequences()
-            metadata = self.get_geometry_metadata()
+            if tokens is None:
+                tokens = self.tokens
+            if sequences is None:
+                sequences = self.sequences
+            if metadata is None:
+                metadata = self.metadata
             
             # Basic validation
             if tokens:
@@ -145,9 +308,9 @@ class GeometryContainer:
     
     def create_geometry_summary(self) -> Dict[str, Any]:
         """Create summary of geometry data in container."""
-        tokens = self.get_geometry_tokens()
-        sequences = self.get_temporal_sequences()
-        metadata = self.get_geometry_metadata()
+        tokens = self.tokens
+        sequences = self.sequences
+        metadata = self.metadata
         
         # Calculate bounds
         bounds = {
@@ -156,14 +319,15 @@ class GeometryContainer:
             "min_z": float("inf"), "max_z": float("-inf"),
         }
         
-        for token in tokens:
-            bx, by, bz = token.bounds
-            bounds["min_x"] = min(bounds["min_x"], -bx/2)
-            bounds["max_x"] = max(bounds["max_x"], bx/2)
-            bounds["min_y"] = min(bounds["min_y"], -by/2)
-            bounds["max_y"] = max(bounds["max_y"], by/2)
-            bounds["min_z"] = min(bounds["min_z"], -bz/2)
-            bounds["max_z"] = max(bounds["max_z"], bz/2)
+        if tokens:
+            # Tokens are centered: extent per axis is ±bounds/2
+            half = np.fromiter(
+                (x for t in tokens for x in t.bounds), dtype=np.float64, count=3 * len(tokens)
+            ).reshape(-1, 3) * 0.5
+            hi = half.max(axis=0)
+            lo = (-half).min(axis=0)
+            bounds["min_x"], bounds["min_y"], bounds["min_z"] = lo.tolist()
+            bounds["max_x"], bounds["max_y"], bounds["max_z"] = hi.tolist()
         
         return {
             "geometry": {
@@ -181,8 +345,8 @@ class GeometryContainer:
                 "animated_properties": list(set(s.property_name for s in sequences)),
             },
             "bounds": bounds,
-            "metadata": metadata,
-            "integrity_check": self.validate_geometry_integrity()
+            "metadata": dict(metadata),
+            "integrity_check": self.validate_geometry_integrity(tokens, sequences, metadata)
         }
 
 
@@ -11,27 +11,42 @@ CORE = video/audio/data block (opaque, transport-only)
 SEEK = seekable entry list (pts_us, offset pairs)
 META = JSON metadata (container info, codec hints)
 SAFE = JSON safety scopes (no codec semantics, no ML, no synthesis)
-VERI = SHA256 of all prior chunks (integrity check)
+VERI = BLAKE2b-256 of all prior chunks (integrity check; META "veri_alg",
+       containers without it use SHA256)
 """
 
 from __future__ import annotations
+import itertools
 import struct
-import zlib
-import json
 from dataclasses import dataclass
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Optional, Iterable, Iterator
 
-from utils.crypto import sha256
+import numpy as np
+import orjson
+
+from utils.hashing import VERI_ALG_DEFAULT, crc32, veri_hasher
 from compression import load_engine  # ✅ NEW
-from crypto.living_bindings import CoreContext, encrypt_core_block  # ✅ CIPHER
+from crypto.living_bindings import (  # ✅ CIPHER
+    CIPHER_LABELS,
+    PENDING_VERI_HEX,
+    CoreContextPrefix,
+    encrypt_core_block,
+)
 
 MAGIC = b"H4MK"
 VERSION = 1
 
+_CHUNK_HDR = struct.Struct(">4sII")  # TAG + LEN + CRC32
+_SEEK_COUNT = struct.Struct(">I")
+_FILE_HDR = struct.Struct(">4sHH")  # MAGIC + VERSION + RESERVED
+
+# CORE blocks handed to the engine per compress_many() call while streaming
+COMPRESS_BATCH_SIZE = 8
+
 
 def _crc32(data: bytes) -> int:
     """CRC32 checksum (unsigned 32-bit)."""
-    return zlib.crc32(data) & 0xFFFFFFFF
+    return crc32(data)
 
 
 @dataclass
@@ -44,8 +59,22 @@ class Chunk:
         """Serialize chunk: TAG + LEN + CRC32 + PAYLOAD."""
         assert len(self.tag) == 4, f"tag must be 4 bytes, got {len(self.tag)}"
         crc = _crc32(self.payload)
-        header = self.tag + struct.pack(">II", len(self.payload), crc)
-        return header + self.payload
+        return b"".join((_CHUNK_HDR.pack(self.tag, len(self.payload), crc), self.payload))
+
+
+def _pack_chunk_parts(tag: bytes, *parts: bytes) -> List[bytes]:
+    """Chunk header followed by payload parts, without concatenating the payload.
+
+    CRC32 and length are accumulated across parts, so the result is
+    byte-identical to Chunk(tag, b"".join(parts)).pack().
+    """
+    assert len(tag) == 4, f"tag must be 4 bytes, got {len(tag)}"
+    crc = 0
+    size = 0
+    for part in parts:
+        crc = crc32(part, crc)
+        size += len(part)
+    return [_CHUNK_HDR.pack(tag, size, crc), *parts]
 
 
 def pack_seek_entries(entries) -> bytes:
@@ -57,28 +86,139 @@ def pack_seek_entries(entries) -> bytes:
     Returns:
         Binary SEEK payload
     """
-    out = bytearray()
-    out += struct.pack(">I", len(entries))
-    for entry in entries:
-        # Handle both SeekEntry objects and tuples
-        if hasattr(entry, 'pts'):
-            pts, off = entry.pts, entry.offset
-        else:
-            pts, off = entry
-        out += struct.pack(">QQ", int(pts), int(off))
-    return bytes(out)
+    # Handle both SeekEntry objects and tuples
+    pairs = [(e.pts, e.offset) if hasattr(e, "pts") else e for e in entries]
+    # (n, 2) big-endian u64 matrix: row-major bytes are pts, off, pts, off, ...
+    body = np.array(pairs, dtype=">u8").tobytes()
+    return _SEEK_COUNT.pack(len(pairs)) + body
 
 
 def pack_meta(meta: Dict[str, Any]) -> bytes:
-    """Serialize META/SAFE chunk payload: JSON without external deps.
+    """Serialize META/SAFE chunk payload: compact UTF-8 JSON via orjson.
     
     Args:
         meta: Dictionary to serialize
     
     Returns:
-        UTF-8 JSON bytes (compact format)
+        Compact UTF-8 JSON bytes. Not byte-identical to json.dumps with
+        separators=(",", ":") and ensure_ascii=False: floats use the
+        shortest round-trip form without a "+" exponent (1e20, not 1e+20),
+        NaN/Infinity become null, and non-str keys are stringified
+        (OPT_NON_STR_KEYS).
+    """
+    return orjson.dumps(meta, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _container_meta(
+    meta: Dict[str, Any], comp_info: Dict[str, Any], cipher_suite: Optional[str]
+) -> Dict[str, Any]:
+    """Copy of meta with compression (and encryption) descriptors injected.
+
+    Built as a single dict display (one shallow copy of the caller's keys),
+    serialized once by pack_meta() straight to bytes.
+    """
+    compression = {
+        "engine": comp_info.get("engine", "unknown"),
+        "engine_id": comp_info.get("engine_id", "unknown"),  # 🔐 SEALED
+        "fingerprint": comp_info.get("fingerprint", "unknown"),  # 🔐 SEALED
+        "deterministic": bool(comp_info.get("deterministic", True)),
+        "identity_safe": bool(comp_info.get("identity_safe", True)),
+        "opaque": bool(comp_info.get("opaque", False)),
+        "sealed": bool(comp_info.get("sealed", False)),  # 🔐 Tamper-evident
+    }
+    if cipher_suite is None:
+        return {**meta, "veri_alg": VERI_ALG_DEFAULT, "compression": compression}
+
+    # Encryption metadata (if cipher used)
+    return {
+        **meta,
+        "veri_alg": VERI_ALG_DEFAULT,
+        "compression": compression,
+        "encryption": {
+            "cipher": CIPHER_LABELS.get(cipher_suite, cipher_suite),
+            "suite": cipher_suite,
+            "mode": "compress-then-encrypt",
+            "context_binding": "container+track+timestamp+index",
+            "sealed": True,
+        },
+    }
+
+
+def build_h4mk_stream(
+    core_blocks: Iterable[bytes],
+    seek_entries: List[Tuple[int, int]],
+    meta: Dict[str, Any],
+    safe: Dict[str, Any],
+    cipher_state: Optional[Any] = None,
+    extra_chunks: Optional[List[Tuple[bytes, bytes]]] = None,
+) -> Iterator[bytes]:
+    """Build an H4MK container incrementally, yielding it piece by piece.
+
+    Produces exactly the bytes of build_h4mk() but never holds more than
+    COMPRESS_BATCH_SIZE CORE blocks at a time: blocks are pulled from
+    core_blocks in small batches, compressed together via
+    compress_many() (concurrently on engines that support it), then
+    optionally encrypted and emitted in order. VERI is accumulated with a
+    running BLAKE2b-256 over everything emitted after the file header.
+
+    seek_entries is only read once every CORE block has been emitted, so it
+    may be filled in while core_blocks is being consumed.
+
+    Args:
+        core_blocks: Iterable of opaque block payloads (consumed lazily)
+        seek_entries: List of (pts_us, offset_bytes) for keyframes
+        meta: Metadata dict (project, domain, codecs, hints)
+        safe: Safety scopes dict (constraints, no-ml, etc.)
+        cipher_state: Optional LivingState for encrypting CORE blocks
+        extra_chunks: Optional (tag, payload) pairs emitted after SAFE,
+                      covered by VERI like every other chunk
+
+    Yields:
+        Consecutive byte strings making up the container
     """
-    return json.dumps(meta, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    compressor = load_engine()
+    comp_info = compressor.info()
+    veri = veri_hasher(VERI_ALG_DEFAULT)
+
+    def emit(tag: bytes, *parts: bytes) -> Iterator[bytes]:
+        for piece in _pack_chunk_parts(tag, *parts):
+            veri.update(piece)
+            yield piece
+
+    # H4MK header: MAGIC(4) + VERSION(2) + RESERVED(2)
+    yield _FILE_HDR.pack(MAGIC, VERSION, 0)
+
+    # Pipeline: plaintext → compress → [encrypt] → CORE chunk
+    blocks = iter(core_blocks)
+    compressed = itertools.chain.from_iterable(
+        compressor.compress_many(batch)
+        for batch in iter(lambda: list(itertools.islice(blocks, COMPRESS_BATCH_SIZE)), [])
+    )
+    # AAD prefix is constant per container; only chunk_index varies
+    aad_prefix = CoreContextPrefix(
+        engine_id=comp_info.get("engine_id", "unknown"),
+        engine_fp=comp_info.get("fingerprint", "unknown"),
+        container_veri_hex=PENDING_VERI_HEX,
+        track_id=meta.get("track_id", "unknown"),
+    )
+    pts_us = meta.get("pts_us", 0)
+    for block_index, cb in enumerate(compressed):
+        if cipher_state is not None:
+            ctx = aad_prefix.aad_for(pts_us, block_index)
+            header, ciphertext = encrypt_core_block(cipher_state, cb, ctx)
+            yield from emit(b"CORE", header, ciphertext)
+        else:
+            yield from emit(b"CORE", cb)
+
+    yield from emit(b"SEEK", pack_seek_entries(seek_entries))
+    cipher_suite = cipher_state.suite if cipher_state is not None else None
+    yield from emit(b"META", pack_meta(_container_meta(meta, comp_info, cipher_suite)))
+    yield from emit(b"SAFE", pack_meta(safe))
+    for tag, payload in extra_chunks or ():
+        yield from emit(tag, payload)
+
+    # VERI = BLAKE2b-256 of all prior chunk headers + payloads
+    yield from _pack_chunk_parts(b"VERI", veri.digest())
 
 
 def build_h4mk(
@@ -87,6 +227,7 @@ def build_h4mk(
     meta: Dict[str, Any],
     safe: Dict[str, Any],
     cipher_state: Optional[Any] = None,  # ✅ CIPHER — LivingState for optional encryption
+    extra_chunks: Optional[List[Tuple[bytes, bytes]]] = None,
 ) -> bytes:
     """Build complete H4MK container.
     
@@ -98,82 +239,21 @@ def build_h4mk(
         cipher_state: Optional LivingState for encrypting CORE blocks behind cipher.
                       If provided, blocks are compressed THEN encrypted.
                       If None, blocks stored compressed but unencrypted.
+        extra_chunks: Optional (tag, payload) pairs for additional binary
+                      chunks (e.g. SEKM/TRAK), written after SAFE
     
     Returns:
         Complete H4MK binary (header + chunks + VERI)
     """
-    compressor = load_engine()  # ✅ NEW
-    comp_info = compressor.info()   # safe metadata only
-
-    chunks: List[Chunk] = []
-    
-    # Calculate container integrity hash FIRST (needed for context binding)
-    # This is a placeholder; actual VERI will be recalculated at end
-    container_veri_temp = sha256(b"temp")
-
-    # CORE chunks (compressed, optionally encrypted)
-    # Pipeline: plaintext → compress → [encrypt] → CORE chunk
-    for block_index, b in enumerate(core_blocks):
-        # 1. Compress
-        cb = compressor.compress(b)
-        
-        # 2. Optionally encrypt compressed bytes
-        if cipher_state is not None:
-            ctx = CoreContext(
-                engine_id=comp_info.get("engine_id", "unknown"),
-                engine_fp=comp_info.get("fingerprint", "unknown"),
-                container_veri_hex=container_veri_temp.hex(),
-                track_id=meta.get("track_id", "unknown"),
-                pts_us=meta.get("pts_us", 0),
-                chunk_index=block_index,
-            )
-            header, ciphertext = encrypt_core_block(cipher_state, cb, ctx)
-            # Store encrypted block: header + ciphertext
-            encrypted_payload = header + ciphertext
-            chunks.append(Chunk(b"CORE", encrypted_payload))
-        else:
-            # No encryption, store compressed directly
-            chunks.append(Chunk(b"CORE", cb))
-
-    # SEEK table
-    chunks.append(Chunk(b"SEEK", pack_seek_entries(seek_entries)))
-
-    # Inject compression metadata safely (with sealing info)
-    meta = dict(meta)
-    meta["compression"] = {
-        "engine": comp_info.get("engine", "unknown"),
-        "engine_id": comp_info.get("engine_id", "unknown"),  # 🔐 SEALED
-        "fingerprint": comp_info.get("fingerprint", "unknown"),  # 🔐 SEALED
-        "deterministic": bool(comp_info.get("deterministic", True)),
-        "identity_safe": bool(comp_info.get("identity_safe", True)),
-        "opaque": bool(comp_info.get("opaque", False)),
-        "sealed": bool(comp_info.get("sealed", False)),  # 🔐 Tamper-evident
-    }
-    
-    # Encryption metadata (if cipher used)
-    if cipher_state is not None:
-        meta["encryption"] = {
-            "cipher": "living-cipher-v3",
-            "mode": "compress-then-encrypt",
-            "context_binding": "container+track+timestamp+index",
-            "sealed": True,
-        }
-
-    # Metadata
-    chunks.append(Chunk(b"META", pack_meta(meta)))
-
-    # Safety scopes
-    chunks.append(Chunk(b"SAFE", pack_meta(safe)))
-
-    # VERI = SHA256 of all prior chunk headers + payloads
-    pre_veri = b"".join(c.pack() for c in chunks)
-    veri_payload = sha256(pre_veri)
-    chunks.append(Chunk(b"VERI", veri_payload))
-
-    # Assemble body
-    body = b"".join(c.pack() for c in chunks)
-
-    # H4MK header: MAGIC(4) + VERSION(2) + RESERVED(2)
-    header = MAGIC + struct.pack(">HH", VERSION, 0)
-
-    return header + body
+    # Single pass: VERI is hashed incrementally as chunks are emitted,
+    # instead of re-packing and re-hashing every chunk at the end.
+    return b"".join(
+        build_h4mk_stream(
+            core_blocks,
+            seek_entries,
+            meta,
+            safe,
+            cipher_state=cipher_state,
+            extra_chunks=extra_chunks,
+        )
+    )
@@ -1,11 +1,10 @@
 """
 H4MK builder for multitrack video (uses existing build_h4mk).
-Embeds SEEKM + TRAK in META for now (readable).
+Stores SEEKM + TRAK as first-class binary chunks (SEKM, TRAK).
 """
 
 from __future__ import annotations
 from typing import List, Dict, Any
-import base64
 
 from container.h4mk import build_h4mk
 from container.multitrack import TrackIndexEntry, pack_trak, build_seek_per_track, pack_seek_multi
@@ -23,7 +22,7 @@ def build_h4mk_tracks(
     - Packs blocks into CORE chunks (opaque)
     - Creates readable TRAK index (track_id, pts_us, kind, keyframe, core_index)
     - Creates readable SEEKM multi-track seek table
-    - Stores SEEKM + TRAK as base64 in META (for compatibility)
+    - Stores SEEKM + TRAK as raw SEKM / TRAK chunks (CRC-protected, no base64)
     """
     core_blocks: List[bytes] = []
     trak_entries: List[TrackIndexEntry] = []
@@ -46,10 +45,12 @@ def build_h4mk_tracks(
     meta2["domain"] = "video-transport"
     meta2["tracks"] = sorted(list({b.track_id for b in blocks}))
 
-    # Embed SEEKM + TRAK as base64 in META (safe, readable in JSON)
-    meta2["seekm_b64"] = base64.b64encode(seekm).decode("ascii")
-    meta2["trak_b64"] = base64.b64encode(trak).decode("ascii")
-
     # build_h4mk requires seek_entries param; we pass empty list since multi-track seek
-    # is in META (readable). Global SEEK chunk can be empty or minimal.
-    return build_h4mk(core_blocks=core_blocks, seek_entries=[], meta=meta2, safe=safe)
+    # lives in the SEKM chunk. Global SEEK chunk can be empty or minimal.
+    return build_h4mk(
+        core_blocks=core_blocks,
+        seek_entries=[],
+        meta=meta2,
+        safe=safe,
+        extra_chunks=[(b"SEKM", seekm), (b"TRAK", trak)],
+    )
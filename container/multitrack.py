@@ -1,15 +1,34 @@
 """
-Multitrack H4MK packing: CORE blocks + readable TRAK index + multi-track SEEKM.
+Multitrack H4MK packing: CORE blocks + binary TRAK index + multi-track SEEKM.
 """
 
 from __future__ import annotations
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from operator import attrgetter, itemgetter
+from typing import Any, List, Dict, Mapping, Tuple
+import base64
 import struct
-import json
 
+import numpy as np
+import orjson
 
-@dataclass(frozen=True)
+# SEEKM entry on the wire: u64 pts_us, u32 core_index (big-endian, packed)
+_SEEKM_ENTRY = np.dtype([("pts_us", ">u8"), ("core_index", ">u4")])
+_U8 = struct.Struct(">B")
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+
+# Binary TRAK (v2). v1 TRAK chunks are JSON objects and start with "{".
+TRAK_VERSION = 2
+_TRAK_HDR = struct.Struct(">BI")  # version, entry_count
+# TRAK entry on the wire: indices into the track_id / kind string tables
+_TRAK_ENTRY = np.dtype([
+    ("tid", ">u2"), ("pts_us", ">u8"), ("kind", "u1"), ("keyframe", "u1"), ("core_index", ">u4"),
+])
+
+
+@dataclass(frozen=True, slots=True)
 class TrackIndexEntry:
     """Single entry in track index."""
     track_id: str
@@ -19,49 +38,115 @@ class TrackIndexEntry:
     core_index: int              # Index into CORE chunks
 
 
+def _pack_strtab(strings: List[str], count_fmt: struct.Struct, len_fmt: struct.Struct) -> bytes:
+    """count + (len + UTF-8 bytes) per string."""
+    parts = [count_fmt.pack(len(strings))]
+    for text in strings:
+        raw = text.encode("utf-8")
+        parts.append(len_fmt.pack(len(raw)) + raw)
+    return b"".join(parts)
+
+
+def _unpack_strtab(
+    data: bytes, pos: int, count_fmt: struct.Struct, len_fmt: struct.Struct
+) -> Tuple[List[str], int]:
+    """Inverse of _pack_strtab; returns (strings, position after table)."""
+    (count,) = count_fmt.unpack_from(data, pos)
+    pos += count_fmt.size
+    strings = []
+    for _ in range(count):
+        (l,) = len_fmt.unpack_from(data, pos)
+        pos += len_fmt.size
+        strings.append(bytes(data[pos:pos+l]).decode("utf-8"))
+        pos += l
+    return strings, pos
+
+
 def pack_trak(entries: List[TrackIndexEntry]) -> bytes:
     """
-    Pack TRAK chunk: readable index describing every CORE block.
+    Pack TRAK chunk: binary index describing every CORE block.
     Does NOT reveal block contents, only metadata.
-    Format: JSON with track_id, pts_us, kind, keyframe, core_index.
+    Format (v2, big-endian):
+      u8 version (2), u32 entry_count
+      u16 track_count, repeated: u16 len + track_id bytes
+      u8 kind_count, repeated: u8 len + kind bytes
+      repeated: u16 track_idx, u64 pts_us, u8 kind_idx, u8 keyframe, u32 core_index
     """
-    payload = {
-        "trak": [{
-            "track_id": e.track_id,
-            "pts_us": int(e.pts_us),
-            "kind": e.kind,
-            "keyframe": bool(e.keyframe),
-            "core_index": int(e.core_index),
-        } for e in entries]
-    }
-    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    tids: Dict[str, int] = {}
+    kinds: Dict[str, int] = {}
+    rows = np.empty(len(entries), dtype=_TRAK_ENTRY)
+    rows[:] = [
+        (
+            tids.setdefault(e.track_id, len(tids)),
+            e.pts_us,
+            kinds.setdefault(e.kind, len(kinds)),
+            bool(e.keyframe),
+            e.core_index,
+        )
+        for e in entries
+    ]
+    return b"".join([
+        _TRAK_HDR.pack(TRAK_VERSION, len(entries)),
+        _pack_strtab(list(tids), _U16, _U16),
+        _pack_strtab(list(kinds), _U8, _U8),
+        rows.tobytes(),
+    ])
 
 
 def unpack_trak(data: bytes) -> List[TrackIndexEntry]:
-    """Unpack TRAK chunk."""
-    payload = json.loads(data.decode("utf-8"))
-    return [TrackIndexEntry(
-        track_id=e["track_id"],
-        pts_us=e["pts_us"],
-        kind=e["kind"],
-        keyframe=e["keyframe"],
-        core_index=e["core_index"],
-    ) for e in payload.get("trak", [])]
+    """Unpack TRAK chunk (binary v2, or legacy v1 JSON)."""
+    if data[:1] == b"{":
+        payload = orjson.loads(data)
+        return [TrackIndexEntry(
+            track_id=e["track_id"],
+            pts_us=e["pts_us"],
+            kind=e["kind"],
+            keyframe=e["keyframe"],
+            core_index=e["core_index"],
+        ) for e in payload.get("trak", [])]
+
+    version, n = _TRAK_HDR.unpack_from(data)
+    if version != TRAK_VERSION:
+        raise ValueError(f"Unsupported TRAK version: {version}")
+    tids, pos = _unpack_strtab(data, _TRAK_HDR.size, _U16, _U16)
+    kinds, pos = _unpack_strtab(data, pos, _U8, _U8)
+    # Whole entry table in one C-level decode; string-table lookups are
+    # column-wise fancy indexing, so only object construction runs per row
+    rows = np.frombuffer(data, dtype=_TRAK_ENTRY, count=n, offset=pos)
+    return list(map(
+        TrackIndexEntry,
+        np.array(tids, dtype=object)[rows["tid"]].tolist(),
+        rows["pts_us"].tolist(),
+        np.array(kinds, dtype=object)[rows["kind"]].tolist(),
+        rows["keyframe"].astype(bool).tolist(),
+        rows["core_index"].tolist(),
+    ))
+
+
+def trak_records(data: bytes) -> List[Dict[str, Any]]:
+    """TRAK chunk as JSON-ready dicts (manifest/API representation)."""
+    return [{
+        "track_id": e.track_id,
+        "pts_us": e.pts_us,
+        "kind": e.kind,
+        "keyframe": e.keyframe,
+        "core_index": e.core_index,
+    } for e in unpack_trak(data)]
 
 
 def build_seek_per_track(entries: List[TrackIndexEntry]) -> Dict[str, List[Tuple[int, int]]]:
     """
     Build multi-track seek table from entries.
     Returns {track_id: [(pts_us, core_index_of_keyframe), ...]}.
-    Sorted by pts_us within each track.
+    Tracks are inserted in track_id order (dicts keep it), entries sorted
+    by pts_us within each track: one sort up front, none per track.
     """
+    keyframes = sorted(
+        (e for e in entries if e.keyframe), key=attrgetter("track_id", "pts_us")
+    )
     out: Dict[str, List[Tuple[int, int]]] = {}
-    for e in entries:
-        if e.keyframe:
-            out.setdefault(e.track_id, []).append((e.pts_us, e.core_index))
-    # Sort by pts_us
-    for track_id in out:
-        out[track_id].sort(key=lambda x: x[0])
+    for e in keyframes:
+        out.setdefault(e.track_id, []).append((e.pts_us, e.core_index))
     return out
 
 
@@ -74,35 +159,59 @@ def pack_seek_multi(seek: Dict[str, List[Tuple[int, int]]]) -> bytes:
         u16 track_id_len + bytes
         u32 entry_count
         repeated: u64 pts_us, u32 core_index
+    Tracks are written in dict order; build_seek_per_track already
+    returns them sorted by track_id.
     """
-    buf = bytearray()
-    buf += struct.pack(">I", len(seek))
-    for track_id, entries in sorted(seek.items()):
+    parts = [_U32.pack(len(seek))]
+    for track_id, entries in seek.items():
         tid = track_id.encode("utf-8")
-        buf += struct.pack(">H", len(tid)) + tid
-        buf += struct.pack(">I", len(entries))
-        for pts, core_idx in entries:
-            buf += struct.pack(">QI", int(pts), int(core_idx))
-    return bytes(buf)
+        parts.append(_U16.pack(len(tid)) + tid + _U32.pack(len(entries)))
+        # Whole entry run packed in one structured-array copy
+        parts.append(np.array([tuple(e) for e in entries], dtype=_SEEKM_ENTRY).tobytes())
+    return b"".join(parts)
 
 
 def unpack_seek_multi(data: bytes) -> Dict[str, List[Tuple[int, int]]]:
     """Unpack SEEKM chunk."""
     pos = 0
-    track_count = struct.unpack(">I", data[pos:pos+4])[0]
+    (track_count,) = _U32.unpack_from(data, pos)
     pos += 4
     out: Dict[str, List[Tuple[int, int]]] = {}
     for _ in range(track_count):
-        l = struct.unpack(">H", data[pos:pos+2])[0]
+        (l,) = _U16.unpack_from(data, pos)
         pos += 2
         tid = data[pos:pos+l].decode("utf-8")
         pos += l
-        n = struct.unpack(">I", data[pos:pos+4])[0]
+        (n,) = _U32.unpack_from(data, pos)
         pos += 4
-        arr = []
-        for __ in range(n):
-            pts, idx = struct.unpack(">QI", data[pos:pos+12])
-            pos += 12
-            arr.append((pts, idx))
-        out[tid] = arr
+        # Whole entry block in one C-level decode instead of n struct calls
+        entries = np.frombuffer(data, dtype=_SEEKM_ENTRY, count=n, offset=pos)
+        pos += n * _SEEKM_ENTRY.itemsize
+        out[tid] = entries.tolist()
     return out
+
+
+def seek_keyframe(entries: List[Tuple[int, int]], pts_us: int) -> Tuple[int, int]:
+    """
+    Return the last (pts_us, core_index) entry with pts <= target.
+    Entries must be sorted by pts_us (as built by build_seek_per_track).
+    Targets before the first keyframe clamp to entries[0].
+    O(log n) binary search instead of a linear scan.
+    """
+    idx = bisect_right(entries, pts_us, key=itemgetter(0)) - 1
+    return entries[max(idx, 0)]
+
+
+def track_index_payloads(reader: Any, meta: Mapping[str, Any]) -> Tuple[bytes, bytes]:
+    """
+    Return the raw (SEEKM, TRAK) payloads of a multitrack container.
+
+    Reads the SEKM / TRAK chunks; containers written before those were
+    first-class chunks carry them base64-encoded in META (seekm_b64 /
+    trak_b64) instead. Missing tables come back as b"".
+    """
+    seekm_chunks = reader.get_chunks(b"SEKM")
+    trak_chunks = reader.get_chunks(b"TRAK")
+    seekm = seekm_chunks[0] if seekm_chunks else base64.b64decode(meta.get("seekm_b64", ""))
+    trak = trak_chunks[0] if trak_chunks else base64.b64decode(meta.get("trak_b64", ""))
+    return seekm, trak
@@ -11,20 +11,41 @@ O(log n) SEEK table lookups for PTS-based random access.
 """
 
 from __future__ import annotations
+import mmap
+import os
 import struct
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional, Iterable, Any
-import hashlib
-import zlib
+from typing import Deque, Dict, List, Tuple, Optional, Iterable, Iterator, Any
+from collections import OrderedDict, deque
 
+import numpy as np
+import orjson
+
+from utils.hashing import VERI_ALG_LEGACY, crc32, veri_hasher
 from compression import load_engine  # ✅ NEW
-from crypto.living_bindings import CoreContext, decrypt_core_block  # ✅ CIPHER
+from crypto.living_bindings import (  # ✅ CIPHER
+    PENDING_VERI_HEX,
+    CoreContextPrefix,
+    bind_suite,
+    decrypt_core_block,
+    suite_from_meta,
+)
+from crypto.living_cipher import header_length
 
 MAGIC = b"H4MK"
 CHUNK_HEADER_SIZE = 12  # tag(4) + size(4) + crc(4)
+CORE_CACHE_SIZE = 16  # decompressed CORE blocks kept per reader
+
+# Precompiled formats for the parse / seek / meta hot paths
+_VERSION = struct.Struct(">H")
+_LEN_CRC = struct.Struct(">II")  # chunk LEN + CRC32, after the 4-byte tag
+_SEEK_COUNT = struct.Struct(">I")
+_LEGACY_META = struct.Struct(">QI")  # duration_us + frame_count
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChunkInfo:
     """Metadata about a single chunk in the H4MK container."""
     tag: bytes
@@ -36,7 +57,7 @@ class ChunkInfo:
         return f"ChunkInfo(tag={self.tag.decode('utf-8', errors='ignore')}, offset={self.offset}, size={self.size}, crc={self.crc:08x})"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SeekEntry:
     """A single entry in the SEEK table: PTS → offset mapping."""
     pts: int
@@ -67,22 +88,77 @@ class H4MKReader:
         print(f"Found keyframe at offset {entry.offset}")
     """
 
-    def __init__(self, data: bytes):
+    def __init__(self, data: bytes, verify_crc: bool = False):
         """
         Initialize reader with H4MK binary data.
         
         Args:
             data: Complete H4MK file contents
+            verify_crc: CRC-check every chunk payload while parsing. Off by
+                        default so opening only walks the chunk headers;
+                        call verify_all_crc() to check deliberately.
             
         Raises:
-            ValueError: If magic bytes or structure is invalid
+            ValueError: If magic bytes or structure is invalid (or, with
+                        verify_crc, a chunk CRC does not match)
         """
         self.data = data
         self.chunks: Dict[bytes, List[ChunkInfo]] = {}
         self._seek_table: Optional[List[SeekEntry]] = None
-        self._parse()
-
-    def _parse(self):
+        self._seek_array: Optional[np.ndarray] = None
+        self._seek_pts: Optional[List[int]] = None
+        self._integrity: Optional[bool] = None
+        self._meta: Optional[Dict[str, Any]] = None
+        self._core_cache: "OrderedDict[int, bytes]" = OrderedDict()
+        self._parse(verify_crc)
+
+    @classmethod
+    def from_path(cls, path, verify_crc: bool = False) -> "H4MKReader":
+        """
+        Open an H4MK file memory-mapped instead of reading it into memory.
+        
+        Only the file header and the chunk-header ladder are touched while
+        parsing; payload pages fault in lazily as blocks are fetched. The
+        kernel is asked to start readahead (POSIX_FADV_WILLNEED) so a
+        cold-cache open streams at device speed.
+        
+        Use as a context manager, or call close(), to release the mapping.
+        
+        Args:
+            path: Path to the .h4mk file
+            verify_crc: See __init__
+        """
+        with open(path, "rb") as f:
+            fd = f.fileno()
+            if os.fstat(fd).st_size == 0:
+                return cls(b"", verify_crc)  # mmap rejects empty files
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            data = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+
+        try:
+            return cls(data, verify_crc)
+        except Exception:
+            data.close()
+            raise
+
+    def close(self) -> None:
+        """Release the file mapping of a reader opened with from_path()."""
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    @property
+    def cached_bytes(self) -> int:
+        """Bytes held in the decompressed-CORE cache (beyond the container data)."""
+        return sum(len(block) for block in self._core_cache.values())
+
+    def __enter__(self) -> "H4MKReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _parse(self, verify_crc: bool = False):
         """Parse H4MK structure into chunks."""
         if len(self.data) < 8:
             raise ValueError("H4MK file too short")
@@ -91,41 +167,60 @@ class H4MKReader:
             raise ValueError(f"Invalid magic bytes: {self.data[:4]}")
 
         # VERSION is 2 bytes (big-endian), followed by 2-byte RESERVED
-        version = struct.unpack(">H", self.data[4:6])[0]
+        (version,) = _VERSION.unpack_from(self.data, 4)
         if version != 1:
             raise ValueError(f"Unsupported H4MK version: {version}")
 
-        pos = 8
-        while pos < len(self.data):
-            if pos + CHUNK_HEADER_SIZE > len(self.data):
-                break
-
-            tag = self.data[pos : pos + 4]
-            size, crc = struct.unpack(">II", self.data[pos + 4 : pos + 12])
-            payload_offset = pos + 12
-
-            if payload_offset + size > len(self.data):
-                raise ValueError(
-                    f"Chunk {tag} claims size {size} but file too short"
+        # Only offsets are recorded; payloads are never copied here. The view
+        # is released before returning so an mmap-backed reader can still be
+        # closed.
+        with memoryview(self.data) as view:
+            pos = 8
+            while pos < len(self.data):
+                if pos + CHUNK_HEADER_SIZE > len(self.data):
+                    break
+
+                tag = self.data[pos : pos + 4]
+                size, crc = _LEN_CRC.unpack_from(self.data, pos + 4)
+                payload_offset = pos + 12
+
+                if payload_offset + size > len(self.data):
+                    raise ValueError(
+                        f"Chunk {tag} claims size {size} but file too short"
+                    )
+
+                info = ChunkInfo(
+                    tag=tag,
+                    offset=payload_offset,
+                    size=size,
+                    crc=crc,
                 )
-
-            # Verify CRC32 of payload
-            payload = self.data[payload_offset : payload_offset + size]
-            computed_crc = zlib.crc32(payload) & 0xFFFFFFFF
-            if computed_crc != crc:
-                raise ValueError(
-                    f"CRC mismatch for chunk {tag}: "
-                    f"expected {crc:08x}, got {computed_crc:08x}"
-                )
-
-            info = ChunkInfo(
-                tag=tag,
-                offset=payload_offset,
-                size=size,
-                crc=crc,
+                if verify_crc:
+                    self._check_crc(view, info)
+                self.chunks.setdefault(tag, []).append(info)
+                pos = payload_offset + size
+
+    @staticmethod
+    def _check_crc(view: memoryview, info: ChunkInfo) -> None:
+        """CRC32 one payload in place; raise ValueError on mismatch."""
+        computed_crc = crc32(view[info.offset : info.offset + info.size])
+        if computed_crc != info.crc:
+            raise ValueError(
+                f"CRC mismatch for chunk {info.tag}: "
+                f"expected {info.crc:08x}, got {computed_crc:08x}"
             )
-            self.chunks.setdefault(tag, []).append(info)
-            pos = payload_offset + size
+
+    def verify_all_crc(self) -> None:
+        """
+        CRC-check every chunk payload (one crc32 call per chunk, no copies).
+        
+        Raises:
+            ValueError: On the first chunk whose CRC does not match
+        """
+        with memoryview(self.data) as view:
+            for infos in self.chunks.values():
+                for info in infos:
+                    self._check_crc(view, info)
 
     def get_chunks(self, tag: bytes) -> List[bytes]:
         """
@@ -142,6 +237,23 @@ class H4MKReader:
             for c in self.chunks.get(tag, [])
         ]
 
+    def get_chunk_views(self, tag: bytes) -> List[memoryview]:
+        """
+        Zero-copy variant of get_chunks(): read-only windows into self.data.
+        
+        Suited to handing large payloads (CORE) to anything that takes the
+        buffer protocol. The views pin the underlying buffer, so release
+        them before close() on a reader opened with from_path().
+        
+        Args:
+            tag: 4-byte chunk tag (e.g., b"CORE", b"SEEK")
+            
+        Returns:
+            List of memoryviews over the chunk payloads
+        """
+        view = memoryview(self.data).toreadonly()
+        return [view[c.offset : c.offset + c.size] for c in self.chunks.get(tag, [])]
+
     def get_seek_table(self) -> List[SeekEntry]:
         """
         Parse SEEK chunk into ordered list of (pts, offset) entries.
@@ -152,33 +264,47 @@ class H4MKReader:
         Raises:
             ValueError: If SEEK chunk is malformed
         """
-        if self._seek_table is not None:
-            return self._seek_table
+        if self._seek_table is None:
+            self._seek_table = [
+                SeekEntry(pts=pts, offset=offset)
+                for pts, offset in self._get_seek_array().tolist()
+            ]
+        return self._seek_table
+
+    def _get_seek_array(self) -> np.ndarray:
+        """
+        SEEK chunk decoded in one pass as an (n, 2) uint64 array of
+        (pts, offset) rows; cached.
+
+        Raises:
+            ValueError: If SEEK chunk is malformed
+        """
+        if self._seek_array is not None:
+            return self._seek_array
 
         seek_chunks = self.get_chunks(b"SEEK")
         if not seek_chunks:
-            return []
+            self._seek_array = np.empty((0, 2), dtype=np.uint64)
+            return self._seek_array
 
         seek = seek_chunks[0]
         if len(seek) < 4:
             raise ValueError("SEEK chunk too short")
 
-        n = struct.unpack(">I", seek[:4])[0]
-        entries = []
-        pos = 4
-
-        for i in range(n):
-            if pos + 16 > len(seek):
-                raise ValueError(
-                    f"SEEK table incomplete: expected {n} entries, "
-                    f"only have {i}"
-                )
-            pts, offset = struct.unpack(">QQ", seek[pos : pos + 16])
-            entries.append(SeekEntry(pts=pts, offset=offset))
-            pos += 16
+        (n,) = _SEEK_COUNT.unpack_from(seek)
+        available = (len(seek) - 4) // 16
+        if available < n:
+            raise ValueError(
+                f"SEEK table incomplete: expected {n} entries, "
+                f"only have {available}"
+            )
 
-        self._seek_table = entries
-        return entries
+        self._seek_array = (
+            np.frombuffer(seek, dtype=">u8", count=2 * n, offset=4)
+            .reshape(-1, 2)
+            .astype(np.uint64)
+        )
+        return self._seek_array
 
     def seek_to_pts(self, target_pts: int) -> Optional[SeekEntry]:
         """
@@ -190,23 +316,18 @@ class H4MKReader:
         Returns:
             SeekEntry at or before target_pts, or None if target is before first entry
         """
-        table = self.get_seek_table()
-        if not table:
-            return None
+        arr = self._get_seek_array()
+        if self._seek_pts is None:
+            self._seek_pts = arr[:, 0].tolist()
 
-        # Binary search for largest PTS <= target_pts
-        left, right = 0, len(table) - 1
-        result = None
-
-        while left <= right:
-            mid = (left + right) // 2
-            if table[mid].pts <= target_pts:
-                result = table[mid]
-                left = mid + 1
-            else:
-                right = mid - 1
-
-        return result
+        # Largest PTS <= target_pts: C bisect over a cached list of ints
+        i = bisect_right(self._seek_pts, target_pts) - 1
+        if i < 0:
+            return None
+        if self._seek_table is not None:
+            return self._seek_table[i]
+        pts, offset = arr[i].tolist()
+        return SeekEntry(pts=pts, offset=offset)
 
     def get_metadata(self) -> Dict[str, any]:
         """
@@ -221,8 +342,8 @@ class H4MKReader:
 
         meta = meta_chunks[0]
         # Simple format: duration(8B) + frame_count(4B)
-        if len(meta) >= 12:
-            duration_us, frame_count = struct.unpack(">QI", meta[:12])
+        if len(meta) >= _LEGACY_META.size:
+            duration_us, frame_count = _LEGACY_META.unpack_from(meta)
             return {
                 "duration_us": duration_us,
                 "frame_count": frame_count,
@@ -237,110 +358,197 @@ class H4MKReader:
         Returns:
             True if all chunks pass integrity checks
         """
-        # All chunks are already CRC-checked during _parse()
+        if self._integrity is None:
+            self._integrity = self._compute_integrity()
+        return self._integrity
+
+    def _compute_integrity(self) -> bool:
+        """Uncached body of verify_integrity()."""
+        try:
+            self.verify_all_crc()
+        except ValueError:
+            return False
+
         veri_chunks = self.get_chunks(b"VERI")
         if not veri_chunks:
             # No VERI chunk = pass (optional)
             return True
 
         veri = veri_chunks[0]
-        # VERI format: sha256(all other chunks in order)
+        # VERI format: hash(all other chunks in order), 32 bytes
         if len(veri) != 32:
             return False
 
-        # Compute expected hash
-        hasher = hashlib.sha256()
-        for tag in [b"CORE", b"SEEK", b"META", b"SAFE"]:
-            for chunk_info in self.chunks.get(tag, []):
-                payload = self.data[chunk_info.offset : chunk_info.offset + chunk_info.size]
-                hasher.update(payload)
+        # Compute expected hash with the algorithm named in META
+        try:
+            hasher = veri_hasher(self._veri_alg())
+        except ValueError:
+            return False
+
+        # VERI covers every chunk (header + payload) between the file header
+        # and the VERI chunk header, in file order: one contiguous range, so
+        # a single update over the buffer with no per-chunk slicing.
+        veri_header = self.chunks[b"VERI"][0].offset - CHUNK_HEADER_SIZE
+        with memoryview(self.data) as view:
+            hasher.update(view[8:veri_header])
 
         expected = hasher.digest()
         return veri == expected
 
-    def iter_core_blocks(self, decompress: bool = True, cipher_state: Optional[Any] = None) -> Iterable[bytes]:
+    def _load_meta(self) -> Dict[str, Any]:
+        """
+        JSON META chunk parsed once and cached.
+        
+        Returns {} if there is no META chunk or it is not a JSON object.
+        """
+        if self._meta is None:
+            meta_chunks = self.get_chunks(b"META")
+            try:
+                meta = orjson.loads(meta_chunks[0]) if meta_chunks else {}
+            except orjson.JSONDecodeError:
+                meta = {}
+            self._meta = meta if isinstance(meta, dict) else {}
+        return self._meta
+
+    def _veri_alg(self) -> str:
+        """VERI algorithm from the JSON META chunk (SHA256 if unspecified)."""
+        return self._load_meta().get("veri_alg", VERI_ALG_LEGACY)
+
+    def get_core_block(self, index: int, decompress: bool = True) -> bytes:
+        """
+        Get a single CORE block, decompressing only that block.
+        
+        Decompressed blocks are kept in a small per-reader LRU so that
+        sequential playback/scrubbing over nearby blocks does not repeat work.
+        
+        Args:
+            index: CORE block index (0-based)
+            decompress: If True, decompress using the loaded engine
+            
+        Returns:
+            Block payload (decompressed if requested)
+            
+        Raises:
+            IndexError: If index is out of range
+        """
+        infos = self.chunks.get(b"CORE", [])
+        if not 0 <= index < len(infos):
+            raise IndexError(f"CORE block index {index} out of range (0-{len(infos) - 1})")
+
+        c = infos[index]
+        if not decompress:
+            return self.data[c.offset : c.offset + c.size]
+
+        block = self._core_cache.get(index)
+        if block is None:
+            # Engines read the payload in place; only the result is new
+            with memoryview(self.data) as view:
+                block = load_engine().decompress(view[c.offset : c.offset + c.size])
+            self._core_cache[index] = block
+            if len(self._core_cache) > CORE_CACHE_SIZE:
+                self._core_cache.popitem(last=False)
+        else:
+            self._core_cache.move_to_end(index)
+        return block
+
+    def iter_core_blocks(
+        self,
+        decompress: bool = True,
+        cipher_state: Optional[Any] = None,
+        workers: Optional[int] = None,
+    ) -> Iterable[bytes]:
         """
         Iterate over CORE blocks, optionally decrypting and decompressing.
         
         Pipeline (if both cipher and decompress enabled):
           CORE encrypted block → decrypt → decompress → plaintext
         
+        Decompression of independent blocks runs on a thread pool with a
+        bounded look-ahead of 2 × workers blocks; results are still yielded
+        in block order. Decryption stays serial on the calling thread,
+        because the living cipher ratchets cipher_state on every block.
+        
         Args:
             decompress: If True, decompress each block using loaded engine
                        If False, return blocks as-is (raw encrypted or compressed)
             cipher_state: Optional LivingState for decryption.
                          If provided, decrypts before decompression.
                          If None, skips decryption.
+            workers: Decompression threads (default os.cpu_count();
+                     1 decompresses inline)
         
         Yields:
             CORE block payloads (plaintext if decrypted, raw if encrypted, compressed if not decompressed)
         """
-        core = self.get_chunks(b"CORE")
-        meta_chunks = self.get_chunks(b"META")
-        
-        if not meta_chunks:
-            meta = {}
-        else:
-            try:
-                import json
-                meta = json.loads(meta_chunks[0].decode("utf-8"))
-            except:
-                meta = {}
-        
-        comp_info = meta.get("compression", {})
-        enc_info = meta.get("encryption", {})
-        has_encryption = bool(enc_info)
+        meta = self._load_meta()
+        has_encryption = bool(meta.get("encryption", {}))
 
         if not decompress and cipher_state is None:
             # No processing, return blocks as-is
-            yield from core
+            yield from self.get_chunks(b"CORE")
             return
 
         compressor = load_engine() if decompress else None
-        
-        for block_index, block_payload in enumerate(core):
+        payloads = self._iter_core_payloads(meta, cipher_state if has_encryption else None)
+
+        if compressor is None:
+            for block_payload in payloads:
+                yield bytes(block_payload)
+            return
+
+        workers = workers or os.cpu_count() or 1
+        if workers < 2 or len(self.chunks.get(b"CORE", [])) < 2:
+            for block_payload in payloads:
+                yield compressor.decompress(block_payload)
+            return
+
+        # Step 2: Decompress (engines accept buffer views) on a sliding window
+        prefetch = 2 * workers
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="h4read") as pool:
+            pending: Deque[Future] = deque()
+            for block_payload in payloads:
+                pending.append(pool.submit(compressor.decompress, block_payload))
+                if len(pending) >= prefetch:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _iter_core_payloads(self, meta: Dict[str, Any], cipher_state: Optional[Any]) -> Iterator[Any]:
+        """CORE payloads in order, decrypted when cipher_state is given."""
+        comp_info = meta.get("compression", {})
+        # AAD prefix is constant per container; only chunk_index varies
+        aad_prefix = CoreContextPrefix(
+            engine_id=comp_info.get("engine_id", "unknown"),
+            engine_fp=comp_info.get("fingerprint", "unknown"),
+            container_veri_hex=PENDING_VERI_HEX,
+            track_id=meta.get("track_id", "unknown"),
+        )
+        pts_us = meta.get("pts_us", 0)
+        if cipher_state is not None:
+            # Decrypt under the suite the container was written with
+            bind_suite(cipher_state, suite_from_meta(meta.get("encryption", {})))
+
+        # Blocks are windows into self.data: nothing is copied up front, and
+        # each stage (decrypt, decompress) reads its input in place.
+        view = memoryview(self.data)
+        for block_index, info in enumerate(self.chunks.get(b"CORE", [])):
+            block_payload = view[info.offset : info.offset + info.size]
+
             # Step 1: Decrypt if cipher_state provided and block is encrypted
-            if cipher_state is not None and has_encryption:
-                ctx = CoreContext(
-                    engine_id=comp_info.get("engine_id", "unknown"),
-                    engine_fp=comp_info.get("fingerprint", "unknown"),
-                    container_veri_hex="unknown",  # Not available in reader
-                    track_id=meta.get("track_id", "unknown"),
-                    pts_us=meta.get("pts_us", 0),
-                    chunk_index=block_index,
-                )
-                # Encrypted payload is: header + ciphertext
-                # Living Cipher header format: Magic(5) + Suite len(1) + Suite + Counter(8) + Transcript(32) + Flags(1) + [DH pub(32)]
-                # We need to parse this to separate header and ciphertext
-                # For now, assume header is up to first non-magic bytes; this is a simplified approach
-                # Actually, we should store the header length or use a more robust format
-                # For this implementation, we'll use a simple fixed-size header approach
-                
-                # Try to extract header and ciphertext
-                # Living Cipher v3 header minimum: 5 (magic) + 1 (suite_len) + 8 (counter) + 32 (transcript) + 1 (flags) = 47 bytes minimum
-                # But suite_len determines actual header size, so we need to parse it properly
-                
-                header_size = 128  # Conservative estimate; actual size varies
-                if len(block_payload) > header_size:
-                    header = block_payload[:header_size]
-                    ciphertext = block_payload[header_size:]
-                else:
-                    # Fallback: treat entire payload as header (may fail)
-                    header = block_payload
-                    ciphertext = b""
-                
+            if cipher_state is not None:
+                ctx = aad_prefix.aad_for(pts_us, block_index)
                 try:
+                    # Encrypted payload is: binary-framed header + ciphertext
+                    split = header_length(block_payload)
+                    header = bytes(block_payload[:split])
+                    ciphertext = block_payload[split:]  # zero-copy window
                     decrypted = decrypt_core_block(cipher_state, header, ciphertext, ctx)
                     block_payload = decrypted
                 except Exception:
                     # Decryption failed; continue with raw (could be unencrypted)
                     pass
-            
-            # Step 2: Decompress if requested
-            if decompress and compressor is not None:
-                yield compressor.decompress(block_payload)
-            else:
-                yield block_payload
+
+            yield block_payload
 
     def __repr__(self) -> str:
         chunk_summary = ", ".join(
@@ -12,10 +12,14 @@ import bisect
 import struct
 from typing import List, Optional, Tuple
 
+import numpy as np
+
 
 class SeekEntry:
     """Single seek point: (PTS, byte offset)."""
 
+    __slots__ = ("pts", "offset")  # tables hold one per keyframe; no per-entry __dict__
+
     def __init__(self, pts: int, offset: int):
         self.pts = pts
         self.offset = offset
@@ -43,6 +47,7 @@ class SeekTable:
 
     def __init__(self):
         self.entries: List[SeekEntry] = []
+        self._pts_keys: List[int] = []  # entry PTS values, built by finalize()
         self._finalized = False
 
     def add(self, pts: int, offset: int) -> None:
@@ -68,6 +73,7 @@ class SeekTable:
         """
         if not self._finalized:
             self.entries.sort(key=lambda e: e.pts)
+            self._pts_keys = [e.pts for e in self.entries]
             self._finalized = True
 
     def seek(self, pts: int) -> Optional[SeekEntry]:
@@ -85,22 +91,10 @@ class SeekTable:
         if not self._finalized:
             raise RuntimeError("seek table not finalized")
 
-        if not self.entries:
-            return None
-
-        # Binary search for rightmost entry with pts <= target
-        lo, hi = 0, len(self.entries) - 1
-        best_idx = -1
-        while lo <= hi:
-            mid = (lo + hi) // 2
-            if self.entries[mid].pts <= pts:
-                best_idx = mid
-                lo = mid + 1
-            else:
-                hi = mid - 1
-
-        if best_idx >= 0:
-            return self.entries[best_idx]
+        # Rightmost entry with pts <= target (C bisect over plain ints)
+        i = bisect.bisect_right(self._pts_keys, pts) - 1
+        if i >= 0:
+            return self.entries[i]
         return None
 
     def serialize(self) -> bytes:
@@ -128,11 +122,10 @@ class SeekTable:
             raise ValueError("invalid seek table magic")
 
         count = struct.unpack("<I", data[4:8])[0]
+        # Decode all (pts, offset) rows in one pass
+        rows = np.frombuffer(data, dtype="<u8", count=2 * count, offset=8).reshape(-1, 2)
         table = cls()
-        for i in range(count):
-            offset = 8 + i * 16
-            pts, off = struct.unpack("<QQ", data[offset : offset + 16])
-            table.add(int(pts), int(off))
+        table.entries = [SeekEntry(pts, off) for pts, off in rows.tolist()]
         table.finalize()
         return table
 
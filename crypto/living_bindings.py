@@ -5,11 +5,11 @@ Prevents block transplantation across containers via AAD (Additional Authenticat
 """
 
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Tuple
+from dataclasses import dataclass, field
+from typing import Any, Dict, Tuple, Union
 import hashlib
 
-from crypto.living_cipher import LivingState, encrypt, decrypt
+from crypto.living_cipher import LivingState, SUITE_V3, SUITE_V4, encrypt, decrypt
 
 
 def sha256_hex(b: bytes) -> str:
@@ -34,26 +34,96 @@ class CoreContext:
         return s.encode("utf-8")
 
 
+@dataclass(frozen=True)
+class CoreContextPrefix:
+    """
+    Container-constant part of a CoreContext, encoded once.
+
+    aad_for(pts_us, chunk_index) yields exactly CoreContext(...).aad() for
+    the same fields, appending only the per-block tail.
+    """
+    engine_id: str
+    engine_fp: str
+    container_veri_hex: str
+    track_id: str
+    prefix: bytes = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        prefix = f"H4MK|{self.engine_id}|{self.engine_fp}|{self.container_veri_hex}|{self.track_id}|"
+        object.__setattr__(self, "prefix", prefix.encode("utf-8"))
+
+    def aad_for(self, pts_us: int, chunk_index: int) -> bytes:
+        """AAD for one block of this container."""
+        return self.prefix + f"{pts_us}|{chunk_index}".encode("ascii")
+
+
+# Container META["encryption"]["cipher"] label for each suite
+CIPHER_LABELS: Dict[str, str] = {
+    SUITE_V3: "living-cipher-v3",
+    SUITE_V4: "living-cipher-v4",
+}
+
+# VERI is only known once the container is finished, so builder and reader
+# both bind CORE blocks to this fixed placeholder in container_veri_hex.
+PENDING_VERI_HEX = sha256_hex(b"temp")
+
+
+def suite_from_meta(encryption: Dict[str, Any]) -> str:
+    """
+    Cipher suite of an encrypted container, from its META "encryption" entry.
+
+    Containers written before the "suite" field existed were always v3.
+    """
+    suite = encryption.get("suite")
+    if suite:
+        return suite
+    for known, label in CIPHER_LABELS.items():
+        if encryption.get("cipher") == label:
+            return known
+    return SUITE_V3
+
+
+def bind_suite(state: LivingState, suite: str) -> None:
+    """
+    Switch a not-yet-used state to suite (chain keys do not depend on it).
+
+    Raises:
+        ValueError: If the state already sent/received under another suite
+    """
+    if state.suite == suite:
+        return
+    if state.send_counter or state.recv_counter:
+        raise ValueError(f"cipher suite mismatch: state in use with {state.suite}")
+    state.suite = suite
+
+
+def _aad(ctx: Union[CoreContext, bytes]) -> bytes:
+    """AAD from a CoreContext, or a precomputed AAD (CoreContextPrefix.aad_for)."""
+    return ctx if isinstance(ctx, bytes) else ctx.aad()
+
+
 def encrypt_core_block(
     state: LivingState,
     payload: bytes,
-    ctx: CoreContext,
+    ctx: Union[CoreContext, bytes],
 ) -> Tuple[bytes, bytes]:
     """
     Encrypt a CORE block with living cipher.
+    ctx is a CoreContext or its precomputed AAD bytes.
     Returns (header, ciphertext).
     """
-    return encrypt(state, payload, aad=ctx.aad())
+    return encrypt(state, payload, aad=_aad(ctx))
 
 
 def decrypt_core_block(
     state: LivingState,
     header: bytes,
     ciphertext: bytes,
-    ctx: CoreContext,
+    ctx: Union[CoreContext, bytes],
 ) -> bytes:
     """
     Decrypt a CORE block with living cipher.
+    ctx is a CoreContext or its precomputed AAD bytes.
     Raises if AAD doesn't match (block transplanted or context tampered).
     """
-    return decrypt(state, header, ciphertext, aad=ctx.aad())
+    return decrypt(state, header, ciphertext, aad=_aad(ctx))
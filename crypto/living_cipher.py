@@ -14,9 +14,11 @@ No ML. Pure cryptography. Auditable by design.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Iterable, List
 import hashlib
+import hmac
 import struct
+from functools import lru_cache
 
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives import hashes
@@ -34,9 +36,13 @@ from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
 # ----------------------------
 
 
+# Bound once: on OpenSSL builds hashlib.sha256 already is _hashlib.openssl_sha256
+_sha256_new = hashlib.sha256
+
+
 def sha256(b: bytes) -> bytes:
     """Deterministic SHA256 hash."""
-    return hashlib.sha256(b).digest()
+    return _sha256_new(b).digest()
 
 
 def hkdf(
@@ -54,20 +60,60 @@ def hkdf(
     ).derive(key_material)
 
 
+_HKDF_ZERO_SALT = b"\x00" * 32  # RFC 5869: absent salt = HashLen zero bytes
+
+
+def _hkdf_extract(key_material: bytes) -> bytes:
+    """HKDF-SHA256 Extract with the default (zero) salt: PRK."""
+    return hmac.digest(_HKDF_ZERO_SALT, key_material, "sha256")
+
+
+def _hkdf_expand_once(prk: bytes, info: bytes, length: int = 32) -> bytes:
+    """
+    HKDF-SHA256 Expand for length <= 32: a single HMAC block (T(1)).
+
+    _hkdf_expand_once(_hkdf_extract(k), info, n) == hkdf(k, info, n).
+    """
+    if length > 32:
+        raise ValueError("single-block expand yields at most 32 bytes")
+    return hmac.digest(prk, info + b"\x01", "sha256")[:length]
+
+
+def _nonce(msg_key: bytes, counter: int) -> bytes:
+    """AES-GCM nonce for a message key (== hkdf(mk, b"nonce|" + u64(counter), 12))."""
+    return _hkdf_expand_once(_hkdf_extract(msg_key), b"nonce|" + u64(counter), 12)
+
+
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+
+
 def u64(n: int) -> bytes:
     """Encode u64 big-endian."""
-    return struct.pack(">Q", n)
+    return _U64.pack(n)
 
 
 def read_u64(b: bytes) -> int:
     """Decode u64 big-endian."""
-    return struct.unpack(">Q", b)[0]
+    return _U64.unpack(b)[0]
+
+
+@lru_cache(maxsize=16)
+def _ratchet_ctx(suite: str) -> bytes:
+    """Chain-ratchet HKDF context for a suite (encoded once per suite)."""
+    return suite.encode("utf-8") + b"|ratchet"
 
 
 # ----------------------------
 # Living Cipher State
 # ----------------------------
 
+# Suite strings travel in every header. v4 differs from v3 only in the
+# transcript hash (see update_transcript_v4); v3 peers/streams keep
+# working by setting state.suite = SUITE_V3.
+SUITE_V3 = "H4-LIVING-AESGCM-HKDF-SHA256-v3"
+SUITE_V4 = "H4-LIVING-AESGCM-HKDF-SHA256-v4"
+
 
 @dataclass
 class LivingState:
@@ -91,18 +137,26 @@ class LivingState:
     # Transcript hash binds accepted message order + ciphertexts
     transcript: bytes = b"\x00" * 32
 
-    suite: str = "H4-LIVING-AESGCM-HKDF-SHA256-v3"
+    suite: str = SUITE_V4
 
     # Out-of-order receive
     ooo_window: int = 32
-    skipped_keys: Dict[int, bytes] = field(
-        default_factory=dict
-    )  # counter -> msg_key
+    # Ring of (counter, msg_key) slots indexed by counter % len; counter -1
+    # marks an empty slot. Sized to the window on construction.
+    skipped_ring: List[Tuple[int, bytes]] = field(default_factory=list)
 
     # Periodic root ratchet
     root_ratchet_every: int = 1024  # M
     dh_priv: X25519PrivateKey = field(default_factory=X25519PrivateKey.generate)
     remote_dh_pub: Optional[bytes] = None
+    # Last X25519 exchange: (dh_priv, remote pub bytes, shared secret)
+    _dh_cache: Optional[Tuple[X25519PrivateKey, bytes, bytes]] = field(
+        default=None, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        if not self.skipped_ring:
+            self.skipped_ring = _empty_ring(self.ooo_window)
 
     def public_info(self) -> Dict[str, Any]:
         """Public info for introspection."""
@@ -112,7 +166,7 @@ class LivingState:
             "recv_counter": self.recv_counter,
             "transcript": self.transcript.hex(),
             "ooo_window": self.ooo_window,
-            "skipped_cached": len(self.skipped_keys),
+            "skipped_cached": sum(1 for c, _ in self.skipped_ring if c != -1),
             "root_ratchet_every": self.root_ratchet_every,
             "has_remote_dh": self.remote_dh_pub is not None,
         }
@@ -129,6 +183,7 @@ def init_from_shared_secret(
     *,
     ooo_window: int = 32,
     root_ratchet_every: int = 1024,
+    suite: str = SUITE_V4,
 ) -> LivingState:
     """Initialize from shared secret."""
     root = hkdf(shared_secret, info=context + b"|root", length=32)
@@ -140,6 +195,7 @@ def init_from_shared_secret(
         chain_key_recv=ck_r,
         ooo_window=ooo_window,
         root_ratchet_every=root_ratchet_every,
+        suite=suite,
     )
 
 
@@ -149,21 +205,50 @@ def init_from_shared_secret(
 
 
 def ratchet_step(chain_key: bytes, context: bytes, counter: int) -> Tuple[bytes, bytes]:
-    """Advance chain key, derive message key."""
-    next_ck = hkdf(
-        chain_key, info=context + b"|ck|" + u64(counter), length=32
-    )
-    msg_key = hkdf(chain_key, info=context + b"|mk|" + u64(counter), length=32)
+    """Advance chain key, derive message key.
+
+    Same output as two hkdf() calls on chain_key, but both keys share one
+    Extract (same IKM, same salt) and each Expand is a single HMAC block.
+    """
+    prk = _hkdf_extract(chain_key)
+    ctr = u64(counter)
+    next_ck = _hkdf_expand_once(prk, context + b"|ck|" + ctr)
+    msg_key = _hkdf_expand_once(prk, context + b"|mk|" + ctr)
     return next_ck, msg_key
 
 
 def update_transcript(
     transcript: bytes, header: bytes, ciphertext: bytes
 ) -> bytes:
-    """Bind transcript to header + ciphertext hashes."""
+    """Bind transcript to header + ciphertext hashes (v3 suites)."""
     return sha256(transcript + sha256(header) + sha256(ciphertext))
 
 
+def update_transcript_v4(
+    transcript: bytes, header: bytes, ciphertext: bytes
+) -> bytes:
+    """
+    Bind transcript to header + ciphertext in one streaming SHA256 (v4 suites).
+
+    H(transcript || len(header) u32 || header || len(ciphertext) u64 || ciphertext):
+    one hash instead of three, no intermediate digests or concatenations.
+    Length prefixes keep the header/ciphertext boundary unambiguous.
+    """
+    h = _sha256_new(transcript)
+    h.update(_U32.pack(len(header)))
+    h.update(header)
+    h.update(_U64.pack(len(ciphertext)))
+    h.update(ciphertext)
+    return h.digest()
+
+
+def _next_transcript(state: LivingState, header: bytes, ciphertext: bytes) -> bytes:
+    """Transcript after accepting (header, ciphertext), per the state's suite."""
+    if state.suite == SUITE_V3:
+        return update_transcript(state.transcript, header, ciphertext)
+    return update_transcript_v4(state.transcript, header, ciphertext)
+
+
 def _mix_root(root_key: bytes, dh_shared: bytes, suite: str) -> bytes:
     """Mix shared secret into root key."""
     return hkdf(
@@ -180,6 +265,22 @@ def _derive_chains_from_root(root_key: bytes, suite: str) -> Tuple[bytes, bytes]
     return ck_s, ck_r
 
 
+def _dh_exchange(state: LivingState, remote_pub: bytes) -> bytes:
+    """
+    X25519 shared secret between state.dh_priv and remote_pub.
+
+    Reuses the previous result when the same peer key is presented to the
+    same private key again (e.g. a retransmitted header), skipping the
+    scalar multiplication.
+    """
+    cache = state._dh_cache
+    if cache is not None and cache[0] is state.dh_priv and cache[1] == remote_pub:
+        return cache[2]
+    shared = state.dh_priv.exchange(X25519PublicKey.from_public_bytes(remote_pub))
+    state._dh_cache = (state.dh_priv, remote_pub, shared)
+    return shared
+
+
 def _should_root_ratchet(counter: int, every: int) -> bool:
     """Check if we should perform root ratchet."""
     return every > 0 and counter > 0 and (counter % every == 0)
@@ -201,6 +302,9 @@ def _should_root_ratchet(counter: int, every: int) -> bool:
 
 MAGIC_V3 = b"H4LC3"
 
+_HDR_HEAD = struct.Struct(">5sB")  # magic, suite_len
+_HDR_TAIL = struct.Struct(">Q32sB")  # counter, prev_transcript, flags
+
 
 def _pub_bytes(pub: X25519PublicKey) -> bytes:
     """Export X25519 public key as raw 32 bytes."""
@@ -213,59 +317,57 @@ def _build_header_v3(
     """Build binary-framed header."""
     if len(prev_transcript) != 32:
         raise ValueError("prev_transcript must be 32 bytes")
+    prefix = _header_prefix(suite)
+
+    if dh_pub is None:
+        return prefix + _HDR_TAIL.pack(counter, prev_transcript, 0)
+    if len(dh_pub) != 32:
+        raise ValueError("dh_pub must be 32 bytes")
+    return prefix + _HDR_TAIL.pack(counter, prev_transcript, 1) + dh_pub
+
+
+@lru_cache(maxsize=16)
+def _header_prefix(suite: str) -> bytes:
+    """magic + suite_len + suite: the constant head of every header for a suite."""
     suite_b = suite.encode("utf-8")
     if len(suite_b) > 255:
         raise ValueError("suite too long")
+    return _HDR_HEAD.pack(MAGIC_V3, len(suite_b)) + suite_b
 
-    flags = 0
-    extra = b""
-    if dh_pub is not None:
-        if len(dh_pub) != 32:
-            raise ValueError("dh_pub must be 32 bytes")
-        flags |= 0x01
-        extra = dh_pub
-
-    return b"".join(
-        [
-            MAGIC_V3,
-            struct.pack(">B", len(suite_b)),
-            suite_b,
-            struct.pack(">Q", counter),
-            prev_transcript,
-            struct.pack(">B", flags),
-            extra,
-        ]
-    )
+
+def header_length(message: bytes) -> int:
+    """Length of the binary-framed header at the start of header + ciphertext."""
+    if len(message) < _HDR_HEAD.size + _HDR_TAIL.size:
+        raise ValueError("header too short")
+    magic, suite_len = _HDR_HEAD.unpack_from(message)
+    if magic != MAGIC_V3:
+        raise ValueError("not v3 header")
+    end = _HDR_HEAD.size + suite_len + _HDR_TAIL.size
+    if len(message) < end:
+        raise ValueError("header too short")
+    return end + 32 if message[end - 1] & 0x01 else end
 
 
 def _parse_header_v3(header: bytes) -> Tuple[str, int, bytes, int, Optional[bytes]]:
     """Parse binary-framed header. Returns (suite, counter, prev_transcript, flags, dh_pub)."""
-    if len(header) < 5 + 1 + 8 + 32 + 1:
+    if len(header) < _HDR_HEAD.size + _HDR_TAIL.size:
         raise ValueError("header too short")
-    if header[:5] != MAGIC_V3:
+    magic, suite_len = _HDR_HEAD.unpack_from(header)
+    if magic != MAGIC_V3:
         raise ValueError("not v3 header")
 
-    pos = 5
-    suite_len = header[pos]
-    pos += 1
-    suite = header[pos : pos + suite_len].decode("utf-8", errors="ignore")
-    pos += suite_len
-
-    counter = struct.unpack(">Q", header[pos : pos + 8])[0]
-    pos += 8
-
-    prev_transcript = header[pos : pos + 32]
-    pos += 32
-
-    flags = header[pos]
-    pos += 1
+    pos = _HDR_HEAD.size + suite_len
+    if len(header) < pos + _HDR_TAIL.size:
+        raise ValueError("header too short")
+    suite = header[_HDR_HEAD.size : pos].decode("utf-8", errors="ignore")
+    counter, prev_transcript, flags = _HDR_TAIL.unpack_from(header, pos)
+    pos += _HDR_TAIL.size
 
     dh_pub = None
     if flags & 0x01:
         if len(header) < pos + 32:
             raise ValueError("missing dh_pub")
         dh_pub = header[pos : pos + 32]
-        pos += 32
 
     # ignore any trailing bytes for forward compatibility
     return suite, counter, prev_transcript, flags, dh_pub
@@ -276,25 +378,49 @@ def _parse_header_v3(header: bytes) -> Tuple[str, int, bytes, int, Optional[byte
 # ----------------------------
 
 
+_EMPTY_SLOT: Tuple[int, bytes] = (-1, b"")
+
+
+def _empty_ring(ooo_window: int) -> List[Tuple[int, bytes]]:
+    """
+    Skipped-key ring covering [recv - window, recv + window].
+
+    2 * window + 1 slots, so no two live counters share a slot.
+    """
+    return [_EMPTY_SLOT] * (2 * ooo_window + 1)
+
+
+def _pop_skipped(state: LivingState, counter: int) -> Optional[bytes]:
+    """Take the cached key for counter (one-shot), or None if not cached."""
+    ring = state.skipped_ring
+    slot = counter % len(ring)
+    cached, mk = ring[slot]
+    if cached != counter:
+        return None
+    ring[slot] = _EMPTY_SLOT
+    return mk
+
+
 def _evict_skipped(state: LivingState) -> None:
-    """Evict skipped keys outside the receive window."""
-    low = max(0, state.recv_counter - state.ooo_window)
-    high = state.recv_counter + state.ooo_window
-    for k in list(state.skipped_keys.keys()):
-        if k < low or k > high:
-            del state.skipped_keys[k]
+    """Drop the key for the counter that just fell out of the receive window."""
+    stale = state.recv_counter - state.ooo_window - 1
+    if stale >= 0:
+        ring = state.skipped_ring
+        slot = stale % len(ring)
+        if ring[slot][0] == stale:
+            ring[slot] = _EMPTY_SLOT
 
 
 def _precompute_skipped_keys(state: LivingState, target_counter: int) -> None:
     """Precompute message keys for skipped counters WITHOUT advancing recv_counter."""
-    ctx = state.suite.encode("utf-8") + b"|ratchet"
+    ctx = _ratchet_ctx(state.suite)
     # Derive keys from current recv_counter up to target_counter
+    ring = state.skipped_ring
+    size = len(ring)
     temp_ck = state.chain_key_recv
     for i in range(state.recv_counter, target_counter + 1):
-        next_ck, mk = ratchet_step(temp_ck, ctx, i)
-        state.skipped_keys[i] = mk
-        temp_ck = next_ck
-    _evict_skipped(state)
+        temp_ck, mk = ratchet_step(temp_ck, ctx, i)
+        ring[i % size] = (i, mk)
 
 
 # ----------------------------
@@ -319,22 +445,32 @@ def encrypt(
 
         # If we have remote's DH, mix it
         if state.remote_dh_pub is not None:
-            remote_pub = X25519PublicKey.from_public_bytes(state.remote_dh_pub)
-            dh_shared = state.dh_priv.exchange(remote_pub)
+            dh_shared = _dh_exchange(state, state.remote_dh_pub)
             state.root_key = _mix_root(state.root_key, dh_shared, state.suite)
             state.chain_key_send, state.chain_key_recv = _derive_chains_from_root(
                 state.root_key, state.suite
             )
-            state.skipped_keys.clear()
+            state.skipped_ring = _empty_ring(state.ooo_window)
 
+    ctx = _ratchet_ctx(state.suite)
+    return _seal_next(state, ctx, plaintext, aad, dh_pub)
+
+
+def _seal_next(
+    state: LivingState,
+    ctx: bytes,
+    plaintext: bytes,
+    aad: bytes,
+    dh_pub: Optional[bytes] = None,
+) -> Tuple[bytes, bytes]:
+    """Ratchet the send chain once and seal plaintext under the new message key."""
     # Ratchet send chain
-    ctx = state.suite.encode("utf-8") + b"|ratchet"
     state.chain_key_send, mk = ratchet_step(
         state.chain_key_send, ctx, state.send_counter
     )
 
     # Derive nonce from message key
-    nonce = hkdf(mk, info=b"nonce|" + u64(state.send_counter), length=12)
+    nonce = _nonce(mk, state.send_counter)
 
     # Build header (before encryption, so we can bind it as AAD)
     header = _build_header_v3(state.suite, state.send_counter, state.transcript, dh_pub)
@@ -343,12 +479,33 @@ def encrypt(
     ct = AESGCM(mk).encrypt(nonce, plaintext, aad + header)
 
     # Update transcript
-    state.transcript = update_transcript(state.transcript, header, ct)
+    state.transcript = _next_transcript(state, header, ct)
     state.send_counter += 1
 
     return header, ct
 
 
+def encrypt_batch(
+    state: LivingState, plaintexts: Iterable[bytes], aad: bytes = b""
+) -> List[Tuple[bytes, bytes]]:
+    """
+    Encrypt several messages in order; same output as calling encrypt()
+    on each in turn.
+
+    The ratchet context is built once for the batch and messages that do
+    not land on a root-ratchet boundary go straight to the seal step, so
+    per-message overhead is one chain step + one AEAD call.
+    """
+    ctx = _ratchet_ctx(state.suite)
+    out: List[Tuple[bytes, bytes]] = []
+    for plaintext in plaintexts:
+        if _should_root_ratchet(state.send_counter, state.root_ratchet_every):
+            out.append(encrypt(state, plaintext, aad))  # DH refresh path
+        else:
+            out.append(_seal_next(state, ctx, plaintext, aad))
+    return out
+
+
 def decrypt(
     state: LivingState, header: bytes, ciphertext: bytes, aad: bytes = b""
 ) -> bytes:
@@ -369,22 +526,52 @@ def decrypt(
     # If remote dh_pub present in header, mix it immediately
     if dh_pub is not None:
         state.remote_dh_pub = dh_pub
-        remote_pub = X25519PublicKey.from_public_bytes(dh_pub)
-        dh_shared = state.dh_priv.exchange(remote_pub)
+        dh_shared = _dh_exchange(state, dh_pub)
         state.root_key = _mix_root(state.root_key, dh_shared, state.suite)
         state.chain_key_send, state.chain_key_recv = _derive_chains_from_root(
             state.root_key, state.suite
         )
-        state.skipped_keys.clear()
+        state.skipped_ring = _empty_ring(state.ooo_window)
+
+    recv_counter = state.recv_counter
+    ring = state.skipped_ring
+    if counter != recv_counter or ring[counter % len(ring)][0] == counter:
+        return _decrypt_out_of_order(state, counter, header, ciphertext, aad)
+
+    # In-order: check transcript matches (prevents tampering + reordering)
+    if prev_transcript != state.transcript:
+        raise ValueError("transcript mismatch (tamper/reorder)")
+
+    # Ratchet recv chain
+    ctx = _ratchet_ctx(state.suite)
+    state.chain_key_recv, mk = ratchet_step(state.chain_key_recv, ctx, recv_counter)
+
+    # Derive nonce
+    nonce = _nonce(mk, recv_counter)
+
+    # Decrypt with header as AAD
+    pt = AESGCM(mk).decrypt(nonce, ciphertext, aad + header)
+
+    # Update transcript
+    state.transcript = _next_transcript(state, header, ciphertext)
+    state.recv_counter = recv_counter + 1
+    _evict_skipped(state)
 
+    return pt
+
+
+def _decrypt_out_of_order(
+    state: LivingState, counter: int, header: bytes, ciphertext: bytes, aad: bytes
+) -> bytes:
+    """decrypt() for any counter other than an uncached recv_counter."""
     # Out-of-window old replay
     if counter < (state.recv_counter - state.ooo_window):
         raise ValueError("replay/out-of-window")
 
     # Cached out-of-order (don't commit to transcript yet)
-    if counter in state.skipped_keys:
-        mk = state.skipped_keys.pop(counter)
-        nonce = hkdf(mk, info=b"nonce|" + u64(counter), length=12)
+    mk = _pop_skipped(state, counter)
+    if mk is not None:
+        nonce = _nonce(mk, counter)
         pt = AESGCM(mk).decrypt(nonce, ciphertext, aad + header)
         return pt  # note: not committed to transcript until stream catches up
 
@@ -394,34 +581,25 @@ def decrypt(
             raise ValueError("out-of-order too far")
         # Precompute keys for counters state.recv_counter to counter
         _precompute_skipped_keys(state, counter)
-        # Now counter is in skipped_keys
-        mk = state.skipped_keys.pop(counter)
-        nonce = hkdf(mk, info=b"nonce|" + u64(counter), length=12)
+        # Now counter is in the skipped-key ring
+        mk = _pop_skipped(state, counter)
+        nonce = _nonce(mk, counter)
         pt = AESGCM(mk).decrypt(nonce, ciphertext, aad + header)
-        _evict_skipped(state)
         return pt  # OOO, not committed to transcript
 
-    # Now must be in-order
-    if counter != state.recv_counter:
-        raise ValueError("unexpected counter")
+    raise ValueError("unexpected counter")
 
-    # Check transcript matches (prevents tampering + reordering)
-    if prev_transcript != state.transcript:
-        raise ValueError("transcript mismatch (tamper/reorder)")
 
-    # Ratchet recv chain
-    ctx = state.suite.encode("utf-8") + b"|ratchet"
-    state.chain_key_recv, mk = ratchet_step(state.chain_key_recv, ctx, state.recv_counter)
-
-    # Derive nonce
-    nonce = hkdf(mk, info=b"nonce|" + u64(state.recv_counter), length=12)
-
-    # Decrypt with header as AAD
-    pt = AESGCM(mk).decrypt(nonce, ciphertext, aad + header)
-
-    # Update transcript
-    state.transcript = update_transcript(state.transcript, header, ciphertext)
-    state.recv_counter += 1
-    _evict_skipped(state)
+def decrypt_batch(
+    state: LivingState,
+    messages: Iterable[Tuple[bytes, bytes]],
+    aad: bytes = b"",
+) -> List[bytes]:
+    """
+    Decrypt (header, ciphertext) pairs in order; same result as calling
+    decrypt() on each in turn (raises on the first failure).
 
-    return pt
+    Messages stay sequential: each in-order message is checked against
+    the transcript left by the previous one.
+    """
+    return [decrypt(state, header, ciphertext, aad) for header, ciphertext in messages]
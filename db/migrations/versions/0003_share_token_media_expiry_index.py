@@ -0,0 +1,24 @@
+"""Index share tokens by media and expiry
+
+Revision ID: 0003_share_token_media_expiry_index
+Revises: 0002_add_user_admin_flag
+Create Date: 2026-10-15 00:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_share_token_media_expiry_index"
+down_revision = "0002_add_user_admin_flag"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_share_tokens_media_expires", "share_tokens", ["media_id", "expires_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_share_tokens_media_expires", table_name="share_tokens")
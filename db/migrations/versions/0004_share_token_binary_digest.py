@@ -0,0 +1,44 @@
+"""Store share token lookup digest as 16-byte binary
+
+Revision ID: 0004_share_token_binary_digest
+Revises: 0003_share_token_media_expiry_index
+Create Date: 2026-10-15 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_share_token_binary_digest"
+down_revision = "0003_share_token_media_expiry_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing hex SHA256 digests keep working: their first 32 hex chars are
+    # exactly the 16-byte prefix that share_token_digest() now produces.
+    op.alter_column(
+        "share_tokens",
+        "token_hash",
+        type_=sa.LargeBinary(length=16),
+        existing_type=sa.String(length=64),
+        existing_nullable=False,
+        postgresql_using="decode(substr(token_hash, 1, 32), 'hex')",
+    )
+
+
+def downgrade() -> None:
+    # Only the 128-bit prefix survives, and it cannot be re-expanded to the
+    # full 64-char SHA256 hex digest the pre-upgrade code compares against:
+    # no share token can match after downgrade. Expire them all explicitly so
+    # they read as revoked rather than silently failing lookups.
+    op.execute("UPDATE share_tokens SET expires_at = now() WHERE expires_at > now()")
+    op.alter_column(
+        "share_tokens",
+        "token_hash",
+        type_=sa.String(length=64),
+        existing_type=sa.LargeBinary(length=16),
+        existing_nullable=False,
+        postgresql_using="encode(token_hash, 'hex')",
+    )
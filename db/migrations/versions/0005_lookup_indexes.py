@@ -0,0 +1,33 @@
+"""Index active API keys per user, access logs per user, share token expiry
+
+Revision ID: 0005_lookup_indexes
+Revises: 0004_share_token_binary_digest
+Create Date: 2026-10-15 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_lookup_indexes"
+down_revision = "0004_share_token_binary_digest"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Partial: revoked keys drop out of the index (revocation clears is_active)
+    op.create_index(
+        "ix_api_keys_user_active",
+        "api_keys",
+        ["user_id"],
+        postgresql_where=sa.text("is_active"),
+    )
+    op.create_index("ix_access_logs_user_ts", "access_logs", ["user_id", "ts"])
+    op.create_index("ix_share_tokens_expires", "share_tokens", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_share_tokens_expires", table_name="share_tokens")
+    op.drop_index("ix_access_logs_user_ts", table_name="access_logs")
+    op.drop_index("ix_api_keys_user_active", table_name="api_keys")
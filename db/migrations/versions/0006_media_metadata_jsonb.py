@@ -0,0 +1,44 @@
+"""Store media metadata as JSONB with a GIN index
+
+Revision ID: 0006_media_metadata_jsonb
+Revises: 0005_lookup_indexes
+Create Date: 2026-10-15 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_media_metadata_jsonb"
+down_revision = "0005_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "media_files",
+        "metadata",
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        existing_type=sa.JSON(),
+        existing_nullable=False,
+        server_default=sa.text("'{}'::jsonb"),
+        postgresql_using="metadata::jsonb",
+    )
+    op.create_index(
+        "ix_media_metadata_gin", "media_files", ["metadata"], postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_media_metadata_gin", table_name="media_files")
+    op.alter_column(
+        "media_files",
+        "metadata",
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        existing_nullable=False,
+        server_default=None,
+        postgresql_using="metadata::json",
+    )
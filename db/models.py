@@ -10,11 +10,16 @@ from sqlalchemy import (
     func,
     Index,
     Integer,
+    LargeBinary,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.base import Base
 
+# JSONB (GIN-indexable) on Postgres; plain JSON elsewhere (SQLite dev)
+_JSON_DOCUMENT = JSON().with_variant(JSONB(), "postgresql")
+
 
 class User(Base):
     __tablename__ = "users"
@@ -44,6 +49,9 @@ class ApiKey(Base):
     user = relationship("User")
 
 
+Index("ix_api_keys_user_active", ApiKey.user_id, postgresql_where=ApiKey.is_active)
+
+
 class MediaFile(Base):
     __tablename__ = "media_files"
 
@@ -52,7 +60,7 @@ class MediaFile(Base):
     original_name: Mapped[str] = mapped_column(Text, nullable=False)
     uploader_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
     upload_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    file_metadata: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+    file_metadata: Mapped[dict] = mapped_column(_JSON_DOCUMENT, default=dict, nullable=False)
     public_access: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
     storage_backend: Mapped[str] = mapped_column(String(16), nullable=False)
@@ -63,6 +71,7 @@ class MediaFile(Base):
 
 
 Index("ix_media_uploader_time", MediaFile.uploader_id, MediaFile.upload_time)
+Index("ix_media_metadata_gin", MediaFile.file_metadata, postgresql_using="gin")
 
 
 class AccessLog(Base):
@@ -81,12 +90,15 @@ class AccessLog(Base):
     media = relationship("MediaFile")
 
 
+Index("ix_access_logs_user_ts", AccessLog.user_id, AccessLog.ts)
+
+
 class ShareToken(Base):
     __tablename__ = "share_tokens"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     media_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("media_files.id"), nullable=False)
-    token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(16), unique=True, nullable=False)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     max_uses: Mapped[int | None] = mapped_column(Integer, nullable=True)
     usage_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -94,3 +106,7 @@ class ShareToken(Base):
     last_used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     media = relationship("MediaFile", back_populates="share_tokens")
+
+
+Index("ix_share_tokens_media_expires", ShareToken.media_id, ShareToken.expires_at)
+Index("ix_share_tokens_expires", ShareToken.expires_at)
@@ -2,12 +2,14 @@
 Geometry Ethics Guard - Non-negotiable content filtering.
 Runs before rendering, before sealing, before storage.
 """
+import re
+from functools import lru_cache
 from typing import List, Tuple, Dict, Any
 from geometry.spec import GeometryToken, GeometryTokenType
 
 
 # Forbidden geometry kinds (absolute)
-FORBIDDEN_KINDS = {
+FORBIDDEN_KINDS = frozenset({
     # Anatomy
     "face", "head", "skull", "profile",
     "eye", "nose", "mouth", "ear", "lip", "brow",
@@ -21,15 +23,21 @@ FORBIDDEN_KINDS = {
     
     # Identity markers
     "portrait", "bust", "statue", "figure",
-}
+})
 
 # Forbidden parameter names (biometric-like)
-FORBIDDEN_PARAMS = {
+FORBIDDEN_PARAMS = frozenset({
     "ratio", "proportion", "spacing", "distance",
     "width", "height", "depth",
     "angle", "tilt",
     "symmetry", "asymmetry",
-}
+})
+
+# All forbidden substrings as one alternation: a single C-level scan per name
+_FORBIDDEN_PARAM_RE = re.compile("|".join(map(re.escape, sorted(FORBIDDEN_PARAMS))))
+
+# Dimension triple that triggers the facial-proportion check
+_DIM_KEYS = frozenset({"width", "height", "depth"})
 
 # Forbidden value ranges (biometric ranges in normalized space)
 FORBIDDEN_RANGES = [
@@ -40,6 +48,12 @@ FORBIDDEN_RANGES = [
 ]
 
 
+@lru_cache(maxsize=1024)
+def _is_forbidden_param(param_name: str) -> bool:
+    """True if the (case-insensitive) name contains a forbidden substring."""
+    return _FORBIDDEN_PARAM_RE.search(param_name.lower()) is not None
+
+
 class GeometryEthicsGuard:
     """
     Enforce ethical constraints on geometry generation.
@@ -80,13 +94,10 @@ class GeometryEthicsGuard:
         
         # 2. Check forbidden parameter names
         for param_name in token.params.keys():
-            param_lower = param_name.lower()
-            for forbidden in FORBIDDEN_PARAMS:
-                if forbidden in param_lower:
-                    self.violations.append(
-                        f"Token {index}: Parameter '{param_name}' suggests biometric measurement"
-                    )
-                    break
+            if _is_forbidden_param(param_name):
+                self.violations.append(
+                    f"Token {index}: Parameter '{param_name}' suggests biometric measurement"
+                )
         
         # 3. Check for biometric value patterns
         if token.token_type == GeometryTokenType.PRIMITIVE:
@@ -97,7 +108,7 @@ class GeometryEthicsGuard:
         params = token.params
         
         # Check for width/height/depth combinations (face-like proportions)
-        if all(dim in params for dim in ["width", "height", "depth"]):
+        if params.keys() >= _DIM_KEYS:
             w, h, d = params["width"], params["height"], params["depth"]
             
             # Check for face-like aspect ratios
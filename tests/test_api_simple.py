@@ -5,6 +5,7 @@ tests/test_api_simple.py
 Simple API tests without TestClient dependency.
 """
 
+import hashlib
 import sys
 from pathlib import Path
 
@@ -106,6 +107,60 @@ def test_video_api_internals():
     print(f"  ✓ Routes: {len(router.routes)} registered")
 
 
+def test_cipher_template_cache():
+    """Cipher templates are keyed by a digest of the secret and can be dropped."""
+    print("\n[5] Cipher Template Cache")
+    print("-" * 50)
+
+    from api import video
+
+    secret = b"\x11" * 32
+    video._clear_cipher_templates()
+    a = video._init_cipher(secret)
+    b = video._init_cipher(secret)
+    assert a.root_key == b.root_key and a.dh_priv is not b.dh_priv
+    assert list(video._cipher_templates) == [hashlib.sha256(secret).digest()]
+
+    video._clear_cipher_templates()
+    assert not video._cipher_templates
+    print("  ✓ Cache keyed by SHA-256 of the secret; cleared on demand")
+
+
+def test_export_unaligned_upload():
+    """Export pads the final block so the whole container streams (not a truncated 200)."""
+    print("\n[6] Export Unaligned Upload")
+    print("-" * 50)
+
+    import asyncio
+    import io
+    import json as _json
+    from fastapi import UploadFile
+    from api import video
+    from container.reader import H4MKReader
+
+    raw = bytes(range(256)) * 768 + b"\x07" * 1000  # 3 x 65536 + 1000
+
+    async def export(**params):
+        response = await video.export_video_h4mk(
+            UploadFile(io.BytesIO(raw)), fps_hint=30.0, gop=30, mask=False,
+            master_key_hex=None, **params,
+        )
+        if response.status_code != 200:
+            return response.status_code, b""
+        return 200, b"".join([piece async for piece in response.body_iterator])
+
+    status, blob = asyncio.run(export(block_size=65536))
+    assert status == 200
+    r = H4MKReader(blob, verify_crc=True)
+    assert r.verify_integrity()
+    meta = _json.loads(r.get_chunks(b"META")[0])
+    assert meta["orig_len"] == len(raw)
+    assert b"".join(r.iter_core_blocks())[: len(raw)] == raw
+
+    assert asyncio.run(export(block_size=65536 + 1))[0] == 400
+    print("  ✓ Final block padded, orig_len recorded; unaligned block_size is a 400")
+
+
 def main():
     print("\n" + "=" * 60)
     print("API SIMPLE TEST SUITE (No TestClient)")
@@ -116,6 +171,8 @@ def main():
         test_seek_table_binary()
         test_chunk_operations()
         test_video_api_internals()
+        test_cipher_template_cache()
+        test_export_unaligned_upload()
 
         print("\n" + "=" * 60)
         print("✓ ALL TESTS PASSED ✓")
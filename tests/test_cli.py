@@ -0,0 +1,33 @@
+"""HarmonyØ4 CLI Tests
+
+Tests for the export subcommand.
+"""
+
+import argparse
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from cli import main as cli
+from container.reader import H4MKReader
+
+
+def test_export_unaligned_input(tmp_path, monkeypatch):
+    """Export handles inputs that are not a multiple of the engine block size."""
+    monkeypatch.setattr(cli, "EXPORT_BLOCK_SIZE", 4096)
+    raw = bytes(range(256)) * 40 + b"tail"  # 10244 bytes: 3 blocks, short last
+    src = tmp_path / "clip.raw"
+    src.write_bytes(raw)
+    out = tmp_path / "clip.h4mk"
+
+    rc = cli.cmd_export(argparse.Namespace(input=str(src), output=str(out)))
+    assert rc == 0
+
+    with H4MKReader.from_path(out) as r:
+        meta = json.loads(r.get_chunks(b"META")[0])
+        blocks = list(r.iter_core_blocks())
+    assert meta["orig_len"] == len(raw)
+    assert len(blocks) == 3
+    assert all(len(b) % cli.EXPORT_BLOCK_ALIGN == 0 for b in blocks)
+    assert b"".join(blocks)[: meta["orig_len"]] == raw
@@ -8,12 +8,15 @@ Verifies:
 - Auditability (open algorithm)
 """
 
+import json
+
 import pytest
 from compression.geo_ref import (
     GeometricReferenceCompressor,
     compress_rle_delta,
     decompress_rle_delta,
 )
+from compression.rans_ref import RansReferenceCompressor
 from compression import load_engine
 
 
@@ -132,6 +135,48 @@ class TestGeometricCompressor:
         assert "basis" in info
         assert "DCT" in info["basis"]
 
+    def test_engine_info_is_plain_dict(self, compressor):
+        """info() is JSON-serializable and callers may mutate their copy."""
+        info = compressor.info()
+        json.dumps(info)
+        info["engine"] = "changed"
+        assert compressor.info()["engine"] == "geometric-reference"
+
+
+class TestRansCompressor:
+    """Test the rANS entropy-coding reference engine."""
+
+    @pytest.fixture
+    def compressor(self):
+        return RansReferenceCompressor()
+
+    def test_compress_decompress(self, compressor):
+        """Lossless for any length, including unaligned and single-symbol input."""
+        for data in [b"a", bytes(range(250)), b"\x00" * 1000, bytes(range(256)) * 3]:
+            compressed = compressor.compress(data)
+            assert compressor.compress(data) == compressed
+            assert compressor.decompress(compressed) == data
+
+    def test_skewed_input_beats_rle(self, compressor):
+        """Entropy coding wins on skewed, run-free distributions."""
+        data = (b"ab" * 3 + b"c") * 2048
+        
+        assert len(compressor.compress(data)) < len(compress_rle_delta(data)) // 2
+
+    def test_truncated_stream_rejected(self, compressor):
+        compressed = compressor.compress(bytes(range(256)) * 4)
+        
+        with pytest.raises(ValueError):
+            compressor.decompress(compressed[:-2])
+
+    def test_engine_info(self, compressor):
+        info = compressor.info()
+        
+        assert info["engine"] == "rans-reference"
+        assert info["engine_id"] == "h4-rans-ref-o0-v1"
+        assert info["deterministic"] is True
+        json.dumps(info)
+
 
 class TestEngineLoader:
     """Test runtime engine selection."""
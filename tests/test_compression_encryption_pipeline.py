@@ -11,7 +11,7 @@ Verifies that:
 
 import pytest
 from compression import load_engine
-from crypto.living_cipher import init_from_shared_secret
+from crypto.living_cipher import SUITE_V3, SUITE_V4, init_from_shared_secret
 from container.h4mk import build_h4mk
 from container.reader import H4MKReader
 from utils.crypto import sha256
@@ -78,7 +78,8 @@ class TestCompressionEncryptionPipeline:
         assert meta_chunks, "No META chunk"
         container_meta = json.loads(meta_chunks[0].decode("utf-8"))
         assert "encryption" in container_meta, "No encryption metadata in container"
-        assert container_meta["encryption"]["cipher"] == "living-cipher-v3"
+        assert container_meta["encryption"]["cipher"] == "living-cipher-v4"
+        assert container_meta["encryption"]["suite"] == SUITE_V4
         assert container_meta["encryption"]["mode"] == "compress-then-encrypt"
         
         # Read back WITH decryption
@@ -341,3 +342,32 @@ class TestCompressionEncryptionWithRealData:
         assert blocks_read[0] == frame1
         assert blocks_read[1] == frame2
         assert blocks_read[2] == frame3
+
+
+class TestCipherSuiteSelection:
+    """Reader decrypts under the suite recorded in META, not the state default."""
+
+    BLOCKS = [bytes(range(256)) * 4, b"\x07" * 512]
+
+    def _build(self, suite):
+        secret = sha256(b"suite-secret")
+        sender = init_from_shared_secret(secret, suite=suite)
+        return build_h4mk(self.BLOCKS, [(0, 0)], {"project": "test"}, {}, cipher_state=sender)
+
+    @pytest.mark.parametrize("suite", [SUITE_V3, SUITE_V4])
+    def test_default_receiver_reads_any_suite(self, suite):
+        reader = H4MKReader(self._build(suite))
+        encryption = json.loads(reader.get_chunks(b"META")[0])["encryption"]
+        assert encryption["suite"] == suite
+
+        receiver = init_from_shared_secret(sha256(b"suite-secret"))  # default suite
+        receiver.chain_key_recv = receiver.chain_key_send  # receive the sender's chain
+        assert list(reader.iter_core_blocks(cipher_state=receiver)) == self.BLOCKS
+        assert receiver.suite == suite
+
+    def test_legacy_meta_without_suite_means_v3(self):
+        from crypto.living_bindings import suite_from_meta
+
+        assert suite_from_meta({"cipher": "living-cipher-v3"}) == SUITE_V3
+        assert suite_from_meta({"cipher": "living-cipher-v4"}) == SUITE_V4
+        assert suite_from_meta({}) == SUITE_V3
@@ -0,0 +1,40 @@
+"""HarmonyØ4 Geometry Container Tests
+
+Tests for the binary GEOB token layout.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from container.geometry_container import deserialize_tokens_bin, serialize_tokens_bin
+from geometry.spec import GeometryToken, GeometryTokenType
+
+
+def test_geob_roundtrip_keeps_param_types():
+    """Int, bool and float params come back with their original type and value."""
+    tokens = [
+        GeometryToken(
+            GeometryTokenType.PRIMITIVE,
+            "cube",
+            {"n": 3, "big": 2**53 + 1, "neg": -7, "flag": True, "x": 0.5},
+            bounds=(1.0, 2.0, 3.0),
+        ),
+        GeometryToken(GeometryTokenType.PRIMITIVE, "sphere", {}),
+    ]
+
+    restored = deserialize_tokens_bin(serialize_tokens_bin(tokens))
+
+    assert restored == tokens
+    assert [t.to_dict() for t in restored] == [t.to_dict() for t in tokens]
+    assert type(restored[0].params["n"]) is int
+    assert type(restored[0].params["flag"]) is bool
+
+
+def test_geob_rejects_oversized_int():
+    token = GeometryToken(GeometryTokenType.PRIMITIVE, "cube", {"n": 2**70})
+
+    with pytest.raises(ValueError):
+        serialize_tokens_bin([token])
@@ -3,13 +3,15 @@
 Tests for container assembly and structure.
 """
 
+import hashlib
+import zlib
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from container.h4mk import build_h4mk, Chunk
+from container.h4mk import build_h4mk, build_h4mk_stream, Chunk, pack_meta
+from container.reader import H4MKReader
 from container.seek import SeekTable
-from utils.crypto import sha256
 
 
 def test_chunk_packing():
@@ -62,8 +64,187 @@ def test_h4mk_structure():
     assert b"VERI" in h4mk
 
 
+def test_pack_meta_bytes():
+    """META serialization is pinned: compact, raw UTF-8, orjson float/key forms."""
+    meta = {"u": "é", 1: 1e20, "nan": float("nan"), "t": (1, 2.5), "b": True}
+    assert pack_meta(meta) == b'{"u":"\xc3\xa9","1":1e20,"nan":null,"t":[1,2.5],"b":true}'
+
+
+def test_h4mk_stream_matches_build():
+    """Streamed container is byte-identical to the one-shot build."""
+    core = [bytes([i]) * 256 for i in range(4)]
+    seek = [(0, 0), (66666, 512)]
+    meta = {"project": "HarmonyO4"}
+    safe = {"scope": "transport"}
+
+    blob = build_h4mk(core, seek, meta, safe)
+    streamed = b"".join(build_h4mk_stream(iter(core), seek, meta, safe))
+
+    assert streamed == blob
+    # VERI = BLAKE2b-256 over every chunk between the file header and VERI itself
+    assert blob[-44:-40] == b"VERI"
+    assert blob[-32:] == hashlib.blake2b(blob[8:-44], digest_size=32).digest()
+
+
+def test_reader_get_core_block():
+    """Single-block fetch decompresses only that block."""
+    core = [bytes([i]) * 256 * (i + 1) for i in range(4)]
+    reader = H4MKReader(build_h4mk(core, [(0, 0)], {}, {}))
+
+    assert reader.get_core_block(2) == core[2]
+    assert reader.get_core_block(2, decompress=False) == reader.get_chunks(b"CORE")[2]
+    assert list(reader._core_cache) == [2]
+    views = reader.get_chunk_views(b"CORE")
+    assert [bytes(v) for v in views] == reader.get_chunks(b"CORE")
+    assert views[0].readonly
+    try:
+        reader.get_core_block(4)
+        assert False, "expected IndexError"
+    except IndexError:
+        pass
+
+
+def test_iter_core_blocks_parallel_order():
+    """Thread-pooled decompression yields blocks in container order."""
+    core = [bytes([i]) * 256 * (1 + i % 3) for i in range(20)]
+    reader = H4MKReader(build_h4mk(core, [(0, 0)], {}, {}))
+
+    assert list(reader.iter_core_blocks(workers=4)) == core
+    assert list(reader.iter_core_blocks(workers=1)) == core
+
+
+def test_reader_verify_integrity():
+    """VERI check accepts a built container and rejects CRC-consistent edits."""
+    blob = build_h4mk([b"\x07" * 256], [(0, 0)], {"project": "HarmonyO4"}, {})
+    assert H4MKReader(blob).verify_integrity() is True
+
+    # Tamper with SAFE and patch its CRC so only VERI can catch it
+    tampered = bytearray(blob)
+    safe = tampered.index(b"SAFE")
+    size = int.from_bytes(tampered[safe + 4 : safe + 8], "big")
+    tampered[safe + 12 : safe + 12 + size] = b"[]".ljust(size)
+    tampered[safe + 8 : safe + 12] = zlib.crc32(tampered[safe + 12 : safe + 12 + size]).to_bytes(4, "big")
+    assert H4MKReader(bytes(tampered)).verify_integrity() is False
+
+
+def test_reader_lazy_crc():
+    """CRC is skipped at open unless requested; verify_all_crc() checks it."""
+    blob = bytearray(build_h4mk([b"\x07" * 256], [(0, 0)], {}, {}))
+    blob[8 + 12] ^= 0xFF  # flip a byte of the first CORE payload
+
+    reader = H4MKReader(bytes(blob))
+    assert len(reader.get_chunks(b"CORE")) == 1
+    try:
+        reader.verify_all_crc()
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert reader.verify_integrity() is False
+
+    try:
+        H4MKReader(bytes(blob), verify_crc=True)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_block_endpoints_reject_corrupt_core():
+    """API readers that serve CORE bytes CRC-check the container first."""
+    from api.video_compat import _get_reader
+    from api.video_range import _load_reader
+
+    blob = bytearray(build_h4mk([b"\x09" * 256], [(0, 0)], {}, {}))
+    blob[8 + 12] ^= 0xFF  # flip a byte of the first CORE payload
+
+    try:
+        _get_reader(bytes(blob))
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert _load_reader(bytes(blob).hex(), True).status_code == 400
+    assert isinstance(_load_reader(bytes(blob).hex()), H4MKReader)
+
+
+def test_core_range_handles_zero_length_chunks():
+    """Range streaming over empty CORE chunks yields the right bytes, never raises."""
+    import asyncio
+    from api.video_range import _iter_chunk_range
+
+    async def collect(chunks, start, end):
+        return b"".join([piece async for piece in _iter_chunk_range(chunks, start, end)])
+
+    assert asyncio.run(collect([b""], 0, 0)) == b""
+    chunks = [b"", b"abc", b"", b"de", b""]
+    assert asyncio.run(collect(chunks, 0, 5)) == b"abcde"
+    assert asyncio.run(collect(chunks, 3, 5)) == b"de"
+    assert asyncio.run(collect(chunks, 5, 5)) == b""
+
+    reader = H4MKReader(build_h4mk([b""], [(0, 0)], {}, {}))
+    views = reader.get_chunk_views(b"CORE")
+    assert asyncio.run(collect(views, 0, 0)) == b""
+
+
+def test_reader_cache_counts_decompressed_blocks(monkeypatch):
+    """The compat reader LRU bounds container plus decompressed-block bytes."""
+    import api.video_compat as compat
+
+    blobs = [build_h4mk([bytes([i]) * 256], [(0, 0)], {}, {}) for i in range(2)]
+    monkeypatch.setattr(compat, "_reader_cache", compat.OrderedDict())
+    monkeypatch.setattr(compat, "_READER_CACHE_MAX_BYTES", 2 * len(blobs[0]) + 128)
+
+    first = compat._get_reader(blobs[0])
+    compat._get_reader(blobs[1])
+    assert len(compat._reader_cache) == 2
+
+    first.get_core_block(0)
+    assert first.cached_bytes == 256
+    compat._trim_reader_cache()
+    assert len(compat._reader_cache) == 1
+    assert first not in compat._reader_cache.values()
+
+
+def test_track_parse_cache_is_digest_keyed_and_bounded(monkeypatch):
+    """video_tracks memoizes parsed META on a digest, within a byte budget."""
+    import api.video_tracks as tracks
+
+    monkeypatch.setattr(tracks, "_parse_cache", tracks.OrderedDict())
+    monkeypatch.setattr(tracks, "_parse_cache_bytes", 0)
+    monkeypatch.setattr(tracks, "_PARSE_CACHE_MAX_BYTES", 64)
+
+    meta = b'{"tracks": []}'
+    assert tracks._parse_meta(meta) is tracks._parse_meta(meta)
+    assert all(len(key) == 16 for key in tracks._parse_cache)
+
+    big = b'{"pad": "' + b"x" * 64 + b'"}'
+    assert tracks._parse_meta(big)["pad"] == "x" * 64
+    assert len(tracks._parse_cache) == 1
+
+    tracks._parse_meta(b'{"a": "' + b"y" * 48 + b'"}')
+    assert tracks._parse_cache_bytes <= 64
+    assert len(tracks._parse_cache) == 1
+
+
+def test_reader_from_path(tmp_path):
+    """Memory-mapped open matches the in-memory reader."""
+    core = [bytes([i]) * 256 for i in range(3)]
+    blob = build_h4mk(core, [(0, 0)], {"project": "HarmonyO4"}, {})
+    path = tmp_path / "clip.h4mk"
+    path.write_bytes(blob)
+
+    with H4MKReader.from_path(path) as reader:
+        assert reader.get_chunks(b"CORE") == H4MKReader(blob).get_chunks(b"CORE")
+        assert list(reader.iter_core_blocks()) == core
+        assert reader.get_core_block(1) == core[1]
+    assert reader.data.closed
+
+
 if __name__ == "__main__":
     test_chunk_packing()
     test_h4mk_container_build()
     test_h4mk_structure()
+    test_h4mk_stream_matches_build()
+    test_reader_get_core_block()
+    test_iter_core_blocks_parallel_order()
+    test_reader_verify_integrity()
+    test_reader_lazy_crc()
     print("✅ All H4MK tests passed")
@@ -21,13 +21,18 @@ from crypto.living_cipher import (
     init_from_shared_secret,
     encrypt,
     decrypt,
+    encrypt_batch,
+    decrypt_batch,
     sha256,
     hkdf,
     u64,
     read_u64,
     ratchet_step,
     update_transcript,
+    update_transcript_v4,
+    SUITE_V3,
     _should_root_ratchet,
+    _dh_exchange,
     _evict_skipped,
     _build_header_v3,
     _parse_header_v3,
@@ -90,6 +95,14 @@ class TestBasicCrypto:
         assert mk0 != mk1
         assert ck0 != ck1
 
+    def test_ratchet_step_matches_hkdf(self):
+        """Shared-Extract ratchet step is byte-identical to two full HKDFs."""
+        chain_key = sha256(b"chain_key")
+        ctx = b"test_context"
+        ck, mk = ratchet_step(chain_key, ctx, 7)
+        assert ck == hkdf(chain_key, info=ctx + b"|ck|" + u64(7), length=32)
+        assert mk == hkdf(chain_key, info=ctx + b"|mk|" + u64(7), length=32)
+
 
 class TestInitialization:
     """Living state initialization."""
@@ -166,6 +179,18 @@ class TestBasicEncryptDecrypt:
             decrypted = decrypt(state_b, header, ct)
             assert decrypted == msg
 
+    def test_encrypt_batch_matches_sequential(self):
+        """Batch encrypt equals per-message encrypt and round-trips via decrypt_batch."""
+        shared_secret = sha256(b"shared_secret")
+        state_a, state_b = init_peer_states(shared_secret)
+        state_seq, _ = init_peer_states(shared_secret)
+
+        messages = [b"msg%d" % i for i in range(8)]
+        batch = encrypt_batch(state_a, messages, aad=b"ctx")
+        assert batch == [encrypt(state_seq, m, aad=b"ctx") for m in messages]
+        assert decrypt_batch(state_b, batch, aad=b"ctx") == messages
+        assert state_a.send_counter == state_b.recv_counter == 8
+
     def test_encrypt_advances_send_counter(self):
         """Encryption advances send counter."""
         shared_secret = sha256(b"shared_secret")
@@ -247,6 +272,28 @@ class TestTranscriptBinding:
         transcript_after_2 = state_a.transcript
         assert transcript_after_2 != transcript_after_1
 
+    def test_transcript_v4_single_hash(self):
+        """v4 transcript is one length-prefixed SHA256 over header + ciphertext."""
+        shared_secret = sha256(b"shared_secret")
+        state_a, _ = init_peer_states(shared_secret)
+        t0 = state_a.transcript
+        h, ct = encrypt(state_a, b"msg")
+        expected = sha256(
+            t0 + len(h).to_bytes(4, "big") + h + len(ct).to_bytes(8, "big") + ct
+        )
+        assert state_a.transcript == update_transcript_v4(t0, h, ct) == expected
+
+    def test_transcript_v3_suite_compatible(self):
+        """States pinned to the v3 suite keep the v3 transcript and round-trip."""
+        shared_secret = sha256(b"shared_secret")
+        state_a = init_from_shared_secret(shared_secret, suite=SUITE_V3)
+        state_b = init_from_shared_secret(shared_secret, suite=SUITE_V3)
+        state_b.chain_key_recv = state_a.chain_key_send
+        t0 = state_a.transcript
+        h, ct = encrypt(state_a, b"msg")
+        assert state_a.transcript == update_transcript(t0, h, ct)
+        assert decrypt(state_b, h, ct) == b"msg"
+
     def test_transcript_mismatch_detected(self):
         """Tampered transcript in header is detected."""
         shared_secret = sha256(b"shared_secret")
@@ -350,6 +397,23 @@ class TestOutOfOrderDelivery:
         assert decrypt(state_b, messages[3][0], messages[3][1]) == b"msg3"
         assert decrypt(state_b, messages[4][0], messages[4][1]) == b"msg4"
 
+    def test_skipped_ring_one_shot(self):
+        """Cached keys live in a fixed-size ring and are consumed once."""
+        shared_secret = sha256(b"shared_secret")
+        state_a = init_from_shared_secret(shared_secret)
+        state_b = init_from_shared_secret(shared_secret, ooo_window=4)
+        state_b.chain_key_recv = state_a.chain_key_send
+        assert len(state_b.skipped_ring) == 9
+
+        messages = [encrypt(state_a, f"msg{i}".encode()) for i in range(4)]
+        assert decrypt(state_b, *messages[3]) == b"msg3"
+        assert state_b.public_info()["skipped_cached"] == 3  # counters 0..2
+
+        assert decrypt(state_b, *messages[2]) == b"msg2"
+        assert state_b.public_info()["skipped_cached"] == 2
+        assert all(c != 2 for c, _ in state_b.skipped_ring)  # consumed
+        assert len(state_b.skipped_ring) == 9
+
     def test_ooo_beyond_window(self):
         """Messages beyond out-of-order window are rejected."""
         shared_secret = sha256(b"shared_secret")
@@ -424,6 +488,21 @@ class TestRootRatchet:
         assert counter == 5
         assert dh_pub is not None  # DH present at ratchet boundary
 
+    def test_dh_exchange_cache(self):
+        """Repeated peer DH keys reuse the shared secret until dh_priv rotates."""
+        state = init_from_shared_secret(sha256(b"shared_secret"))
+        peer = X25519PrivateKey.generate()
+        peer_pub = peer.public_key().public_bytes_raw()
+
+        shared = _dh_exchange(state, peer_pub)
+        assert shared == peer.exchange(state.dh_priv.public_key())
+        assert _dh_exchange(state, peer_pub) is shared
+
+        state.dh_priv = X25519PrivateKey.generate()
+        fresh = _dh_exchange(state, peer_pub)
+        assert fresh == peer.exchange(state.dh_priv.public_key())
+        assert fresh != shared
+
     @pytest.mark.xfail(reason="Bidirectional DH ratchet edge case (v2.1+)")
     def test_root_ratchet_forward_secure(self):
         """Root ratchet produces forward-secure key updates."""
@@ -104,6 +104,21 @@ def test_token_serialization():
     print("  ✓ Round-trip successful")
 
 
+def test_encode_array_matches_tokens():
+    """Vectorized token array serializes identically to per-token encode."""
+    print("\n[3b] Vectorized Token Encode Test")
+    print("-" * 50)
+
+    tokenizer = VideoTokenizer(fps=29.97, gop_size=7)
+    frames = [b"F"] * 50
+    expected = b"".join(t.serialize() for t in tokenizer.encode(frames))
+
+    arr = tokenizer.encode_array(len(frames))
+    assert arr.tobytes() == expected
+    assert tokenizer.encode_array(0).tobytes() == b""
+    print("  ✓ encode_array matches encode()")
+
+
 def test_chunk_stream():
     """Test chunk accumulation and filtering."""
     print("\n[4] Chunk Stream Test")
@@ -137,6 +152,14 @@ def test_chunk_stream():
     keyframes = stream.keyframes()
     print(f"  ✓ Keyframes: {len(keyframes)} (every 3)")
 
+    # Batch header emit matches per-chunk serialization
+    headers = stream.serialize_headers()
+    assert headers == b"".join(c.serialize_header() for c in stream.chunks)
+    parsed = ChunkStream.deserialize_headers(headers)
+    assert parsed["pts"].tolist() == [c.pts for c in stream.chunks]
+    assert parsed["key"].tolist() == [int(c.is_keyframe) for c in stream.chunks]
+    print(f"  ✓ Batch headers: {len(headers)} bytes")
+
 
 def test_seek_table_serialization():
     """Test seek table round-trip."""
@@ -195,6 +218,7 @@ def main():
         test_video_tokenizer()
         test_seek_table()
         test_token_serialization()
+        test_encode_array_matches_tokens()
         test_chunk_stream()
         test_seek_table_serialization()
         test_metadata_extraction()
@@ -10,6 +10,7 @@ import base64
 from video.track import TrackBlock
 from video.gop import GOPConfig, kind_for, is_keyframe
 from video.adapter import OpaquePassThroughAdapter, BlockHeader
+from container.h4mk import build_h4mk
 from container.h4mk_tracks import build_h4mk_tracks
 from container.reader import H4MKReader
 from container.multitrack import (
@@ -19,8 +20,10 @@ from container.multitrack import (
     build_seek_per_track,
     pack_seek_multi,
     unpack_seek_multi,
+    seek_keyframe,
+    track_index_payloads,
 )
-from crypto.living_bindings import CoreContext, encrypt_core_block, decrypt_core_block
+from crypto.living_bindings import CoreContext, CoreContextPrefix, encrypt_core_block, decrypt_core_block
 from crypto.living_cipher import init_from_shared_secret, sha256
 
 
@@ -68,6 +71,15 @@ class TestTrackIndexing:
         assert unpacked[0].track_id == "video_main"
         assert unpacked[1].pts_us == 1000
         assert unpacked[2].core_index == 2
+        assert unpacked == entries
+
+    def test_trak_legacy_json(self):
+        """v1 JSON TRAK chunks still decode."""
+        legacy = json.dumps({"trak": [{
+            "track_id": "video_main", "pts_us": 0, "kind": "I",
+            "keyframe": True, "core_index": 0,
+        }]}).encode("utf-8")
+        assert unpack_trak(legacy) == [TrackIndexEntry("video_main", 0, "I", True, 0)]
 
     def test_seek_per_track_keyframes_only(self):
         """Seek table includes only keyframes."""
@@ -90,6 +102,14 @@ class TestTrackIndexing:
         assert unpacked["video_main"] == [(0, 0), (3000, 10), (6000, 20)]
         assert unpacked["audio_main"] == [(0, 5), (3000, 15)]
 
+    def test_seek_keyframe_last_at_or_before(self):
+        """Binary seek picks last keyframe <= target, clamping to first."""
+        entries = [(1000, 0), (4000, 10), (7000, 20)]
+        assert seek_keyframe(entries, 0) == (1000, 0)
+        assert seek_keyframe(entries, 4000) == (4000, 10)
+        assert seek_keyframe(entries, 6999) == (4000, 10)
+        assert seek_keyframe(entries, 10**9) == (7000, 20)
+
 
 class TestMultitrackPacking:
     """Multitrack H4MK packing."""
@@ -118,11 +138,11 @@ class TestMultitrackPacking:
         # Read META
         meta2 = json.loads(r.get_chunks(b"META")[0].decode("utf-8"))
         assert meta2["project"] == "HarmonyØ4"
-        assert "seekm_b64" in meta2
-        assert "trak_b64" in meta2
+        assert "seekm_b64" not in meta2
+        assert "trak_b64" not in meta2
 
-        # Read seek table
-        seekm = unpack_seek_multi(base64.b64decode(meta2["seekm_b64"]))
+        # Read seek table (raw SEKM chunk)
+        seekm = unpack_seek_multi(r.get_chunks(b"SEKM")[0])
         assert "video_main" in seekm
         assert "controls" in seekm
 
@@ -152,11 +172,25 @@ class TestMultitrackPacking:
         h4 = build_h4mk_tracks(blocks, meta={}, safe={})
         r = H4MKReader(h4)
 
-        meta = json.loads(r.get_chunks(b"META")[0].decode("utf-8"))
-        trak = json.loads(base64.b64decode(meta["trak_b64"]).decode("utf-8"))
-        assert len(trak["trak"]) == 3
-        assert trak["trak"][0]["track_id"] == "video_main"
-        assert trak["trak"][2]["track_id"] == "audio_main"
+        trak = unpack_trak(r.get_chunks(b"TRAK")[0])
+        assert len(trak) == 3
+        assert trak[0].track_id == "video_main"
+        assert trak[1].kind == "P" and not trak[1].keyframe
+        assert trak[2].track_id == "audio_main"
+
+    def test_legacy_b64_meta_fallback(self):
+        """Containers with SEEKM/TRAK base64-embedded in META still resolve."""
+        entries = [TrackIndexEntry("video_main", 0, "I", True, 0)]
+        seekm = pack_seek_multi(build_seek_per_track(entries))
+        trak = pack_trak(entries)
+        meta = {
+            "seekm_b64": base64.b64encode(seekm).decode("ascii"),
+            "trak_b64": base64.b64encode(trak).decode("ascii"),
+        }
+        r = H4MKReader(build_h4mk([b"\x00" * 256], seek_entries=[], meta=meta, safe={}))
+
+        assert not r.get_chunks(b"SEKM")
+        assert track_index_payloads(r, meta) == (seekm, trak)
 
 
 class TestVideoAdapter:
@@ -221,6 +255,12 @@ class TestLivingCipherBindings:
         with pytest.raises(Exception):  # AEAD verification failure
             decrypt_core_block(state_b, h, ct, ctx2)
 
+    def test_aad_prefix_matches_context(self):
+        """Precomputed AAD prefix produces byte-identical AAD."""
+        prefix = CoreContextPrefix("geom-ref", "abc", "deadbeef" * 8, "video")
+        ctx = CoreContext("geom-ref", "abc", "deadbeef" * 8, "video", 1000, 7)
+        assert prefix.aad_for(1000, 7) == ctx.aad()
+
 
 class TestIntegration:
     """End-to-end integration tests."""
@@ -244,8 +284,7 @@ class TestIntegration:
 
         # Read manifest
         r = H4MKReader(h4)
-        meta = json.loads(r.get_chunks(b"META")[0].decode("utf-8"))
-        seekm = unpack_seek_multi(base64.b64decode(meta["seekm_b64"]))
+        seekm = unpack_seek_multi(r.get_chunks(b"SEKM")[0])
 
         # Seek test: find keyframe at or before pts=1500
         entries = seekm.get("video_main", [])
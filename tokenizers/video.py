@@ -17,8 +17,13 @@ from __future__ import annotations
 import struct
 from typing import Any, Dict, Iterable
 
+import numpy as np
+
 from .base import Token, Tokenizer
 
+# Packed record matching VideoBlockToken.serialize(): "<QIB", 13 bytes
+TOKEN_DTYPE = np.dtype([("pts", "<u8"), ("block_index", "<u4"), ("is_keyframe", "u1")])
+
 
 class VideoBlockToken(Token):
     """
@@ -104,6 +109,25 @@ class VideoTokenizer(Tokenizer):
             is_keyframe = (block_idx % self.gop_size == 0)
             yield VideoBlockToken(pts, block_idx, is_keyframe)
 
+    def encode_array(self, block_count: int) -> np.ndarray:
+        """
+        Vectorized encode(): tokens for block_count blocks as one record array.
+
+        Only the block count matters (blocks are opaque), so PTS, index and
+        keyframe flags are computed with whole-array NumPy ops. Row i's bytes
+        equal VideoBlockToken.serialize() of the i-th token, so
+        ``arr.tobytes()`` is the concatenated serialized token stream.
+
+        Returns:
+            Array of dtype TOKEN_DTYPE, length block_count.
+        """
+        idx = np.arange(block_count, dtype=np.int64)
+        out = np.empty(block_count, dtype=TOKEN_DTYPE)
+        out["pts"] = idx * self.frame_duration_us
+        out["block_index"] = idx
+        out["is_keyframe"] = idx % self.gop_size == 0
+        return out
+
     def decode(self, tokens: Iterable[VideoBlockToken]) -> Dict[str, Any]:
         """
         Reconstruct metadata from tokens (frames themselves are opaque).
@@ -6,10 +6,10 @@ NOT pixel synthesis. NOT video decoding. Container + timing only.
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Iterable, Dict, Any, List
+from typing import Iterable, Dict, Any, Sized
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class VideoBlockToken:
     """Single video transport block token.
     
@@ -57,17 +57,20 @@ class VideoTransportTokenizer:
         self.frame_us = int(1_000_000 / float(fps_hint))  # microseconds per frame
         self.gop = int(gop)
 
-    def encode_blocks(self, blocks: List[bytes]) -> Iterable[VideoBlockToken]:
+    def encode_blocks(self, blocks: Sized) -> Iterable[VideoBlockToken]:
         """Tokenize list of opaque video blocks.
         
+        Only len(blocks) is consulted, so any sized sequence of payloads
+        (bytes, memoryview windows, ...) works.
+        
         Args:
             blocks: List of opaque frame/block payloads (any codec, any size)
         
         Yields:
             VideoBlockToken for each block with incrementing PTS and keyframe marks
         """
-        pts = 0
+        frame_us = self.frame_us
+        gop = self.gop
         for i in range(len(blocks)):
-            is_key = (i % self.gop == 0)  # Keyframe every gop blocks
-            yield VideoBlockToken(pts_us=pts, block_index=i, is_key=is_key)
-            pts += self.frame_us
+            # Keyframe every gop blocks; PTS derived from index, not accumulated
+            yield VideoBlockToken(i * frame_us, i, i % gop == 0)
@@ -9,6 +9,37 @@ import zlib
 
 import bcrypt
 
+# Optional ISA-L binding: CRC32 folded with (V)PCLMULQDQ, same values as zlib
+try:
+    from isal import isal_zlib as _crc_impl
+except ImportError:  # pragma: no cover - optional speedup
+    _crc_impl = zlib
+
+
+# H4MK VERI algorithms (META "veri_alg"); all produce 32-byte digests.
+# Containers without veri_alg predate the field and use SHA256.
+VERI_ALG_DEFAULT = "blake2b-256"
+VERI_ALG_LEGACY = "sha256"
+
+
+def veri_hasher(alg: str = VERI_ALG_DEFAULT):
+    """New incremental hash object for a VERI algorithm name.
+
+    Args:
+        alg: "blake2b-256" or "sha256"
+
+    Returns:
+        hashlib object with update()/digest()
+
+    Raises:
+        ValueError: If alg is not a known VERI algorithm
+    """
+    if alg == "blake2b-256":
+        return hashlib.blake2b(digest_size=32)
+    if alg == "sha256":
+        return hashlib.sha256()
+    raise ValueError(f"Unknown VERI algorithm: {alg}")
+
 
 def sha256(data: bytes) -> bytes:
     """Compute SHA256 digest.
@@ -46,6 +77,22 @@ def sha256_hex_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
 
 
+def share_token_digest(raw_token: str) -> bytes:
+    """Compute the indexed lookup digest for a share token.
+
+    First 16 bytes of SHA256 over the UTF-8 token. Tokens carry 256 bits of
+    randomness, so a 128-bit prefix is collision-safe and keeps the unique
+    index a quarter the width of a 64-character hex digest.
+
+    Args:
+        raw_token: Share token as issued to the client
+
+    Returns:
+        16-byte digest
+    """
+    return hashlib.sha256(raw_token.encode("utf-8")).digest()[:16]
+
+
 def hash_api_key_secure(raw_key: str) -> str:
     """Hash API key with bcrypt (secure, slow hashing)."""
     salt = bcrypt.gensalt(rounds=12)
@@ -60,13 +107,17 @@ def verify_api_key_secure(raw_key: str, stored_hash: str) -> bool:
         return False
 
 
-def crc32(data: bytes) -> int:
+def crc32(data: bytes, value: int = 0) -> int:
     """Compute CRC32 checksum (unsigned 32-bit).
     
+    Uses ISA-L's carry-less-multiply CRC32 when python-isal is installed,
+    zlib otherwise; both produce identical values.
+    
     Args:
-        data: Input bytes
+        data: Input bytes (any buffer, e.g. a memoryview window)
+        value: Running CRC to continue from (for multi-part payloads)
     
     Returns:
         CRC32 value as unsigned 32-bit integer
     """
-    return zlib.crc32(data) & 0xFFFFFFFF
+    return _crc_impl.crc32(data, value) & 0xFFFFFFFF